@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
@@ -101,6 +105,8 @@ class BudgetChangeRequest(models.Model):
         help_text="When this request expires and gets auto-approved"
     )
 
+    PENDING_COUNT_CACHE_TIMEOUT = 60 * 60 * 24  # Kept current by invalidation; the timeout only bounds drift
+
     class Meta:
         db_table = 'budget_change_requests'
         ordering = ['-created_at']
@@ -120,23 +126,42 @@ class BudgetChangeRequest(models.Model):
         # Calculate required approvals based on space members
         if not self.required_approvals and self.budget_item:
             # All active members except requester need to approve
-            from spaces.models import SpaceMember
-            member_count = SpaceMember.objects.filter(
-                space=self.budget_item.space,
-                is_active=True
-            ).exclude(user=self.requested_by).count()
+            from spaces.utils import SpaceMembershipResolver
+            space = self.budget_item.space
+            member_count = space.member_count
+            if SpaceMembershipResolver.is_member(space.pk, self.requested_by_id):
+                member_count -= 1
             self.required_approvals = max(1, member_count)
 
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def pending_count_cache_key(user_id):
+        """Cache key for a user's pending-approval badge count"""
+        return f'budgets:pending_approvals:{user_id}'
+
+    @classmethod
+    def invalidate_pending_counts(cls, space_ids):
+        """Drop the cached pending counts of every active member of the given spaces"""
+        from spaces.models import SpaceMember
+        cls.invalidate_pending_counts_for_users(SpaceMember.objects.filter(
+            space_id__in=space_ids,
+            is_active=True
+        ).values_list('user_id', flat=True))
+
+    @classmethod
+    def invalidate_pending_counts_for_users(cls, user_ids):
+        """Drop the cached pending counts of the given users"""
+        keys = [cls.pending_count_cache_key(user_id) for user_id in set(user_ids)]
+        if keys:
+            cache.delete_many(keys)
+
     def check_auto_approval(self):
         """Check if this request should be auto-approved due to timeout"""
         if self.status == 'pending' and timezone.now() >= self.expires_at:
-            self.status = 'auto_approved'
-            self.auto_approved_at = timezone.now()
-            self.auto_approval_reason = f'Auto-approved after {self.budget_item.space.settings.approval_timeout_days} days'
+            self.mark_auto_approved()
             self.save()
 
             # Apply the change
@@ -148,119 +173,150 @@ class BudgetChangeRequest(models.Model):
             return True
         return False
 
+    def mark_auto_approved(self, now=None):
+        """Set the auto-approval fields (not saved)"""
+        now = now or timezone.now()
+        self.status = 'auto_approved'
+        self.auto_approved_at = now
+        self.updated_at = now  # bulk_update() does not touch auto_now fields
+        self.auto_approval_reason = f'Auto-approved after {self.budget_item.space.settings.approval_timeout_days} days'
+
+    def _check_voter(self, user, action):
+        """Raise ValidationError unless the user may vote on this request"""
+        from spaces.utils import SpaceMembershipResolver
+        if user.pk == self.requested_by_id or not SpaceMembershipResolver.is_member(self.budget_item.space_id, user):
+            raise ValidationError(f'User cannot {action} this request')
+
+    def _cast_vote(self, user, vote, reason=''):
+        """Insert the user's vote; the unique (change_request, user) constraint rejects a second one"""
+        try:
+            with transaction.atomic():
+                BudgetChangeVote.objects.create(
+                    change_request=self,
+                    user=user,
+                    vote=vote,
+                    reason=reason
+                )
+        except IntegrityError:
+            raise ValidationError('User has already voted on this request')
+
+    def _pending_row(self):
+        """Queryset matching this request only while it is still pending"""
+        return BudgetChangeRequest.objects.filter(pk=self.pk, status='pending')
+
     def approve(self, user):
-        """Record an approval from a user"""
+        """
+        Record an approval from a user
+
+        The vote count is incremented with F() and the request moves to
+        'approved' with a conditional UPDATE, so concurrent votes are never lost
+        and only the vote that reaches the quorum resolves the request. That vote
+        applies the change in the same transaction (a failure rolls everything
+        back); the requester is notified once the transaction commits.
+        """
         if self.status != 'pending':
             raise ValidationError('Cannot approve a request that is not pending')
+        self._check_voter(user, 'approve')
 
-        # Check if user can approve
-        from spaces.models import SpaceMember
-        if not SpaceMember.objects.filter(
-            space=self.budget_item.space,
-            user=user,
-            is_active=True
-        ).exclude(user=self.requested_by).exists():
-            raise ValidationError('User cannot approve this request')
-
-        # Check if user already approved
-        if self.votes.filter(user=user).exists():
-            raise ValidationError('User has already voted on this request')
+        now = timezone.now()
+        with transaction.atomic():
+            self._cast_vote(user, 'approve')
 
-        # Create approval vote
-        BudgetChangeVote.objects.create(
-            change_request=self,
-            user=user,
-            vote='approve'
-        )
+            if not self._pending_row().update(received_approvals=F('received_approvals') + 1, updated_at=now):
+                raise ValidationError('Cannot approve a request that is not pending')
 
-        self.received_approvals += 1
+            # Only one voter's UPDATE can match status='pending' once the quorum is reached
+            reached_quorum = self._pending_row().filter(
+                received_approvals__gte=F('required_approvals')
+            ).update(status='approved', updated_at=now)
 
-        # Check if we have enough approvals
-        if self.received_approvals >= self.required_approvals:
-            self.status = 'approved'
-            self.apply_change()
+            self.refresh_from_db(fields=['received_approvals', 'status', 'updated_at'])
 
-            # Send notification to requester
-            self._send_result_notification('approval_approved')
+            if reached_quorum:
+                # Applied in the same transaction: if it fails, the vote and the
+                # status change roll back and the request stays pending
+                self.apply_change()
+                transaction.on_commit(self._on_approved)
 
-        self.save()
+    def _on_approved(self):
+        """Notify the requester about an applied approval (runs after commit)"""
+        BudgetChangeRequest.invalidate_pending_counts([self.budget_item.space_id])
+        self._send_result_notification('approval_approved')
 
     def reject(self, user, reason=''):
-        """Reject the request"""
+        """Reject the request (a conditional UPDATE, so it cannot race an approval)"""
         if self.status != 'pending':
             raise ValidationError('Cannot reject a request that is not pending')
+        self._check_voter(user, 'reject')
 
-        # Check if user can reject
-        from spaces.models import SpaceMember
-        if not SpaceMember.objects.filter(
-            space=self.budget_item.space,
-            user=user,
-            is_active=True
-        ).exclude(user=self.requested_by).exists():
-            raise ValidationError('User cannot reject this request')
+        with transaction.atomic():
+            self._cast_vote(user, 'reject', reason)
 
-        # Create rejection vote
-        BudgetChangeVote.objects.create(
-            change_request=self,
-            user=user,
-            vote='reject',
-            reason=reason
-        )
+            if not self._pending_row().update(status='rejected', updated_at=timezone.now()):
+                raise ValidationError('Cannot reject a request that is not pending')
 
-        self.status = 'rejected'
+            self.refresh_from_db(fields=['status', 'updated_at'])
+            transaction.on_commit(self._on_rejected)
 
-        # Send notification to requester
+    def _on_rejected(self):
+        """Notify the requester about a rejection (runs after commit)"""
+        BudgetChangeRequest.invalidate_pending_counts([self.budget_item.space_id])
         self._send_result_notification('approval_rejected')
 
-        self.save()
-
     def apply_change(self):
         """Apply the approved change to the budget item"""
         if self.status not in ['approved', 'auto_approved']:
             raise ValidationError('Can only apply approved changes')
 
         try:
-            if self.change_type == 'amount':
-                self.budget_item.amount = Decimal(str(self.new_values.get('amount')))
-
-            elif self.change_type == 'assignment':
-                assigned_to_id = self.new_values.get('assigned_to')
-                if assigned_to_id:
-                    self.budget_item.assigned_to = User.objects.get(id=assigned_to_id)
-                else:
-                    self.budget_item.assigned_to = None
-
-            elif self.change_type == 'date':
-                self.budget_item.expected_day = self.new_values.get('expected_day')
-                if 'next_due_date' in self.new_values:
-                    from datetime import datetime
-                    self.budget_item.next_due_date = datetime.strptime(
-                        self.new_values['next_due_date'], '%Y-%m-%d'
-                    ).date()
-
-            elif self.change_type == 'recurrence':
-                self.budget_item.is_recurring = self.new_values.get('is_recurring', False)
-                self.budget_item.recurrence_type = self.new_values.get('recurrence_type')
-
-            elif self.change_type == 'delete':
-                self.budget_item.is_active = False
-
+            self.apply_to_budget()
             self.budget_item.save()
 
             # Log the change
-            ChangeHistoryLog.objects.create(
-                space=self.budget_item.space,
-                change_request=self,
-                change_type=self.change_type,
-                old_value=self.old_values,
-                new_value=self.new_values,
-                changed_by=self.requested_by,
-                was_auto_approved=(self.status == 'auto_approved')
-            )
+            self.build_history_log().save()
 
         except Exception as e:
             raise ValidationError(f'Failed to apply change: {str(e)}')
 
+    def apply_to_budget(self):
+        """Set the requested values on the budget item (not saved)"""
+        if self.change_type == 'amount':
+            self.budget_item.amount = Decimal(str(self.new_values.get('amount')))
+
+        elif self.change_type == 'assignment':
+            assigned_to_id = self.new_values.get('assigned_to')
+            if assigned_to_id:
+                self.budget_item.assigned_to = User.objects.get(id=assigned_to_id)
+            else:
+                self.budget_item.assigned_to = None
+
+        elif self.change_type == 'date':
+            self.budget_item.expected_day = self.new_values.get('expected_day')
+            if 'next_due_date' in self.new_values:
+                from datetime import datetime
+                self.budget_item.next_due_date = datetime.strptime(
+                    self.new_values['next_due_date'], '%Y-%m-%d'
+                ).date()
+
+        elif self.change_type == 'recurrence':
+            self.budget_item.is_recurring = self.new_values.get('is_recurring', False)
+            self.budget_item.recurrence_type = self.new_values.get('recurrence_type')
+
+        elif self.change_type == 'delete':
+            self.budget_item.is_active = False
+
+    def build_history_log(self):
+        """Unsaved ChangeHistoryLog entry for this applied change"""
+        return ChangeHistoryLog(
+            space_id=self.budget_item.space_id,
+            change_request=self,
+            change_type=self.change_type,
+            old_value=self.old_values,
+            new_value=self.new_values,
+            changed_by_id=self.requested_by_id,
+            was_auto_approved=(self.status == 'auto_approved')
+        )
+
     @property
     def pending_approvers(self):
         """Get users who still need to approve"""
@@ -389,6 +445,10 @@ class ChangeHistoryLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Change History Log'
         verbose_name_plural = 'Change History Logs'
+        indexes = [
+            # Keyset pagination of a space's history (get_change_history_page)
+            models.Index(fields=['space', '-timestamp', '-id'], name='history_space_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.change_type} in {self.space.name} by {self.changed_by.username}"
@@ -409,4 +469,39 @@ class ChangeHistoryLog(models.Model):
             item_name = self.old_value.get('category_name', 'Item')
             return f"Deleted {item_name}"
 
-        return f"Changed {self.change_type}"
\ No newline at end of file
+        return f"Changed {self.change_type}"
+
+
+# Signal receivers keep the cached pending-approval counts current
+
+@receiver(post_save, sender=BudgetChangeRequest)
+def invalidate_pending_counts_on_request_save(sender, instance, created, **kwargs):
+    """A new or resolved request changes the inbox of everyone in the space"""
+    if created or instance.status != 'pending':
+        BudgetChangeRequest.invalidate_pending_counts([instance.budget_item.space_id])
+
+
+@receiver(post_delete, sender=BudgetChangeRequest)
+def invalidate_pending_counts_on_request_delete(sender, instance, **kwargs):
+    """A deleted request (e.g. removed with its budget) leaves everyone's inbox"""
+    if instance.status == 'pending':
+        # On a cascade the budget row is still there: dependent rows are deleted first
+        from spaces.models import SpaceMember
+        BudgetChangeRequest.invalidate_pending_counts_for_users(SpaceMember.objects.filter(
+            space__budgets__id=instance.budget_item_id,
+            is_active=True
+        ).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=BudgetChangeVote)
+@receiver(post_delete, sender=BudgetChangeVote)
+def invalidate_pending_count_on_vote(sender, instance, **kwargs):
+    """A vote only removes the request from the voter's inbox"""
+    cache.delete(BudgetChangeRequest.pending_count_cache_key(instance.user_id))
+
+
+@receiver(post_save, sender='spaces.SpaceMember')
+@receiver(post_delete, sender='spaces.SpaceMember')
+def invalidate_pending_count_on_membership(sender, instance, **kwargs):
+    """Joining, leaving or reactivating a membership changes which requests the member can vote on"""
+    cache.delete(BudgetChangeRequest.pending_count_cache_key(instance.user_id))
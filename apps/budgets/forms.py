@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
+import json
 from .models import Budget, BudgetCategory, BudgetTemplate
 from spaces.models import Space, SpaceMember
 
@@ -73,6 +74,25 @@ class BudgetCategoryForm(forms.ModelForm):
         return category
 
 
+def _attach_suggested_amounts(form):
+    """
+    Expose forecast amounts per category on a budget creation form
+
+    The cached forecasts go in a data-suggested-amounts attribute on the category
+    select, so the page can pre-fill the amount as soon as a category is picked.
+    """
+    from .utils.forecast import SpendingForecaster
+
+    form.suggested_amounts = SpendingForecaster.suggested_amounts(form.space, form.month_period)
+    form.fields['category'].widget.attrs['data-suggested-amounts'] = json.dumps({
+        category_id: str(amount) for category_id, amount in form.suggested_amounts.items()
+    })
+
+    category_id = form.initial.get('category')
+    if not form.is_bound and category_id in form.suggested_amounts and not form.initial.get('amount'):
+        form.initial['amount'] = form.suggested_amounts[category_id]
+
+
 class BudgetForm(forms.ModelForm):
     """Form for creating and editing budgets"""
 
@@ -126,6 +146,9 @@ class BudgetForm(forms.ModelForm):
             self.fields['assigned_to'].queryset = space_members
             self.fields['assigned_to'].empty_label = "Not assigned"
 
+            if not self.instance.pk:
+                _attach_suggested_amounts(self)
+
     def clean_amount(self):
         """Validate budget amount"""
         amount = self.cleaned_data.get('amount')
@@ -226,9 +249,19 @@ class BudgetBulkEditForm(forms.Form):
     """Form for bulk editing multiple budgets"""
 
     def __init__(self, *args, **kwargs):
-        self.budgets = kwargs.pop('budgets', [])
+        self.budgets = list(kwargs.pop('budgets', []))
         super().__init__(*args, **kwargs)
 
+        # One member list shared by every assigned_to field (all budgets belong to the same space)
+        self.members = []
+        if self.budgets:
+            self.members = list(User.objects.filter(
+                spacemember__space_id=self.budgets[0].space_id,
+                spacemember__is_active=True
+            ).distinct())
+        members_by_id = {str(member.pk): member for member in self.members}
+        member_choices = [('', 'Not assigned')] + [(str(member.pk), str(member)) for member in self.members]
+
         # Create dynamic fields for each budget
         for budget in self.budgets:
             field_name = f'amount_{budget.id}'
@@ -247,35 +280,42 @@ class BudgetBulkEditForm(forms.Form):
 
             # Assigned to field
             assigned_field_name = f'assigned_to_{budget.id}'
-            self.fields[assigned_field_name] = forms.ModelChoiceField(
-                queryset=User.objects.filter(
-                    spacemember__space=budget.space,
-                    spacemember__is_active=True
-                ).distinct(),
+            self.fields[assigned_field_name] = forms.TypedChoiceField(
+                choices=member_choices,
+                coerce=members_by_id.get,
+                empty_value=None,
                 required=False,
-                initial=budget.assigned_to,
+                initial=budget.assigned_to_id,
                 widget=forms.Select(attrs={
                     'class': 'wallai-input'
-                }),
-                empty_label="Not assigned"
+                })
             )
 
     def save(self):
-        """Save all budget changes"""
+        """Save changed budgets with a single bulk update"""
         updated_budgets = []
 
         for budget in self.budgets:
             amount_field = f'amount_{budget.id}'
             assigned_field = f'assigned_to_{budget.id}'
+            changed = False
 
-            if amount_field in self.cleaned_data:
+            if amount_field in self.cleaned_data and self.cleaned_data[amount_field] != budget.amount:
                 budget.amount = self.cleaned_data[amount_field]
+                changed = True
 
             if assigned_field in self.cleaned_data:
-                budget.assigned_to = self.cleaned_data[assigned_field]
+                assigned_to = self.cleaned_data[assigned_field]
+                if (assigned_to.pk if assigned_to else None) != budget.assigned_to_id:
+                    budget.assigned_to = assigned_to
+                    changed = True
 
-            budget.save()
-            updated_budgets.append(budget)
+            if changed:
+                budget.updated_at = timezone.now()
+                updated_budgets.append(budget)
+
+        if updated_budgets:
+            Budget.objects.bulk_update(updated_budgets, ['amount', 'assigned_to', 'updated_at'])
 
         return updated_budgets
 
@@ -504,6 +544,8 @@ class SmartBudgetCreationForm(forms.ModelForm):
             self.fields['assigned_to'].queryset = space_members
             self.fields['assigned_to'].empty_label = "Not assigned"
 
+            _attach_suggested_amounts(self)
+
     def clean(self):
         """Enhanced validation for timing fields"""
         cleaned_data = super().clean()
@@ -621,4 +663,53 @@ class BudgetTemplateForm(forms.ModelForm):
 
         if commit:
             template.save()
-        return template
\ No newline at end of file
+        return template
+
+
+class StatementImportForm(forms.Form):
+    """Form for uploading a bank statement (CSV or OFX) to import as expenses"""
+
+    FORMAT_CHOICES = [
+        ('auto', 'Detect from file name'),
+        ('csv', 'CSV'),
+        ('ofx', 'OFX / QFX'),
+    ]
+
+    statement_file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'wallai-input',
+            'accept': '.csv,.ofx,.qfx'
+        }),
+        help_text="Bank export with date, amount and description columns"
+    )
+
+    file_format = forms.ChoiceField(
+        choices=FORMAT_CHOICES,
+        initial='auto',
+        widget=forms.Select(attrs={
+            'class': 'wallai-input'
+        })
+    )
+
+    default_category = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'wallai-input',
+            'placeholder': 'Other'
+        }),
+        help_text="Budget category for rows without a matching category"
+    )
+
+    def clean(self):
+        """Resolve the statement format from the file name when set to auto"""
+        cleaned_data = super().clean()
+        statement_file = cleaned_data.get('statement_file')
+
+        if statement_file and cleaned_data.get('file_format') == 'auto':
+            extension = statement_file.name.rsplit('.', 1)[-1].lower()
+            if extension not in ('csv', 'ofx', 'qfx'):
+                raise ValidationError('Could not detect the statement format. Please choose CSV or OFX.')
+            cleaned_data['file_format'] = 'ofx' if extension == 'qfx' else extension
+
+        return cleaned_data
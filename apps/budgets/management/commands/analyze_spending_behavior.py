@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from budgets.models import SpendingBehaviorAnalysis
+
+
+class Command(BaseCommand):
+    help = 'Recompute spending behavior analyses for all users, spaces and categories in one batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--space',
+            type=int,
+            action='append',
+            help='Only analyze this space ID; can be repeated',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only reprocess combinations with expenses added since the last run',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='With --incremental, reprocess combinations with expenses added since this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of histogram rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        self.stdout.write('Analyzing spending behavior...')
+        written = SpendingBehaviorAnalysis.analyze_batch(
+            space_ids=options['space'],
+            incremental=options['incremental'] or since is not None,
+            since=since,
+            chunk_size=options['chunk_size'],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated {written} spending behavior analyses')
+        )
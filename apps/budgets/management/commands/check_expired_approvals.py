@@ -18,6 +18,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Also clean up old notifications',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of expired requests to claim and approve per transaction (default: 100)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -53,7 +59,9 @@ class Command(BaseCommand):
 
         else:
             # Actually auto-approve expired requests
-            auto_approved_count = BudgetChangeService.check_expired_requests()
+            auto_approved_count = BudgetChangeService.check_expired_requests(
+                chunk_size=options['chunk_size']
+            )
 
             self.stdout.write(
                 self.style.SUCCESS(f'Auto-approved {auto_approved_count} expired requests')
@@ -0,0 +1,68 @@
+import sys
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from spaces.models import Space
+from budgets.utils import EXPORT_FORMATS, EXPORT_RECORD_TYPES, iter_export_records
+
+
+class Command(BaseCommand):
+    help = "Stream a space's budgets, expenses and splits to CSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--space', type=int, required=True, help='Space ID to export')
+        parser.add_argument('--start', type=str, help='First month to include (YYYY-MM)')
+        parser.add_argument('--end', type=str, help='Last month to include (YYYY-MM)')
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--records',
+            type=str,
+            default=','.join(EXPORT_RECORD_TYPES),
+            help='Comma-separated record types to export (budget, expense, split)',
+        )
+        parser.add_argument('--output', type=str, help='Output file (defaults to stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            space = Space.objects.get(id=options['space'])
+        except Space.DoesNotExist:
+            raise CommandError(f'Space {options["space"]} not found')
+
+        for option in ('start', 'end'):
+            if options[option]:
+                try:
+                    datetime.strptime(options[option], '%Y-%m')
+                except ValueError:
+                    raise CommandError(f'--{option} must be in YYYY-MM format')
+
+        record_types = options['records'].split(',')
+        unknown_types = set(record_types) - set(EXPORT_RECORD_TYPES)
+        if unknown_types:
+            raise CommandError(f"Unknown record types: {', '.join(sorted(unknown_types))}")
+
+        stream, _ = EXPORT_FORMATS[options['format']]
+        records = iter_export_records(
+            space,
+            start_month=options['start'],
+            end_month=options['end'],
+            record_types=record_types,
+            chunk_size=options['chunk_size'],
+        )
+
+        output = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in stream(records):
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from budgets.services import BudgetInsightsService
+
+
+class Command(BaseCommand):
+    help = 'Generate and cache budget insights for every space and month in one batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            type=str,
+            action='append',
+            help='Only generate insights for this month (YYYY-MM); can be repeated',
+        )
+        parser.add_argument(
+            '--space',
+            type=int,
+            action='append',
+            help='Only generate insights for this space ID; can be repeated',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of budget rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Generating budget insights...')
+
+        space_months = 0
+        insight_count = 0
+        pending = {}
+
+        for space_id, month_period, insights in BudgetInsightsService.generate_insights_batch(
+            month_periods=options['month'],
+            space_ids=options['space'],
+            chunk_size=options['chunk_size'],
+        ):
+            space_months += 1
+            insight_count += len(insights)
+            pending[BudgetInsightsService.insights_cache_key(space_id, month_period)] = insights
+            if len(pending) >= options['chunk_size']:
+                BudgetInsightsService.store_insights(pending)
+                pending = {}
+
+            if options['verbosity'] >= 2:
+                for insight in insights:
+                    self.stdout.write(
+                        f'  Space {space_id} {month_period}: [{insight["type"]}] {insight["title"]}'
+                    )
+
+        if pending:
+            BudgetInsightsService.store_insights(pending)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Generated {insight_count} insights for {space_months} space-months'
+            )
+        )
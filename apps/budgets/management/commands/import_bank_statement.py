@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from spaces.models import Space
+from budgets.utils import StatementImporter, parse_statement
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import actual expenses for a space from a bank statement export (CSV or OFX)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Path to the statement file')
+        parser.add_argument('--space', type=int, required=True, help='Space ID to import into')
+        parser.add_argument('--user', type=int, required=True, help='User ID recorded as the payer')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ofx'],
+            help='Statement format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--default-category',
+            type=str,
+            help='Budget category for rows without a matching category',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of expenses inserted per bulk_create',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            space = Space.objects.get(id=options['space'])
+            user = User.objects.get(id=options['user'])
+        except (Space.DoesNotExist, User.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_format == 'qfx':
+            file_format = 'ofx'
+
+        try:
+            importer = StatementImporter(
+                space=space,
+                paid_by=user,
+                default_category=options['default_category'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'Importing {options["path"]} into "{space.name}"...')
+        try:
+            with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as stream:
+                summary = importer.run(parse_statement(stream, file_format))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f'  {error}'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {summary["imported"]} expenses ({summary["skipped"]} rows skipped, '
+                f'{summary["duplicates"]} already imported)'
+            )
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from budgets.models import MemberBalance
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-member balance ledger from expense splits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--space',
+            type=int,
+            help='Only rebuild balances for this space ID',
+        )
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='Only rebuild balances for this month (YYYY-MM)',
+        )
+
+    def handle(self, *args, **options):
+        space_ids = [options['space']] if options['space'] else None
+        month_periods = [options['month']] if options['month'] else None
+
+        self.stdout.write('Rebuilding member balances...')
+        rebuilt = MemberBalance.rebuild(space_ids=space_ids, month_periods=month_periods)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rebuilt} member balances')
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from budgets.models import Budget, BudgetSpendingRollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-budget spending rollups from actual expenses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--space',
+            type=int,
+            help='Only rebuild rollups for budgets in this space ID',
+        )
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='Only rebuild rollups for this month (YYYY-MM)',
+        )
+
+    def handle(self, *args, **options):
+        budget_ids = None
+
+        if options['space'] or options['month']:
+            budgets = Budget.objects.all_including_deleted()
+            if options['space']:
+                budgets = budgets.filter(space_id=options['space'])
+            if options['month']:
+                budgets = budgets.filter(month_period=options['month'])
+            budget_ids = budgets.values_list('id', flat=True)
+
+        self.stdout.write('Rebuilding budget spending rollups...')
+        rebuilt = BudgetSpendingRollup.rebuild(budget_ids=budget_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rebuilt} spending rollups')
+        )
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from budgets.services import RecurringRolloverService
+
+
+class Command(BaseCommand):
+    help = "Create next period's budgets from recurring budgets in every space"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='Month to create budgets for (YYYY-MM); defaults to next month',
+        )
+        parser.add_argument(
+            '--space',
+            type=int,
+            action='append',
+            help='Only roll over budgets in this space ID; can be repeated',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of budgets inserted per batch',
+        )
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                datetime.strptime(options['month'], '%Y-%m')
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+
+        self.stdout.write('Rolling over recurring budgets...')
+        summary = RecurringRolloverService.rollover(
+            target_month=options['month'],
+            space_ids=options['space'],
+            chunk_size=options['chunk_size'],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {summary["created"]} budgets for {summary["month_period"]} '
+                f'({summary["skipped"]} already existed)'
+            )
+        )
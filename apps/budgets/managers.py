@@ -1,8 +1,51 @@
 from django.db import models
+from django.db.models import F, Value, Case, When, OuterRef, Subquery, ExpressionWrapper
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from decimal import Decimal
 
 
-class BudgetManager(models.Manager):
+MONEY_FIELD = models.DecimalField(max_digits=12, decimal_places=2)
+
+
+class BudgetQuerySet(models.QuerySet):
+    """Chainable Budget queries"""
+
+    def with_spending(self):
+        """
+        Annotate each budget with its spending figures in the same SQL statement
+
+        Adds spent_total, expense_count, remaining, spent_pct and split_count.
+        Spending comes from the maintained BudgetSpendingRollup (LEFT JOIN) and
+        split_count from a correlated subquery, so list pages avoid per-row queries.
+        """
+        from .models import BudgetSplit
+
+        split_count = BudgetSplit.objects.filter(
+            budget=OuterRef('pk')
+        ).order_by().values('budget').annotate(
+            count=models.Count('id')
+        ).values('count')
+
+        return self.annotate(
+            spent_total=Coalesce(
+                F('spending_rollup__total_spent'), Value(Decimal('0.00')), output_field=MONEY_FIELD
+            ),
+            expense_count=Coalesce(F('spending_rollup__expense_count'), Value(0)),
+            split_count=Coalesce(Subquery(split_count, output_field=models.IntegerField()), Value(0)),
+        ).annotate(
+            remaining=ExpressionWrapper(F('amount') - F('spent_total'), output_field=MONEY_FIELD),
+            spent_pct=Case(
+                When(amount__gt=0, then=ExpressionWrapper(
+                    F('spent_total') * Value(100) / F('amount'), output_field=MONEY_FIELD
+                )),
+                default=Value(Decimal('0.00')),
+                output_field=MONEY_FIELD,
+            ),
+        )
+
+
+class BudgetManager(models.Manager.from_queryset(BudgetQuerySet)):
     """Custom manager for Budget model with soft delete functionality"""
 
     def active(self):
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:41
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def backfill_spending_rollups(apps, schema_editor):
+    """Seed rollups for existing budgets from their expenses"""
+    Budget = apps.get_model('budgets', 'Budget')
+    ActualExpense = apps.get_model('budgets', 'ActualExpense')
+    BudgetSpendingRollup = apps.get_model('budgets', 'BudgetSpendingRollup')
+
+    totals = {
+        row['budget_item_id']: row
+        for row in ActualExpense.objects.filter(
+            month_period=models.F('budget_item__month_period')
+        ).values('budget_item_id').annotate(
+            total=models.Sum('actual_amount'),
+            count=models.Count('id'),
+            latest=models.Max('date_paid'),
+        )
+    }
+
+    BudgetSpendingRollup.objects.bulk_create([
+        BudgetSpendingRollup(
+            budget_id=budget_id,
+            total_spent=totals.get(budget_id, {}).get('total') or Decimal('0.00'),
+            expense_count=totals.get(budget_id, {}).get('count') or 0,
+            last_paid=totals.get(budget_id, {}).get('latest'),
+        )
+        for budget_id in Budget.objects.values_list('id', flat=True).iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0010_add_soft_delete_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetSpendingRollup',
+            fields=[
+                ('budget', models.OneToOneField(help_text='Budget these totals belong to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='spending_rollup', serialize=False, to='budgets.budget')),
+                ('total_spent', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text="Sum of actual expenses paid in the budget's month", max_digits=12)),
+                ('expense_count', models.PositiveIntegerField(default=0, help_text="Number of actual expenses paid in the budget's month")),
+                ('last_paid', models.DateField(blank=True, help_text='Most recent date an expense was paid', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Budget Spending Rollup',
+                'verbose_name_plural': 'Budget Spending Rollups',
+                'db_table': 'budget_spending_rollups',
+            },
+        ),
+        migrations.RunPython(backfill_spending_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0011_budgetspendingrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actualexpense',
+            index=models.Index(fields=['budget_item', '-date_paid', '-id'], name='expense_budget_paid_idx'),
+        ),
+    ]
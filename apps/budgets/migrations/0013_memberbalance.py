@@ -0,0 +1,61 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:03
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_member_balances(apps, schema_editor):
+    """Seed the ledger from existing expense splits"""
+    ExpenseSplit = apps.get_model('budgets', 'ExpenseSplit')
+    MemberBalance = apps.get_model('budgets', 'MemberBalance')
+
+    key_fields = (
+        'actual_expense__budget_item__space_id',
+        'actual_expense__budget_item__month_period',
+        'actual_expense__paid_by_id',
+        'user_id',
+    )
+    balances = {}
+    rows = ExpenseSplit.objects.exclude(
+        user_id=models.F('actual_expense__paid_by_id')
+    ).values(*key_fields).annotate(total=models.Sum('amount')).values_list(*key_fields, 'total').order_by()
+    for space_id, month_period, payer_id, user_id, total in rows:
+        balances[(space_id, payer_id, month_period)] = balances.get((space_id, payer_id, month_period), 0) + total
+        balances[(space_id, user_id, month_period)] = balances.get((space_id, user_id, month_period), 0) - total
+
+    MemberBalance.objects.bulk_create([
+        MemberBalance(space_id=space_id, user_id=user_id, month_period=month_period, balance=balance)
+        for (space_id, user_id, month_period), balance in balances.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0012_actualexpense_keyset_index'),
+        ('spaces', '0005_spacesettings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month_period', models.CharField(help_text='Budget month (YYYY-MM) of the expenses behind this balance', max_length=7)),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Owed to this member by others minus what this member owes others', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('space', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_balances', to='spaces.space')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_balances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Member Balance',
+                'verbose_name_plural': 'Member Balances',
+                'db_table': 'member_balances',
+                'unique_together': {('space', 'user', 'month_period')},
+            },
+        ),
+        migrations.RunPython(backfill_member_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0013_memberbalance'),
+        ('spaces', '0005_spacesettings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['due_date'], name='budget_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['range_start'], name='budget_range_start_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0014_budget_reminder_indexes'),
+        ('spaces', '0006_space_active_member_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changehistorylog',
+            index=models.Index(fields=['space', '-timestamp', '-id'], name='history_space_time_idx'),
+        ),
+    ]
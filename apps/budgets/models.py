@@ -1,11 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q, Case, When, Value, OuterRef, Subquery
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
 import calendar
-from datetime import datetime
+from datetime import datetime, timedelta
 from .managers import BudgetManager
 
 User = get_user_model()
@@ -389,6 +392,11 @@ class Budget(models.Model):
         verbose_name = 'Budget'
         verbose_name_plural = 'Budgets'
         unique_together = [['space', 'category', 'month_period']]  # One budget per category per month per space
+        indexes = [
+            # Reminder sweeps look up budgets by due date / range start window
+            models.Index(fields=['due_date'], name='budget_due_date_idx'),
+            models.Index(fields=['range_start'], name='budget_range_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.space.name} - {self.category.name} ({self.month_period}): ${self.amount}"
@@ -403,15 +411,15 @@ class Budget(models.Model):
                 raise ValidationError({'month_period': 'Month period must be in YYYY-MM format'})
 
         # Validate that assigned user is a member of the space
-        if self.assigned_to and self.space:
-            from spaces.models import SpaceMember
-            if not SpaceMember.objects.filter(
-                space=self.space,
-                user=self.assigned_to,
-                is_active=True
-            ).exists():
+        if self.assigned_to_id and self.space_id:
+            from spaces.utils import SpaceMembershipResolver
+            if not SpaceMembershipResolver.is_member(self.space_id, self.assigned_to_id):
                 raise ValidationError({'assigned_to': 'Assigned user must be a member of the space'})
 
+        self.clean_amount_and_timing()
+
+    def clean_amount_and_timing(self):
+        """Validation that needs no database access (amount, timing and recurrence fields)"""
         # Validate amount is positive
         if self.amount and self.amount <= 0:
             raise ValidationError({'amount': 'Budget amount must be greater than 0'})
@@ -464,33 +472,52 @@ class Budget(models.Model):
         except (ValueError, IndexError):
             return self.month_period
 
-    def get_real_spending_current_month(self):
-        """Get actual expenses for this budget category in the current month"""
+    def _get_spending_rollup(self):
+        """Get the maintained spending rollup for this budget (None if no expenses yet)"""
         try:
-            from .models_expenses import ActualExpense
-            expenses = ActualExpense.objects.filter(
-                budget_item=self,
-                date_paid__year=int(self.month_period.split('-')[0]),
-                date_paid__month=int(self.month_period.split('-')[1])
-            )
-            return sum(expense.actual_amount for expense in expenses)
-        except ImportError:
-            # If expense model doesn't exist yet, return 0
-            return Decimal('0.00')
+            return self.spending_rollup
+        except BudgetSpendingRollup.DoesNotExist:
+            return None
 
     @property
     def total_spent(self):
-        """Calculate total spent in this category for this month"""
-        return self.get_real_spending_current_month()
+        """Total spent in this category for this month (annotation, else the spending rollup)"""
+        if hasattr(self, 'spent_total'):
+            return self.spent_total
+        rollup = self._get_spending_rollup()
+        return rollup.total_spent if rollup else Decimal('0.00')
+
+    @property
+    def expense_count(self):
+        """Number of expenses recorded against this budget for its month"""
+        if '_expense_count' in self.__dict__:
+            return self._expense_count
+        rollup = self._get_spending_rollup()
+        return rollup.expense_count if rollup else 0
+
+    @expense_count.setter
+    def expense_count(self, value):
+        # Populated by Budget.objects.with_spending()
+        self._expense_count = value
+
+    @property
+    def last_paid(self):
+        """Most recent date an expense was paid for this budget"""
+        rollup = self._get_spending_rollup()
+        return rollup.last_paid if rollup else None
 
     @property
     def remaining_amount(self):
         """Calculate remaining budget amount"""
+        if hasattr(self, 'remaining'):
+            return self.remaining
         return self.amount - self.total_spent
 
     @property
     def spent_percentage(self):
         """Calculate percentage of budget spent"""
+        if hasattr(self, 'spent_pct'):
+            return self.spent_pct
         if self.amount > 0:
             return (self.total_spent / self.amount * 100)
         return 0
@@ -505,29 +532,114 @@ class Budget(models.Model):
         """Check if spending is at warning level (80% of budget)"""
         return self.spent_percentage >= 80
 
+    # Fields that hold related objects; their existence is guaranteed by the caller in bulk_materialize
+    BULK_SKIP_CLEAN_FIELDS = [
+        'space', 'category', 'assigned_to', 'created_by', 'template_used', 'payment_method', 'deleted_by'
+    ]
+
+    @classmethod
+    def bulk_materialize(cls, space, month_period, rows, created_by):
+        """
+        Create many budgets for one space and month in a single transaction
+
+        Each row is a dict of Budget field values that must include 'category'.
+        The batch is validated in memory (one membership query for assigned
+        users), categories that already have a budget for the month are skipped,
+        and the rest are inserted with one bulk_create.
+
+        Returns:
+            list: The newly created budgets
+        """
+        try:
+            datetime.strptime(month_period, '%Y-%m')
+        except (TypeError, ValueError):
+            raise ValidationError('Invalid month format. Use YYYY-MM format.')
+
+        rows = list(rows)
+        if not rows:
+            return []
+
+        existing_category_ids = set(
+            cls.objects.filter(space=space, month_period=month_period).order_by().values_list('category_id', flat=True)
+        )
+
+        candidates = []
+        seen_category_ids = set(existing_category_ids)
+        for row in rows:
+            budget = cls(space=space, month_period=month_period, created_by=created_by, **row)
+            if budget.category_id not in seen_category_ids:
+                seen_category_ids.add(budget.category_id)
+                candidates.append(budget)
+
+        assigned_ids = {budget.assigned_to_id for budget in candidates if budget.assigned_to_id}
+        member_ids = set()
+        if assigned_ids:
+            from spaces.models import SpaceMember
+            member_ids = set(SpaceMember.objects.filter(
+                space=space,
+                user_id__in=assigned_ids,
+                is_active=True
+            ).order_by().values_list('user_id', flat=True))
+
+        new_budgets = []
+        errors = []
+        for budget in candidates:
+            try:
+                budget.clean_fields(exclude=cls.BULK_SKIP_CLEAN_FIELDS)
+                if budget.assigned_to_id and budget.assigned_to_id not in member_ids:
+                    raise ValidationError({'assigned_to': 'Assigned user must be a member of the space'})
+                budget.clean_amount_and_timing()
+            except ValidationError as e:
+                errors.append(f'{budget.category.name}: {"; ".join(e.messages)}')
+                continue
+
+            if budget.is_recurring:
+                budget.update_next_due_date()
+            new_budgets.append(budget)
+
+        if errors:
+            raise ValidationError(errors)
+        if not new_budgets:
+            return []
+
+        with transaction.atomic():
+            cls.objects.bulk_create(new_budgets, ignore_conflicts=True)
+
+            # bulk_create skips the receivers that drop the month's cached insights
+            from .services import BudgetInsightsService
+            BudgetInsightsService.invalidate_insights([
+                BudgetInsightsService.insights_cache_key(space.id, month_period)
+            ])
+
+            # ignore_conflicts leaves primary keys unset, so read the new rows back in one query
+            return list(cls.objects.filter(
+                space=space,
+                month_period=month_period,
+                category_id__in=[budget.category_id for budget in new_budgets]
+            ).select_related('category'))
+
     @classmethod
     def create_monthly_budget(cls, space, month_period, created_by):
         """Create a complete monthly budget for a space using system defaults"""
-        budgets_created = []
-
         # Get system default categories
         system_categories = BudgetCategory.objects.filter(is_system_default=True, is_active=True)
 
-        for category in system_categories:
-            # Set default amounts based on category type
-            default_amounts = {
-                'housing': Decimal('1200.00'),
-                'utilities': Decimal('200.00'),
-                'food': Decimal('400.00'),
-                'transportation': Decimal('300.00'),
-                'healthcare': Decimal('150.00'),
-                'entertainment': Decimal('200.00'),
-                'shopping': Decimal('250.00'),
-                'savings': Decimal('500.00'),
-                'debt': Decimal('300.00'),
-                'other': Decimal('100.00'),
-            }
+        # Set default amounts based on category type
+        default_amounts = {
+            'housing': Decimal('1200.00'),
+            'utilities': Decimal('200.00'),
+            'food': Decimal('400.00'),
+            'transportation': Decimal('300.00'),
+            'healthcare': Decimal('150.00'),
+            'entertainment': Decimal('200.00'),
+            'shopping': Decimal('250.00'),
+            'savings': Decimal('500.00'),
+            'debt': Decimal('300.00'),
+            'other': Decimal('100.00'),
+        }
 
+        rows = []
+        for category in system_categories:
             # Map category names to default amounts
             category_lower = category.name.lower()
             default_amount = Decimal('100.00')  # Default fallback
@@ -537,21 +649,13 @@ class Budget(models.Model):
                     default_amount = amount
                     break
 
-            budget, created = cls.objects.get_or_create(
-                space=space,
-                category=category,
-                month_period=month_period,
-                defaults={
-                    'amount': default_amount,
-                    'created_by': created_by,
-                    'notes': f'Auto-generated budget for {category.name}'
-                }
-            )
-
-            if created:
-                budgets_created.append(budget)
+            rows.append({
+                'category': category,
+                'amount': default_amount,
+                'notes': f'Auto-generated budget for {category.name}'
+            })
 
-        return budgets_created
+        return cls.bulk_materialize(space, month_period, rows, created_by)
 
     @classmethod
     def copy_from_previous_month(cls, space, target_month, created_by):
@@ -575,50 +679,43 @@ class Budget(models.Model):
                 space=space,
                 month_period=previous_month,
                 is_active=True
-            )
+            ).select_related('category')
 
-            budgets_created = []
-            for prev_budget in previous_budgets:
-                budget, created = cls.objects.get_or_create(
-                    space=space,
-                    category=prev_budget.category,
-                    month_period=target_month,
-                    defaults={
-                        'amount': prev_budget.amount,
-                        'assigned_to': prev_budget.assigned_to,
-                        'notes': f'Copied from {previous_month}',
-                        'created_by': created_by,
-                    }
-                )
+            rows = [{
+                'category': prev_budget.category,
+                'amount': prev_budget.amount,
+                'assigned_to_id': prev_budget.assigned_to_id,
+                'notes': f'Copied from {previous_month}',
+            } for prev_budget in previous_budgets]
 
-                if created:
-                    budgets_created.append(budget)
-
-            return budgets_created
+            return cls.bulk_materialize(space, target_month, rows, created_by)
 
         except ValueError:
             raise ValidationError('Invalid month format. Use YYYY-MM format.')
 
     def get_average_real_spending(self, months_back=6):
-        """Calculate average real spending for this budget item over last X months"""
+        """Average monthly spending on this category in the space over the X months before this budget"""
+        from .utils.forecast import previous_periods
+
         try:
-            year, month = map(int, self.month_period.split('-'))
-            real_expenses = ActualExpense.objects.filter(
-                budget_item=self,
-                date_paid__year__gte=year - 1 if month <= months_back else year,
-                date_paid__month__lte=month
+            totals = ActualExpense.objects.filter(
+                budget_item__space_id=self.space_id,
+                budget_item__category_id=self.category_id,
+                month_period__in=previous_periods(self.month_period, months_back)
+            ).aggregate(
+                total=models.Sum('actual_amount'),
+                months=models.Count('month_period', distinct=True)
             )
-
-            if real_expenses.exists():
-                total = sum(expense.actual_amount for expense in real_expenses)
-                return total / real_expenses.count()
+        except ValueError:
             return self.amount
-        except (ValueError, ZeroDivisionError):
+
+        if not totals['months']:
             return self.amount
+        return (totals['total'] / totals['months']).quantize(Decimal('0.01'))
 
     def get_spending_variance(self):
         """Compare estimated vs real spending, return percentage difference"""
-        real_total = self.get_real_spending_current_month()
+        real_total = self.total_spent
         if self.amount == 0:
             return 0
 
@@ -626,12 +723,13 @@ class Budget(models.Model):
         return round(variance, 1)
 
     def get_real_spending_current_month(self):
-        """Get actual spending for current month"""
-        real_expenses = ActualExpense.objects.filter(
+        """Get actual spending for this budget's month straight from the expense table"""
+        return ActualExpense.objects.filter(
             budget_item=self,
             month_period=self.month_period
-        )
-        return sum(expense.actual_amount for expense in real_expenses)
+        ).aggregate(
+            total=models.Sum('actual_amount')
+        )['total'] or Decimal('0.00')
 
     # TIMING SYSTEM METHODS
     @property
@@ -710,34 +808,52 @@ class Budget(models.Model):
         # For now, return basic score
         return 85
 
+    # Months between one recurring budget and the next one the rollover creates
+    RECURRENCE_INTERVAL_MONTHS = {
+        'monthly': 1,
+        'weekly': 1,
+        'biweekly': 1,
+        'quarterly': 3,
+        'yearly': 12,
+    }
+    RECURRENCE_INTERVAL_DAYS = {
+        'weekly': 7,
+        'biweekly': 14,
+    }
+
+    @staticmethod
+    def shift_date(value, months):
+        """Move a date by whole months, clamping the day to the target month's length"""
+        if value is None:
+            return None
+        month_index = value.year * 12 + value.month - 1 + months
+        year, month = divmod(month_index, 12)
+        month += 1
+        return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
     def update_next_due_date(self):
         """Calculate and update next due date for recurring expenses"""
         if not self.is_recurring or not self.expected_day:
             return
 
-        from datetime import datetime, timedelta
-        import calendar
+        from datetime import date, timedelta
 
         try:
             year, month = map(int, self.month_period.split('-'))
-
-            if self.recurrence_type == 'monthly':
-                # Next month, same day
-                if month == 12:
-                    next_year, next_month = year + 1, 1
-                else:
-                    next_year, next_month = year, month + 1
-
-                # Handle month end dates (e.g., Jan 31 -> Feb 28)
-                max_day = calendar.monthrange(next_year, next_month)[1]
-                next_day = min(self.expected_day, max_day)
-
-                self.next_due_date = datetime(next_year, next_month, next_day).date()
-
-            # Add other recurrence types as needed
-
+            # This period's occurrence (e.g. the 31st is the 28th in February)
+            current_due = date(year, month, min(self.expected_day, calendar.monthrange(year, month)[1]))
         except (ValueError, TypeError):
-            pass
+            return
+
+        recurrence_type = self.recurrence_type or 'monthly'
+        if recurrence_type in self.RECURRENCE_INTERVAL_DAYS:
+            self.next_due_date = current_due + timedelta(days=self.RECURRENCE_INTERVAL_DAYS[recurrence_type])
+        elif recurrence_type in self.RECURRENCE_INTERVAL_MONTHS:
+            # Keep the expected day where the target month allows it (Jan 31 -> Feb 28 -> Mar 31)
+            next_due = self.shift_date(current_due.replace(day=1), self.RECURRENCE_INTERVAL_MONTHS[recurrence_type])
+            self.next_due_date = next_due.replace(
+                day=min(self.expected_day, calendar.monthrange(next_due.year, next_due.month)[1])
+            )
 
     # Soft delete methods
     def soft_delete(self, deleted_by=None):
@@ -819,6 +935,10 @@ class ActualExpense(models.Model):
         ordering = ['-date_paid']
         verbose_name = 'Actual Expense'
         verbose_name_plural = 'Actual Expenses'
+        indexes = [
+            # Keyset pagination of a budget's expenses (list_expenses_api)
+            models.Index(fields=['budget_item', '-date_paid', '-id'], name='expense_budget_paid_idx'),
+        ]
 
     def __str__(self):
         return f"{self.budget_item.category.name}: ${self.actual_amount} on {self.date_paid}"
@@ -830,18 +950,148 @@ class ActualExpense(models.Model):
             self.month_period = self.date_paid.strftime('%Y-%m')
 
         # Validate paid_by is member of space
-        if self.paid_by and self.budget_item and self.budget_item.space:
-            from spaces.models import SpaceMember
-            if not SpaceMember.objects.filter(
-                space=self.budget_item.space,
-                user=self.paid_by,
-                is_active=True
-            ).exists():
+        if self.paid_by_id and self.budget_item_id:
+            from spaces.utils import SpaceMembershipResolver
+            if not SpaceMembershipResolver.is_member(self.budget_item.space_id, self.paid_by_id):
                 raise ValidationError({'paid_by': 'User must be a member of the space'})
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        # Keep the expense row, its BudgetSpendingRollup update and its split amounts in one transaction
+        with transaction.atomic():
+            previous_amount = None
+            if self.pk and (update_fields is None or 'actual_amount' in update_fields):
+                previous_amount = ActualExpense.objects.filter(pk=self.pk).values_list(
+                    'actual_amount', flat=True
+                ).first()
+            super().save(*args, **kwargs)
+            if previous_amount is not None and previous_amount != self.actual_amount:
+                self.reallocate_splits()
+
+    def reallocate_splits(self):
+        """Re-allocate the split amounts from their percentages so they add up to the new amount"""
+        from .utils.allocation import SplitAllocator
+
+        splits = list(self.splits.order_by('id'))
+        allocations = SplitAllocator.by_percentage(self.actual_amount, [split.percentage for split in splits])
+        for split, allocation in zip(splits, allocations):
+            split.actual_expense = self
+            split.amount = allocation['amount']
+            split.amount_allocated = True
+            split.save()
+
+
+class BudgetSpendingRollup(models.Model):
+    """Denormalized spending totals per budget, kept in sync with ActualExpense writes"""
+
+    budget = models.OneToOneField(
+        Budget,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='spending_rollup',
+        help_text="Budget these totals belong to"
+    )
+    total_spent = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Sum of actual expenses paid in the budget's month"
+    )
+    expense_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of actual expenses paid in the budget's month"
+    )
+    last_paid = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Most recent date an expense was paid"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'budget_spending_rollups'
+        verbose_name = 'Budget Spending Rollup'
+        verbose_name_plural = 'Budget Spending Rollups'
+
+    def __str__(self):
+        return f"Rollup for budget {self.budget_id}: ${self.total_spent} ({self.expense_count} expenses)"
+
+    @classmethod
+    def add_expense(cls, budget_id, amount, date_paid, month_period):
+        """Add one expense to the rollup (only counted if paid in the budget's month)"""
+        cls.objects.get_or_create(budget_id=budget_id)
+        cls.objects.filter(
+            budget_id=budget_id,
+            budget__month_period=month_period
+        ).update(
+            total_spent=F('total_spent') + amount,
+            expense_count=F('expense_count') + 1,
+            last_paid=Case(
+                When(Q(last_paid__isnull=True) | Q(last_paid__lt=date_paid), then=Value(date_paid)),
+                default=F('last_paid'),
+            ),
+        )
+
+    @classmethod
+    def remove_expense(cls, budget_id, amount, month_period):
+        """Remove one expense from the rollup; last_paid is re-read from the remaining rows"""
+        latest_paid = ActualExpense.objects.filter(
+            budget_item_id=budget_id,
+            month_period=month_period
+        ).order_by('-date_paid').values('date_paid')[:1]
+
+        cls.objects.filter(
+            budget_id=budget_id,
+            budget__month_period=month_period
+        ).update(
+            total_spent=F('total_spent') - amount,
+            expense_count=F('expense_count') - 1,
+            last_paid=Subquery(latest_paid),
+        )
+
+    @classmethod
+    def rebuild(cls, budget_ids=None):
+        """Recompute rollups from scratch with one grouped query (all budgets if none given)"""
+        budgets = Budget.objects.all_including_deleted()
+        if budget_ids is not None:
+            budgets = budgets.filter(id__in=budget_ids)
+
+        totals = {
+            row['budget_item_id']: row
+            for row in ActualExpense.objects.filter(
+                budget_item__in=budgets,
+                month_period=F('budget_item__month_period')
+            ).values('budget_item_id').annotate(
+                total=models.Sum('actual_amount'),
+                count=models.Count('id'),
+                latest=models.Max('date_paid'),
+            )
+        }
+
+        with transaction.atomic():
+            rollups = []
+            for budget_id in budgets.values_list('id', flat=True):
+                row = totals.get(budget_id, {})
+                rollups.append(cls(
+                    budget_id=budget_id,
+                    total_spent=row.get('total') or Decimal('0.00'),
+                    expense_count=row.get('count') or 0,
+                    last_paid=row.get('latest'),
+                ))
+            cls.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=['budget'],
+                update_fields=['total_spent', 'expense_count', 'last_paid', 'updated_at'],
+            )
+
+            from .services import BudgetInsightsService
+            BudgetInsightsService.invalidate_insights(BudgetInsightsService.insights_cache_keys(
+                [rollup.budget_id for rollup in rollups]
+            ))
+
+        return len(rollups)
 
 
 class ExpenseSplit(models.Model):
@@ -878,17 +1128,159 @@ class ExpenseSplit(models.Model):
     def __str__(self):
         return f"{self.user.username}: {self.percentage}% (${self.amount})"
 
+    # Set by callers that assign amount from SplitAllocator, so save() keeps the allocated cents
+    amount_allocated = False
+
+    def calculate_amount(self):
+        """Calculate the amount from the percentage unless it was allocated with the other splits"""
+        if self.amount_allocated and self.amount is not None:
+            return
+        if self.actual_expense_id and self.percentage:
+            from .utils.allocation import SplitAllocator
+            self.amount = SplitAllocator.by_percentage(
+                self.actual_expense.actual_amount, [self.percentage]
+            )[0]['amount']
+
     def clean(self):
         """Custom validation"""
-        if self.actual_expense and self.percentage:
-            # Calculate amount based on percentage
-            self.amount = (self.actual_expense.actual_amount * self.percentage / 100).quantize(Decimal('0.01'))
+        self.calculate_amount()
 
     def save(self, *args, **kwargs):
+        self.calculate_amount()
         self.full_clean()
         super().save(*args, **kwargs)
 
 
+class MemberBalance(models.Model):
+    """Running net balance per member and month, adjusted incrementally as expense splits change"""
+
+    space = models.ForeignKey(
+        'spaces.Space',
+        on_delete=models.CASCADE,
+        related_name='member_balances'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='member_balances'
+    )
+    month_period = models.CharField(
+        max_length=7,
+        help_text="Budget month (YYYY-MM) of the expenses behind this balance"
+    )
+    balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Owed to this member by others minus what this member owes others"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'member_balances'
+        unique_together = [['space', 'user', 'month_period']]
+        verbose_name = 'Member Balance'
+        verbose_name_plural = 'Member Balances'
+
+    def __str__(self):
+        return f"{self.user.username} in {self.month_period}: ${self.balance}"
+
+    # ExpenseSplit lookups identifying one ledger movement: space, month, payer, debtor
+    SPLIT_KEY_FIELDS = (
+        'actual_expense__budget_item__space_id',
+        'actual_expense__budget_item__month_period',
+        'actual_expense__paid_by_id',
+        'user_id',
+    )
+
+    @staticmethod
+    def _owed_splits(splits):
+        """Splits owed to someone else (the payer's own share moves no money)"""
+        return splits.exclude(user_id=F('actual_expense__paid_by_id')).order_by()
+
+    @staticmethod
+    def _deltas(rows, sign=1, deltas=None):
+        """Fold (space_id, month_period, payer_id, user_id, amount) rows into per-member deltas"""
+        deltas = {} if deltas is None else deltas
+        for space_id, month_period, payer_id, user_id, amount in rows:
+            if not amount or payer_id == user_id:
+                continue
+            amount = amount * sign
+            deltas[(space_id, payer_id, month_period)] = deltas.get((space_id, payer_id, month_period), 0) + amount
+            deltas[(space_id, user_id, month_period)] = deltas.get((space_id, user_id, month_period), 0) - amount
+        return deltas
+
+    @classmethod
+    def apply(cls, deltas):
+        """Add {(space_id, user_id, month_period): amount} to the ledger with F() updates"""
+        deltas = {key: amount for key, amount in deltas.items() if amount}
+        if not deltas:
+            return
+
+        with transaction.atomic():
+            cls.objects.bulk_create([
+                cls(space_id=space_id, user_id=user_id, month_period=month_period)
+                for space_id, user_id, month_period in deltas
+            ], ignore_conflicts=True)
+            for (space_id, user_id, month_period), amount in deltas.items():
+                cls.objects.filter(
+                    space_id=space_id, user_id=user_id, month_period=month_period
+                ).update(balance=F('balance') + amount)
+
+    @classmethod
+    def split_rows(cls, splits):
+        """Ledger rows (space_id, month_period, payer_id, user_id, amount) for a queryset of splits"""
+        return list(cls._owed_splits(splits).values_list(*cls.SPLIT_KEY_FIELDS, 'amount'))
+
+    @classmethod
+    def record_splits(cls, splits, sign=1):
+        """Apply (or with sign=-1, reverse) a queryset of splits in one query plus one update per member"""
+        cls.apply(cls._deltas(cls.split_rows(splits), sign))
+
+    @classmethod
+    def replace_rows(cls, previous_rows, current_rows):
+        """Swap what splits contributed before for what they contribute now"""
+        deltas = cls._deltas(previous_rows, sign=-1)
+        cls.apply(cls._deltas(current_rows, deltas=deltas))
+
+    @classmethod
+    def get_balances(cls, space, month_period=None):
+        """Net balance per user_id for a space (all months unless one is given)"""
+        balances = cls.objects.filter(space=space)
+        if month_period:
+            balances = balances.filter(month_period=month_period)
+        return {
+            row['user_id']: row['total']
+            for row in balances.values('user_id').annotate(total=models.Sum('balance')).order_by()
+        }
+
+    @classmethod
+    def rebuild(cls, space_ids=None, month_periods=None):
+        """Recompute the ledger from scratch with one grouped query (all spaces if none given)"""
+        splits = ExpenseSplit.objects.all()
+        balances = cls.objects.all()
+        if space_ids is not None:
+            splits = splits.filter(actual_expense__budget_item__space_id__in=space_ids)
+            balances = balances.filter(space_id__in=space_ids)
+        if month_periods is not None:
+            splits = splits.filter(actual_expense__budget_item__month_period__in=month_periods)
+            balances = balances.filter(month_period__in=month_periods)
+
+        rows = cls._owed_splits(splits).values(*cls.SPLIT_KEY_FIELDS).annotate(
+            total=models.Sum('amount')
+        ).values_list(*cls.SPLIT_KEY_FIELDS, 'total')
+        deltas = cls._deltas(rows)
+
+        with transaction.atomic():
+            balances.delete()
+            cls.objects.bulk_create([
+                cls(space_id=space_id, user_id=user_id, month_period=month_period, balance=amount)
+                for (space_id, user_id, month_period), amount in deltas.items()
+            ], batch_size=500)
+
+        return len(deltas)
+
+
 class BudgetTemplate(models.Model):
     """Predefined templates for quick budget creation with frameworks and situations"""
 
@@ -1362,46 +1754,136 @@ class SpendingBehaviorAnalysis(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.category.name} behavior in {self.space.name}"
 
-    def update_from_expenses(self):
-        """Update analysis based on recent expense patterns"""
-        from datetime import datetime, timedelta
-        from collections import Counter
-
-        # Get recent expenses for this user/category/space
-        recent_expenses = ActualExpense.objects.filter(
-            budget_item__space=self.space,
-            budget_item__category=self.category,
-            paid_by=self.user,
-            date_paid__gte=timezone.now() - timedelta(days=180)  # Last 6 months
-        ).order_by('-date_paid')
-
-        if not recent_expenses.exists():
-            return
-
-        self.data_points_count = recent_expenses.count()
+    ANALYSIS_WINDOW_DAYS = 180  # Last 6 months
+    DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    BATCH_UPDATE_FIELDS = [
+        'preferred_day_of_week', 'pattern_confidence', 'data_points_count',
+        'optimal_timing_suggestion', 'last_analysis_date',
+    ]
 
-        # Analyze day of week patterns
-        days_of_week = [expense.date_paid.weekday() + 1 for expense in recent_expenses]  # 1=Monday
-        if days_of_week:
-            day_counter = Counter(days_of_week)
-            self.preferred_day_of_week = day_counter.most_common(1)[0][0]
+    @classmethod
+    def _weekday_counts(cls, expenses):
+        """Count expenses per (user, space, category, ISO weekday) in one GROUP BY query"""
+        from django.db.models.functions import ExtractIsoWeekDay
+
+        return expenses.filter(
+            date_paid__gte=timezone.now().date() - timedelta(days=cls.ANALYSIS_WINDOW_DAYS)
+        ).values(
+            analysis_user=F('paid_by_id'),
+            analysis_space=F('budget_item__space_id'),
+            analysis_category=F('budget_item__category_id'),
+            weekday=ExtractIsoWeekDay('date_paid'),
+        ).annotate(
+            count=models.Count('id')
+        ).order_by('analysis_user', 'analysis_space', 'analysis_category', 'weekday')
+
+    def apply_weekday_histogram(self, histogram):
+        """Set the pattern fields from {ISO weekday (1=Monday): expense count}"""
+        self.data_points_count = sum(histogram.values())
+        # Most common day; ties go to the earlier day of the week
+        self.preferred_day_of_week, top_count = max(
+            sorted(histogram.items()), key=lambda item: item[1]
+        )
 
         # Calculate confidence based on data points and consistency
         if self.data_points_count >= 3:
-            # Simple confidence calculation - can be enhanced
-            consistency_ratio = day_counter.most_common(1)[0][1] / self.data_points_count
-            self.pattern_confidence = min(consistency_ratio * 100, 100)
+            consistency_ratio = top_count / self.data_points_count
+            self.pattern_confidence = Decimal(min(consistency_ratio * 100, 100)).quantize(Decimal('0.01'))
         else:
-            self.pattern_confidence = 0
+            self.pattern_confidence = Decimal('0.00')
 
         # Generate optimal timing suggestion
-        if self.preferred_day_of_week and self.pattern_confidence > 50:
-            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            day_name = day_names[self.preferred_day_of_week - 1]
+        if self.pattern_confidence > 50:
+            day_name = self.DAY_NAMES[self.preferred_day_of_week - 1]
             self.optimal_timing_suggestion = f"You typically spend on {day_name}s"
+        else:
+            self.optimal_timing_suggestion = ''
 
+    def update_from_expenses(self):
+        """Update analysis based on recent expense patterns"""
+        histogram = {
+            row['weekday']: row['count']
+            for row in self._weekday_counts(ActualExpense.objects.filter(
+                budget_item__space=self.space,
+                budget_item__category=self.category,
+                paid_by=self.user,
+            ))
+        }
+        if not histogram:
+            return
+
+        self.apply_weekday_histogram(histogram)
         self.save()
 
+    @classmethod
+    def analyze_batch(cls, space_ids=None, incremental=False, since=None, chunk_size=2000, batch_size=500):
+        """
+        Recompute analyses for every (user, space, category) with recent expenses
+
+        Weekday histograms come from one grouped query that is streamed and upserted
+        in batches. In incremental mode only combinations with expenses created
+        since their own analysis was last written (or since `since`), or with no
+        analysis yet, are reprocessed.
+
+        Returns:
+            int: Number of analyses written
+        """
+        from itertools import groupby
+
+        expenses = ActualExpense.objects.all()
+        if space_ids is not None:
+            expenses = expenses.filter(budget_item__space_id__in=space_ids)
+
+        if incremental:
+            if since:
+                changed = Q(created_at__gte=since)
+            else:
+                # Compare each combination against its own analysis, not a global last run
+                analysis = cls.objects.filter(
+                    user=OuterRef('paid_by'),
+                    space=OuterRef('budget_item__space'),
+                    category=OuterRef('budget_item__category'),
+                )
+                changed = (
+                    Q(created_at__gte=Subquery(analysis.values('last_analysis_date')[:1]))
+                    | ~models.Exists(analysis)
+                )
+            expenses = expenses.filter(models.Exists(ActualExpense.objects.filter(
+                changed,
+                paid_by=OuterRef('paid_by'),
+                budget_item__space=OuterRef('budget_item__space'),
+                budget_item__category=OuterRef('budget_item__category'),
+            )))
+
+        def upsert(analyses):
+            cls.objects.bulk_create(
+                analyses,
+                update_conflicts=True,
+                unique_fields=['user', 'space', 'category'],
+                update_fields=cls.BATCH_UPDATE_FIELDS,
+            )
+
+        written = 0
+        pending = []
+        rows = cls._weekday_counts(expenses).iterator(chunk_size=chunk_size)
+        for (user_id, space_id, category_id), group in groupby(
+            rows, key=lambda row: (row['analysis_user'], row['analysis_space'], row['analysis_category'])
+        ):
+            analysis = cls(user_id=user_id, space_id=space_id, category_id=category_id)
+            analysis.apply_weekday_histogram({row['weekday']: row['count'] for row in group})
+            pending.append(analysis)
+
+            if len(pending) >= batch_size:
+                upsert(pending)
+                written += len(pending)
+                pending = []
+
+        if pending:
+            upsert(pending)
+            written += len(pending)
+
+        return written
+
     def get_smart_suggestion(self):
         """Get personalized timing suggestion for this category"""
         if self.pattern_confidence < 30:
@@ -1557,14 +2039,151 @@ class BudgetSplit(models.Model):
         else:
             return f"{user_name}: ${self.fixed_amount}"
 
+    def allocation_part(self):
+        """This split as a (split_type, value) part for SplitAllocator, or None if incomplete"""
+        if self.split_type == 'percentage' and self.percentage:
+            return ('percentage', self.percentage)
+        if self.split_type == 'fixed_amount' and self.fixed_amount:
+            return ('fixed_amount', self.fixed_amount)
+        return None
+
+    @classmethod
+    def allocate(cls, budget_amount, splits):
+        """Set calculated_amount on a budget's splits together, so percentage shares add up exactly"""
+        from .utils.allocation import SplitAllocator
+
+        splits = [split for split in splits if split.allocation_part()]
+        allocations = SplitAllocator.allocate(budget_amount, [split.allocation_part() for split in splits])
+        for split, allocation in zip(splits, allocations):
+            split.calculated_amount = allocation['amount']
+
+    def calculate_amount(self):
+        """Set calculated_amount from the split type (also used before bulk_create)"""
+        BudgetSplit.allocate(self.budget.amount, [self])
+
     def save(self, *args, **kwargs):
         """Calculate the amount based on split type"""
-        if self.split_type == 'percentage' and self.percentage:
-            self.calculated_amount = (self.budget.amount * self.percentage / 100).quantize(Decimal('0.01'))
-        elif self.split_type == 'fixed_amount' and self.fixed_amount:
-            self.calculated_amount = self.fixed_amount
+        self.calculate_amount()
         super().save(*args, **kwargs)
 
 
 # Import approval workflow models
 from .approval_models import BudgetChangeRequest, BudgetChangeVote, ChangeHistoryLog
+
+
+# Keep BudgetSpendingRollup in sync with ActualExpense writes
+ROLLUP_EXPENSE_FIELDS = {'budget_item', 'actual_amount', 'date_paid', 'month_period'}
+
+
+@receiver(pre_save, sender=ActualExpense)
+def remember_expense_rollup_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember what an existing expense contributed before it is updated"""
+    instance._rollup_previous = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not ROLLUP_EXPENSE_FIELDS.intersection(update_fields):
+        return
+    instance._rollup_previous = ActualExpense.objects.filter(pk=instance.pk).values(
+        'budget_item_id', 'actual_amount', 'month_period'
+    ).first()
+
+
+@receiver(post_save, sender=ActualExpense)
+def update_rollup_on_expense_save(sender, instance, created, raw=False, **kwargs):
+    """Apply an expense create/update to the spending rollup"""
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if not created and previous is None:
+        return
+    if previous:
+        BudgetSpendingRollup.remove_expense(
+            previous['budget_item_id'], previous['actual_amount'], previous['month_period']
+        )
+    BudgetSpendingRollup.add_expense(
+        instance.budget_item_id, instance.actual_amount, instance.date_paid, instance.month_period
+    )
+    instance._rollup_previous = None
+
+    from .services import BudgetInsightsService
+    keys = {BudgetInsightsService.insights_cache_key(instance.budget_item.space_id, instance.budget_item.month_period)}
+    if previous and previous['budget_item_id'] != instance.budget_item_id:
+        keys |= BudgetInsightsService.insights_cache_keys([previous['budget_item_id']])
+    BudgetInsightsService.invalidate_insights(keys)
+
+
+@receiver(post_delete, sender=ActualExpense)
+def update_rollup_on_expense_delete(sender, instance, **kwargs):
+    """Remove a deleted expense from the spending rollup"""
+    BudgetSpendingRollup.remove_expense(
+        instance.budget_item_id, instance.actual_amount, instance.month_period
+    )
+
+    from .services import BudgetInsightsService
+    BudgetInsightsService.invalidate_insights(BudgetInsightsService.insights_cache_keys([instance.budget_item_id]))
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_insights_on_budget_change(sender, instance, raw=False, **kwargs):
+    """A budget's amount, estimate flag or activity changes its month's insights"""
+    if raw:
+        return
+    from .services import BudgetInsightsService
+    BudgetInsightsService.invalidate_insights([
+        BudgetInsightsService.insights_cache_key(instance.space_id, instance.month_period)
+    ])
+
+
+# Keep the MemberBalance ledger in sync with ExpenseSplit writes
+LEDGER_EXPENSE_FIELDS = {'budget_item', 'paid_by'}
+
+
+@receiver(pre_save, sender=ExpenseSplit)
+def remember_split_ledger_state(sender, instance, raw=False, **kwargs):
+    """Remember what an existing split contributed to the ledger before it is updated"""
+    instance._ledger_previous = []
+    if raw or not instance.pk:
+        return
+    instance._ledger_previous = MemberBalance.split_rows(ExpenseSplit.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=ExpenseSplit)
+def update_ledger_on_split_save(sender, instance, raw=False, **kwargs):
+    """Apply a split create/update to the member balance ledger"""
+    if raw:
+        return
+    MemberBalance.replace_rows(
+        getattr(instance, '_ledger_previous', []),
+        MemberBalance.split_rows(ExpenseSplit.objects.filter(pk=instance.pk))
+    )
+    instance._ledger_previous = []
+
+
+@receiver(pre_delete, sender=ExpenseSplit)
+def update_ledger_on_split_delete(sender, instance, **kwargs):
+    """Reverse a split before it is deleted (its expense is still readable here, even on cascade)"""
+    MemberBalance.record_splits(ExpenseSplit.objects.filter(pk=instance.pk), sign=-1)
+
+
+@receiver(pre_save, sender=ActualExpense)
+def remember_expense_ledger_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember an existing expense's split contributions in case its payer or budget changes"""
+    instance._ledger_previous = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not LEDGER_EXPENSE_FIELDS.intersection(update_fields):
+        return
+    instance._ledger_previous = MemberBalance.split_rows(ExpenseSplit.objects.filter(actual_expense_id=instance.pk))
+
+
+@receiver(post_save, sender=ActualExpense)
+def update_ledger_on_expense_save(sender, instance, created, raw=False, **kwargs):
+    """Move an expense's split contributions when its payer or budget changed"""
+    previous = getattr(instance, '_ledger_previous', None)
+    if raw or created or previous is None:
+        return
+    current = MemberBalance.split_rows(ExpenseSplit.objects.filter(actual_expense_id=instance.pk))
+    if current != previous:
+        MemberBalance.replace_rows(previous, current)
+    instance._ledger_previous = None
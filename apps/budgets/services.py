@@ -1,9 +1,24 @@
 from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from decimal import Decimal
-from .models import Budget
-from .approval_models import BudgetChangeRequest, ChangeHistoryLog
-from spaces.models import SpaceSettings
+from decimal import InvalidOperation
+from datetime import datetime, time, timedelta
+import base64
+import binascii
+import calendar
+from itertools import groupby
+from operator import itemgetter
+from .models import Budget, BudgetCategory, BudgetSplit, PaymentMethod, ActualExpense, ExpenseSplit, BudgetSpendingRollup, MemberBalance
+from .approval_models import BudgetChangeRequest, BudgetChangeVote, ChangeHistoryLog
+from spaces.models import SpaceSettings, SpaceMember
+from .utils.allocation import SplitAllocator
+from .utils.forecast import SpendingForecaster
+
+User = get_user_model()
 
 
 class BudgetChangeService:
@@ -101,12 +116,7 @@ class BudgetChangeService:
         """Check if a change requires approval based on space settings"""
 
         # Determine if expense is shared (has assignment or multiple members)
-        from spaces.models import SpaceMember
-        member_count = SpaceMember.objects.filter(
-            space=budget_item.space,
-            is_active=True
-        ).count()
-        is_shared = member_count > 1
+        is_shared = budget_item.space.member_count > 1
 
         # Determine if it's recurring
         is_recurring = budget_item.is_recurring
@@ -170,68 +180,343 @@ class BudgetChangeService:
         return NotificationService.send_approval_request_notification(change_request)
 
     @staticmethod
-    def check_expired_requests():
-        """Check for expired requests and auto-approve them"""
-        expired_requests = BudgetChangeRequest.objects.filter(
-            status='pending',
-            expires_at__lte=timezone.now()
+    def _claim_expired_requests(now, chunk_size, exclude_ids):
+        """Lock the next chunk of expired pending requests, skipping rows other workers hold"""
+        return list(
+            BudgetChangeRequest.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                status='pending',
+                expires_at__lte=now
+            ).exclude(
+                id__in=exclude_ids
+            ).select_related(
+                'budget_item__space__settings', 'budget_item__category', 'requested_by'
+            ).order_by('expires_at', 'id')[:chunk_size]
         )
 
+    @staticmethod
+    def _share_budget_items(change_requests):
+        """Point requests for the same budget at one instance, so applying one cannot undo another"""
+        budgets = {}
+        for change_request in change_requests:
+            change_request.budget_item = budgets.setdefault(change_request.budget_item_id, change_request.budget_item)
+
+    @staticmethod
+    def _apply_shared(change_request):
+        """Apply and save a request's change; on failure reload the shared budget so later requests start clean"""
+        try:
+            with transaction.atomic():
+                change_request.apply_to_budget()
+                change_request.budget_item.save()
+        except Exception:
+            change_request.budget_item.refresh_from_db()
+            raise
+
+    @staticmethod
+    def check_expired_requests(chunk_size=100):
+        """
+        Auto-approve expired requests in chunks
+
+        Each chunk is claimed with select_for_update(skip_locked=True), so several
+        workers can run at once without processing the same request twice. The
+        claimed requests are applied, then saved with one bulk_update and logged
+        with one bulk_create before the lock is released; the requesters are
+        notified in bulk after each chunk commits. Requests whose change cannot be
+        applied stay pending and are skipped for the rest of the run.
+
+        Returns:
+            int: Number of requests auto-approved
+        """
+        from notifications.services import NotificationService
+
+        now = timezone.now()
+        failed_ids = []
         auto_approved_count = 0
-        for request in expired_requests:
-            if request.check_auto_approval():
-                auto_approved_count += 1
+
+        while True:
+            with transaction.atomic():
+                claimed = BudgetChangeService._claim_expired_requests(now, chunk_size, failed_ids)
+                if not claimed:
+                    break
+                BudgetChangeService._share_budget_items(claimed)
+
+                approved = []
+                for change_request in claimed:
+                    try:
+                        change_request.mark_auto_approved(now)
+                        BudgetChangeService._apply_shared(change_request)
+                    except Exception:
+                        failed_ids.append(change_request.id)
+                        continue
+                    approved.append(change_request)
+
+                BudgetChangeRequest.objects.bulk_update(
+                    approved, ['status', 'auto_approved_at', 'auto_approval_reason', 'updated_at']
+                )
+                ChangeHistoryLog.objects.bulk_create([
+                    change_request.build_history_log() for change_request in approved
+                ])
+
+            # bulk_update() skips the post_save receivers that reset the badge counts; wait for
+            # commit so a badge read cannot re-cache the old count (also inside a caller's transaction)
+            space_ids = {change_request.budget_item.space_id for change_request in approved}
+            transaction.on_commit(lambda space_ids=space_ids: BudgetChangeRequest.invalidate_pending_counts(space_ids))
+            NotificationService.send_approval_result_notifications(approved, 'approval_auto_approved')
+            auto_approved_count += len(approved)
 
         return auto_approved_count
 
     @staticmethod
-    def get_pending_approvals_for_user(user):
-        """Get all pending approval requests for a specific user"""
-        from spaces.models import SpaceMember
+    def decide_batch(user, decisions):
+        """
+        Approve or reject many change requests for one voter
 
-        # Get all spaces user is a member of
-        user_spaces = SpaceMember.objects.filter(
-            user=user,
-            is_active=True
-        ).values_list('space_id', flat=True)
+        Membership is resolved once, the requests are locked with one
+        SELECT ... FOR UPDATE, and the votes, request updates and history logs are
+        written with one bulk statement each. Requesters get one summary
+        notification each after the transaction commits.
+
+        Args:
+            user: The voting user
+            decisions: [{'id': request ID, 'decision': 'approve' | 'reject', 'reason': str}]
+
+        Returns:
+            dict: {'approved': [IDs], 'rejected': [IDs], 'recorded': [IDs approved but
+                still waiting on other members], 'errors': {ID: message}}
+        """
+        from spaces.utils import SpaceMembershipResolver
+
+        wanted = {}
+        errors = {}
+        for item in decisions:
+            if not isinstance(item, dict):
+                continue
+            decision = item.get('decision')
+            try:
+                request_id = int(item.get('id'))
+            except (TypeError, ValueError):
+                errors[str(item.get('id'))] = 'Invalid request ID'
+                continue
+            if decision not in ('approve', 'reject'):
+                errors[str(request_id)] = 'Decision must be "approve" or "reject"'
+                continue
+            wanted[request_id] = (decision, str(item.get('reason') or '')[:500])
+
+        results = {'approved': [], 'rejected': [], 'recorded': []}
+        if not wanted:
+            return {**results, 'errors': errors}
+
+        space_ids = list(SpaceMembershipResolver.get_roles(user))
+        now = timezone.now()
+
+        with transaction.atomic():
+            locked = BudgetChangeRequest.objects.select_for_update(of=('self',)).filter(
+                id__in=wanted,
+                status='pending',
+                budget_item__space_id__in=space_ids
+            ).exclude(
+                requested_by=user
+            ).exclude(
+                votes__user=user
+            ).select_related(
+                'budget_item__space__settings', 'budget_item__category', 'requested_by'
+            ).order_by('id')
+            locked = list(locked)
+            BudgetChangeService._share_budget_items(locked)
+
+            votes = []
+            changed = []
+            logs = []
+            for change_request in locked:
+                decision, reason = wanted[change_request.id]
+
+                if decision == 'reject':
+                    change_request.status = 'rejected'
+                    results['rejected'].append(change_request.id)
+                else:
+                    change_request.received_approvals += 1
+                    if change_request.received_approvals >= change_request.required_approvals:
+                        change_request.status = 'approved'
+                        try:
+                            BudgetChangeService._apply_shared(change_request)
+                        except Exception as e:
+                            errors[str(change_request.id)] = f'Failed to apply change: {e}'
+                            continue
+                        logs.append(change_request.build_history_log())
+                        results['approved'].append(change_request.id)
+                    else:
+                        results['recorded'].append(change_request.id)
+
+                change_request.updated_at = now
+                votes.append(BudgetChangeVote(change_request=change_request, user=user, vote=decision, reason=reason))
+                changed.append(change_request)
+
+            BudgetChangeVote.objects.bulk_create(votes)
+            BudgetChangeRequest.objects.bulk_update(changed, ['received_approvals', 'status', 'updated_at'])
+            ChangeHistoryLog.objects.bulk_create(logs)
 
-        # Get pending requests in those spaces, excluding user's own requests
-        pending_requests = BudgetChangeRequest.objects.filter(
-            budget_item__space_id__in=user_spaces,
+            transaction.on_commit(lambda: BudgetChangeService._after_batch_decision(changed))
+
+        handled = {change_request.id for change_request in changed}
+        for request_id in wanted:
+            if request_id not in handled and str(request_id) not in errors:
+                errors[str(request_id)] = 'Request is not pending or you cannot vote on it'
+
+        return {**results, 'errors': errors}
+
+    @staticmethod
+    def _after_batch_decision(changed):
+        """Reset badge counts and notify requesters once a batch decision has committed"""
+        from notifications.services import NotificationService
+
+        # bulk writes skip the receivers that reset the badge counts
+        BudgetChangeRequest.invalidate_pending_counts(
+            {change_request.budget_item.space_id for change_request in changed}
+        )
+        NotificationService.send_approval_batch_notifications(changed)
+
+    @staticmethod
+    def _pending_approvals_queryset(user):
+        """Pending requests in the user's spaces that are not theirs and that they have not voted on"""
+        return BudgetChangeRequest.objects.filter(
+            models.Exists(SpaceMember.objects.filter(
+                space_id=models.OuterRef('budget_item__space_id'),
+                user=user,
+                is_active=True
+            )),
             status='pending'
         ).exclude(
             requested_by=user
         ).exclude(
-            votes__user=user  # Exclude already voted
+            models.Exists(BudgetChangeVote.objects.filter(
+                change_request_id=models.OuterRef('pk'),
+                user=user
+            ))
         )
 
-        return pending_requests
+    @staticmethod
+    def get_pending_approvals_for_user(user):
+        """
+        Get all pending approval requests for a specific user
+
+        Membership and "already voted" are EXISTS subqueries, and everything the
+        inbox renders (item, category, space, requester, votes) is fetched up front.
+        """
+        return BudgetChangeService._pending_approvals_queryset(user).select_related(
+            'budget_item__category', 'budget_item__space', 'requested_by'
+        ).prefetch_related('votes__user')
+
+    @staticmethod
+    def get_pending_approval_count(user):
+        """Number of requests waiting on the user, cached until a request or vote changes it"""
+        key = BudgetChangeRequest.pending_count_cache_key(user.pk)
+        count = cache.get(key)
+        if count is None:
+            count = BudgetChangeService._pending_approvals_queryset(user).count()
+            cache.set(key, count, BudgetChangeRequest.PENDING_COUNT_CACHE_TIMEOUT)
+        return count
 
     @staticmethod
     def get_space_change_history(space, limit=20):
         """Get recent change history for a space"""
         return ChangeHistoryLog.objects.filter(
             space=space
-        ).order_by('-timestamp')[:limit]
+        ).select_related('changed_by', 'change_request').order_by('-timestamp', '-id')[:limit]
+
+    @staticmethod
+    def encode_history_cursor(timestamp, log_id):
+        """Opaque cursor for the (timestamp, id) position of the last log entry on a page"""
+        return base64.urlsafe_b64encode(f'{timestamp.isoformat()}|{log_id}'.encode()).decode()
+
+    @staticmethod
+    def decode_history_cursor(cursor):
+        """Get (timestamp, id) back from a cursor; raises ValueError if it is malformed"""
+        try:
+            timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(timestamp), int(log_id)
+        except (UnicodeDecodeError, binascii.Error) as e:
+            raise ValueError(str(e))
+
+    @staticmethod
+    def get_change_history_page(space, limit=50, cursor=None, change_type=None, since=None, until=None):
+        """
+        One page of a space's change history, newest first
+
+        Keyset-paginated on (timestamp, id), which the (space, -timestamp, -id)
+        index serves directly, so later pages cost the same as the first.
+
+        Args:
+            space: Space whose history to read
+            limit: Entries per page
+            cursor: next_cursor from the previous page
+            change_type: Only entries of this change type
+            since: Only entries on or after this date
+            until: Only entries on or before this date
+
+        Returns:
+            dict: {'entries': [ChangeHistoryLog], 'has_more': bool, 'next_cursor': str or None}
+        """
+        history = ChangeHistoryLog.objects.filter(space=space)
+
+        if change_type:
+            history = history.filter(change_type=change_type)
+        # Compare against datetime bounds rather than timestamp__date so the index stays usable
+        if since:
+            history = history.filter(timestamp__gte=timezone.make_aware(datetime.combine(since, time.min)))
+        if until:
+            history = history.filter(
+                timestamp__lt=timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min))
+            )
+        if cursor:
+            cursor_timestamp, cursor_id = BudgetChangeService.decode_history_cursor(cursor)
+            history = history.filter(
+                models.Q(timestamp__lt=cursor_timestamp) | models.Q(timestamp=cursor_timestamp, id__lt=cursor_id)
+            )
+
+        # Fetch one extra row to know whether another page exists
+        entries = list(history.select_related(
+            'changed_by', 'change_request'
+        ).prefetch_related('approved_by').order_by('-timestamp', '-id')[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        return {
+            'entries': entries,
+            'has_more': has_more,
+            'next_cursor': (
+                BudgetChangeService.encode_history_cursor(entries[-1].timestamp, entries[-1].id) if has_more else None
+            ),
+        }
 
 
 class BudgetInsightsService:
     """Service for generating budget insights and recommendations"""
 
+    INSIGHTS_CACHE_TIMEOUT = 60 * 60 * 26  # Refreshed by the nightly generate_budget_insights run
+
     @staticmethod
-    def generate_monthly_insights(space, month_period):
-        """Generate insights for a space's budget performance"""
-        insights = []
+    def insights_cache_key(space_id, month_period):
+        """Cache key for one space-month of insights"""
+        return f'budgets:insights:{space_id}:{month_period}'
 
-        # Get all budgets for the month
-        budgets = Budget.objects.filter(
-            space=space,
-            month_period=month_period,
-            is_active=True
+    @staticmethod
+    def _insight_rows(budgets):
+        """Reduce budgets to the fields insights need, with spending joined from the rollup"""
+        return budgets.values(
+            'space_id', 'month_period', 'amount', 'is_estimated',
+            category_name=models.F('category__name'),
+            spent=Coalesce(
+                'spending_rollup__total_spent', models.Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
         )
 
-        total_budgeted = sum(budget.amount for budget in budgets)
-        total_spent = sum(budget.total_spent for budget in budgets)
+    @staticmethod
+    def _build_insights(rows):
+        """Build insights from one space-month of budget rows"""
+        insights = []
+
+        total_budgeted = sum((row['amount'] for row in rows), Decimal('0.00'))
+        total_spent = sum((row['spent'] for row in rows), Decimal('0.00'))
 
         # Overall budget performance
         if total_budgeted > 0:
@@ -255,35 +540,173 @@ class BudgetInsightsService:
                 })
 
         # Category-specific insights
-        for budget in budgets:
-            if budget.is_estimated:
-                variance = budget.get_spending_variance()
-
-                if variance > 15:  # 15% over estimate
-                    insights.append({
-                        'type': 'overspend_warning',
-                        'title': f'{budget.category.name} Over Estimate',
-                        'message': f'Spending {variance:.1f}% more than estimated. Consider adjusting estimate.',
-                        'amount': budget.total_spent - budget.amount,
-                        'category': budget.category.name
-                    })
-                elif variance < -15:  # 15% under estimate
-                    insights.append({
-                        'type': 'savings_opportunity',
-                        'title': f'{budget.category.name} Under Estimate',
-                        'message': f'Spending {abs(variance):.1f}% less than estimated. Good job!',
-                        'amount': budget.amount - budget.total_spent,
-                        'category': budget.category.name
-                    })
+        for row in rows:
+            if not row['is_estimated'] or row['amount'] == 0:
+                continue
+
+            variance = round(((row['spent'] - row['amount']) / row['amount']) * 100, 1)
+
+            if variance > 15:  # 15% over estimate
+                insights.append({
+                    'type': 'overspend_warning',
+                    'title': f'{row["category_name"]} Over Estimate',
+                    'message': f'Spending {variance:.1f}% more than estimated. Consider adjusting estimate.',
+                    'amount': row['spent'] - row['amount'],
+                    'category': row['category_name']
+                })
+            elif variance < -15:  # 15% under estimate
+                insights.append({
+                    'type': 'savings_opportunity',
+                    'title': f'{row["category_name"]} Under Estimate',
+                    'message': f'Spending {abs(variance):.1f}% less than estimated. Good job!',
+                    'amount': row['amount'] - row['spent'],
+                    'category': row['category_name']
+                })
 
         return insights
 
     @staticmethod
-    def get_balance_recommendations(space):
-        """Get recommendations for balancing member expenses"""
-        # This would calculate who owes what and suggest balancing actions
-        # Implementation depends on expense splitting logic
-        return []
+    def generate_monthly_insights(space, month_period):
+        """Generate insights for a space's budget performance"""
+        budgets = Budget.objects.filter(
+            space=space,
+            month_period=month_period,
+            is_active=True
+        ).order_by('id')
+
+        rows = list(BudgetInsightsService._insight_rows(budgets))
+        return BudgetInsightsService._build_insights(rows)
+
+    @staticmethod
+    def insights_cache_keys(budget_ids):
+        """Insight cache keys of the space-months the given budgets belong to"""
+        return {
+            BudgetInsightsService.insights_cache_key(space_id, month_period)
+            for space_id, month_period in Budget.objects.filter(
+                id__in=budget_ids
+            ).order_by().values_list('space_id', 'month_period').distinct()
+        }
+
+    @staticmethod
+    def invalidate_insights(keys):
+        """Drop cached insights after the transaction commits, so a read cannot re-cache the old totals"""
+        keys = set(keys)
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def get_monthly_insights(space, month_period):
+        """Insights for a space-month, from the nightly batch when cached, else generated and cached"""
+        key = BudgetInsightsService.insights_cache_key(space.id, month_period)
+        insights = cache.get(key)
+        if insights is None:
+            insights = BudgetInsightsService.generate_monthly_insights(space, month_period)
+            cache.set(key, insights, BudgetInsightsService.INSIGHTS_CACHE_TIMEOUT)
+        return insights
+
+    @staticmethod
+    def store_insights(insights_by_key):
+        """Cache a batch of insights, {insights_cache_key: insights}, in one write"""
+        cache.set_many(insights_by_key, BudgetInsightsService.INSIGHTS_CACHE_TIMEOUT)
+
+    @staticmethod
+    def generate_insights_batch(month_periods=None, space_ids=None, chunk_size=2000):
+        """
+        Generate insights for many spaces and months from one streamed query
+
+        Yields:
+            tuple: (space_id, month_period, insights) for every space-month with active budgets
+        """
+        budgets = Budget.objects.filter(is_active=True)
+        if month_periods:
+            budgets = budgets.filter(month_period__in=month_periods)
+        if space_ids:
+            budgets = budgets.filter(space_id__in=space_ids)
+        budgets = budgets.order_by('space_id', 'month_period', 'id')
+
+        rows = BudgetInsightsService._insight_rows(budgets).iterator(chunk_size=chunk_size)
+        for (space_id, month_period), group in groupby(rows, key=itemgetter('space_id', 'month_period')):
+            yield space_id, month_period, BudgetInsightsService._build_insights(list(group))
+
+    @staticmethod
+    def get_member_balances(space, month_period=None):
+        """
+        Net balance in cents per member: what others owe them minus what they owe others
+
+        Read from the MemberBalance ledger, so the cost grows with members and
+        months rather than with the number of expenses.
+
+        Returns:
+            dict: {user_id: net cents}; positive means the member is owed money
+        """
+        return {
+            user_id: SplitAllocator.to_cents(total)
+            for user_id, total in MemberBalance.get_balances(space, month_period).items()
+            if total
+        }
+
+    @staticmethod
+    def settle_balances(balances):
+        """
+        Turn net balances into a minimal set of transfers (greedy min cash flow)
+
+        The largest debtor repeatedly pays the largest creditor, so every transfer
+        settles at least one member and at most n - 1 transfers are needed.
+
+        Args:
+            balances: {user_id: net cents}, summing to zero
+
+        Returns:
+            list: (from_user_id, to_user_id, cents) tuples, largest first
+        """
+        import heapq
+
+        creditors = [(-cents, user_id) for user_id, cents in balances.items() if cents > 0]
+        debtors = [(cents, user_id) for user_id, cents in balances.items() if cents < 0]
+        heapq.heapify(creditors)
+        heapq.heapify(debtors)
+
+        transfers = []
+        while creditors and debtors:
+            credit, creditor_id = heapq.heappop(creditors)
+            debt, debtor_id = heapq.heappop(debtors)
+            cents = min(-credit, -debt)
+            transfers.append((debtor_id, creditor_id, cents))
+
+            if -credit > cents:
+                heapq.heappush(creditors, (credit + cents, creditor_id))
+            if -debt > cents:
+                heapq.heappush(debtors, (debt + cents, debtor_id))
+
+        return transfers
+
+    @staticmethod
+    def get_balance_recommendations(space, month_period=None):
+        """
+        Get recommendations for balancing member expenses
+
+        Returns:
+            list: {'from_user', 'to_user', 'amount', 'message'} per suggested transfer
+        """
+        transfers = BudgetInsightsService.settle_balances(
+            BudgetInsightsService.get_member_balances(space, month_period)
+        )
+        if not transfers:
+            return []
+
+        users = User.objects.in_bulk({user_id for transfer in transfers for user_id in transfer[:2]})
+        recommendations = []
+        for from_user_id, to_user_id, cents in transfers:
+            from_user = users.get(from_user_id)
+            to_user = users.get(to_user_id)
+            amount = SplitAllocator.from_cents(cents)
+            recommendations.append({
+                'from_user': from_user,
+                'to_user': to_user,
+                'amount': amount,
+                'message': f'{from_user.username} pays {to_user.username} ${amount}',
+            })
+        return recommendations
 
     @staticmethod
     def predict_monthly_spending(budget_item):
@@ -291,6 +714,717 @@ class BudgetInsightsService:
         if not budget_item.is_estimated:
             return budget_item.amount
 
-        # Calculate average from historical data
-        average_spending = budget_item.get_average_real_spending()
-        return average_spending
\ No newline at end of file
+        forecast = SpendingForecaster.forecast_space(
+            budget_item.space, budget_item.month_period
+        ).get(budget_item.category_id)
+        if forecast:
+            return forecast['amount']
+
+        # No history for this category yet
+        return budget_item.get_average_real_spending()
+
+
+class BudgetAnalyticsService:
+    """Service for multi-month budgeted vs. actual analytics"""
+
+    DEFAULT_MONTHS = 6
+    MAX_MONTHS = 60
+    RANGE_OPTIONS = [6, 12, 24, 36]
+
+    @staticmethod
+    def get_month_periods(months, end_month=None):
+        """Get the YYYY-MM periods for the last `months` months ending at end_month (newest first)"""
+        if end_month:
+            year, month = map(int, end_month.split('-'))
+        else:
+            today = timezone.now()
+            year, month = today.year, today.month
+
+        periods = []
+        for _ in range(months):
+            periods.append(f"{year:04d}-{month:02d}")
+            month -= 1
+            if month == 0:
+                year, month = year - 1, 12
+        return periods
+
+    @staticmethod
+    def clean_month_range(value, default=None):
+        """Parse a requested month range, falling back to the default and capping at MAX_MONTHS"""
+        try:
+            months = int(value)
+        except (TypeError, ValueError):
+            return default or BudgetAnalyticsService.DEFAULT_MONTHS
+        return max(1, min(months, BudgetAnalyticsService.MAX_MONTHS))
+
+    @staticmethod
+    def get_budget_vs_actual(space, months=DEFAULT_MONTHS, end_month=None):
+        """
+        Budgeted vs. actual totals per month and per category
+
+        All figures come from one query grouped by (month, category); actual
+        spending is read from each budget's spending rollup.
+
+        Returns:
+            dict: {'months': [...newest first], 'categories': [...largest budget first], 'totals': {...}}
+        """
+        periods = BudgetAnalyticsService.get_month_periods(months, end_month)
+
+        rows = Budget.objects.filter(
+            space=space,
+            is_active=True,
+            month_period__gte=periods[-1],
+            month_period__lte=periods[0]
+        ).values(
+            'month_period', 'category_id', 'category__name'
+        ).annotate(
+            budgeted=models.Sum('amount'),
+            spent=models.Sum(Coalesce('spending_rollup__total_spent', models.Value(Decimal('0.00')))),
+            budget_count=models.Count('id')
+        ).order_by()
+
+        months_map = {}
+        for period in periods:
+            year, month = map(int, period.split('-'))
+            months_map[period] = {
+                'period': period,
+                'name': f"{calendar.month_name[month]} {year}",
+                'total_budgeted': Decimal('0.00'),
+                'total_spent': Decimal('0.00'),
+                'budget_count': 0,
+            }
+
+        categories_map = {}
+        for row in rows:
+            budgeted = row['budgeted'] or Decimal('0.00')
+            spent = row['spent'] or Decimal('0.00')
+
+            month_data = months_map[row['month_period']]
+            month_data['total_budgeted'] += budgeted
+            month_data['total_spent'] += spent
+            month_data['budget_count'] += row['budget_count']
+
+            category_data = categories_map.setdefault(row['category_id'], {
+                'category_id': row['category_id'],
+                'name': row['category__name'],
+                'total_budgeted': Decimal('0.00'),
+                'total_spent': Decimal('0.00'),
+                'months': {},
+            })
+            category_data['total_budgeted'] += budgeted
+            category_data['total_spent'] += spent
+            category_data['months'][row['month_period']] = {'budgeted': budgeted, 'spent': spent}
+
+        months_data = [months_map[period] for period in periods]
+        categories_data = sorted(categories_map.values(), key=lambda c: c['total_budgeted'], reverse=True)
+
+        for item in months_data + categories_data:
+            item['remaining'] = item['total_budgeted'] - item['total_spent']
+            item['spent_percentage'] = (
+                item['total_spent'] / item['total_budgeted'] * 100 if item['total_budgeted'] > 0 else 0
+            )
+
+        total_budgeted = sum((m['total_budgeted'] for m in months_data), Decimal('0.00'))
+        total_spent = sum((m['total_spent'] for m in months_data), Decimal('0.00'))
+
+        return {
+            'months': months_data,
+            'categories': categories_data,
+            'totals': {
+                'total_budgeted': total_budgeted,
+                'total_spent': total_spent,
+                'remaining': total_budgeted - total_spent,
+            },
+        }
+
+
+class BudgetEditService:
+    """Service for applying bulk budget edits (amount updates, deletions and new items) for a month"""
+
+    @staticmethod
+    def parse_form_payload(data):
+        """
+        Convert the legacy form fields of the budget edit modal into the JSON payload format
+
+        amount_<id> / delete_budget_<id> become updates and deletes, new_<field>_<n>
+        become new_budgets and new_split_<field>_<index>_<n>_ become their splits.
+        The form is scanned once.
+        """
+        updates, deletes = [], []
+        new_items, new_splits = {}, {}
+
+        for key, value in data.items():
+            if key.startswith('amount_'):
+                budget_id = key[len('amount_'):]
+                if f'delete_budget_{budget_id}' in data:
+                    deletes.append(budget_id)
+                else:
+                    updates.append({'id': budget_id, 'amount': value})
+            elif key.startswith('new_split_'):
+                parts = key[len('new_split_'):].strip('_').split('_')
+                if len(parts) == 3:
+                    field, split_index, counter = parts
+                    new_splits.setdefault(counter, {}).setdefault(split_index, {})[field] = value
+            elif key.startswith('new_'):
+                parts = key.split('_')
+                if len(parts) >= 3:
+                    field = '_'.join(parts[1:-1])
+                    new_items.setdefault(parts[-1], {})[field] = value
+
+        new_budgets = []
+        for counter, item in new_items.items():
+            splits = []
+            if item.get('enable_split') == 'true':
+                splits = list(new_splits.get(counter, {}).values())
+            new_budgets.append({
+                'category': item.get('category', ''),
+                'amount': item.get('amount'),
+                'assigned_to': item.get('assigned_to') or None,
+                'payment_method': item.get('payment_method') or None,
+                'due_date': item.get('due_date') or None,
+                'is_estimated': item.get('is_estimated') == 'true',
+                'is_recurring': item.get('is_recurring') == 'true',
+                'notes': item.get('notes', ''),
+                'splits': splits,
+            })
+
+        return {
+            'month_period': data.get('month_period'),
+            'updates': updates,
+            'deletes': deletes,
+            'new_budgets': new_budgets,
+        }
+
+    @staticmethod
+    def _parse_amount(value):
+        """Parse a positive money amount, or return None"""
+        try:
+            amount = Decimal(str(value))
+        except (InvalidOperation, TypeError, ValueError):
+            return None
+        return amount if amount.is_finite() and amount > 0 else None
+
+    @staticmethod
+    def _parse_id(value):
+        """Parse an optional primary key, or return None"""
+        try:
+            return int(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def payload_errors(payload):
+        """
+        Check the structure of a JSON edit payload before it is applied
+
+        Returns:
+            dict: {field: message} for every malformed field; empty when the payload can be applied
+        """
+        if not isinstance(payload, dict):
+            return {'payload': 'Must be an object'}
+
+        errors = {}
+        if not isinstance(payload.get('month_period'), str) or not payload['month_period']:
+            errors['month_period'] = 'Required'
+
+        for field in ('updates', 'deletes', 'new_budgets'):
+            if not isinstance(payload.get(field) or [], list):
+                errors[field] = 'Must be a list'
+        if errors:
+            return errors
+
+        for index, item in enumerate(payload.get('updates') or []):
+            if not isinstance(item, dict):
+                errors[f'updates[{index}]'] = 'Must be an object'
+        for index, budget_id in enumerate(payload.get('deletes') or []):
+            if isinstance(budget_id, (dict, list)):
+                errors[f'deletes[{index}]'] = 'Must be a budget ID'
+        for index, item in enumerate(payload.get('new_budgets') or []):
+            if not isinstance(item, dict):
+                errors[f'new_budgets[{index}]'] = 'Must be an object'
+                continue
+            if not isinstance(item.get('category') or '', str):
+                errors[f'new_budgets[{index}].category'] = 'Must be a category name'
+            splits = item.get('splits') or []
+            if not isinstance(splits, list) or not all(isinstance(split, dict) for split in splits):
+                errors[f'new_budgets[{index}].splits'] = 'Must be a list of objects'
+        return errors
+
+    @staticmethod
+    def apply_edit(space, user, payload):
+        """
+        Apply a structured budget edit in one transaction
+
+        Payload format:
+            {
+                "month_period": "YYYY-MM",
+                "updates": [{"id": 1, "amount": "250.00"}],
+                "deletes": [2, 3],
+                "new_budgets": [{
+                    "category": "Groceries", "amount": "400.00", "assigned_to": 5,
+                    "payment_method": 1, "due_date": "YYYY-MM-DD", "is_estimated": false,
+                    "is_recurring": false, "notes": "",
+                    "splits": [{"user": 5, "type": "percentage", "value": "50"}]
+                }]
+            }
+
+        Amounts are applied with one bulk_update, deletions with one DELETE and
+        new budgets and their splits with bulk_create.
+
+        Returns:
+            dict: Counts of updated, deleted and created budgets
+        """
+        month_period = payload.get('month_period')
+        if not month_period:
+            raise ValidationError('Month period is required')
+
+        delete_ids = {BudgetEditService._parse_id(budget_id) for budget_id in payload.get('deletes') or []}
+        delete_ids.discard(None)
+
+        amounts = {}
+        for item in payload.get('updates') or []:
+            budget_id = BudgetEditService._parse_id(item.get('id'))
+            if budget_id is None or budget_id in delete_ids:
+                continue
+            amount = BudgetEditService._parse_amount(item.get('amount'))
+            if amount is None:
+                raise ValidationError(f'Invalid amount for budget {budget_id}')
+            amounts[budget_id] = amount
+
+        with transaction.atomic():
+            deleted = 0
+            if delete_ids:
+                _, deleted_by_model = Budget.objects.filter(
+                    id__in=delete_ids,
+                    space=space,
+                    month_period=month_period
+                ).delete()
+                deleted = deleted_by_model.get(Budget._meta.label, 0)
+
+            budgets = list(Budget.objects.filter(
+                id__in=amounts,
+                space=space,
+                month_period=month_period
+            ).order_by())
+            now = timezone.now()
+            for budget in budgets:
+                budget.amount = amounts[budget.id]
+                budget.updated_at = now
+            if budgets:
+                Budget.objects.bulk_update(budgets, ['amount', 'updated_at'])
+                # bulk_update skips the Budget receivers that drop cached insights
+                BudgetInsightsService.invalidate_insights([
+                    BudgetInsightsService.insights_cache_key(space.id, month_period)
+                ])
+
+            created = BudgetEditService._create_new_budgets(
+                space, user, month_period, payload.get('new_budgets') or []
+            )
+
+        return {'updated': len(budgets), 'deleted': deleted, 'created': len(created)}
+
+    @staticmethod
+    def _create_new_budgets(space, user, month_period, items):
+        """Create new budget items (and their splits) with batched lookups and bulk inserts"""
+        items = [
+            dict(item, category=(item.get('category') or '').strip(),
+                 amount=BudgetEditService._parse_amount(item.get('amount')))
+            for item in items
+        ]
+        items = [item for item in items if item['category'] and item['amount']]
+        if not items:
+            return []
+
+        # Resolve every category name with one query, creating the missing ones
+        name_filter = models.Q()
+        for item in items:
+            name_filter |= models.Q(name__iexact=item['category'])
+        categories = {}
+        for category in BudgetCategory.objects.filter(
+            name_filter,
+            models.Q(space=space) | models.Q(is_system_default=True)
+        ):
+            categories.setdefault(category.name.lower(), category)
+
+        for item in items:
+            if item['category'].lower() not in categories:
+                categories[item['category'].lower()] = BudgetCategory.objects.create(
+                    name=item['category'],
+                    space=space,
+                    category_type='custom',
+                    created_by=user
+                )
+
+        # Resolve users and payment methods with one query each
+        user_ids = set()
+        payment_method_ids = set()
+        for item in items:
+            user_ids.add(BudgetEditService._parse_id(item.get('assigned_to')))
+            payment_method_ids.add(BudgetEditService._parse_id(item.get('payment_method')))
+            for split in item.get('splits') or []:
+                user_ids.add(BudgetEditService._parse_id(split.get('user')))
+        user_ids.discard(None)
+        payment_method_ids.discard(None)
+
+        users = User.objects.in_bulk(user_ids) if user_ids else {}
+        payment_methods = PaymentMethod.objects.filter(space=space).in_bulk(payment_method_ids) if payment_method_ids else {}
+
+        rows = []
+        for item in items:
+            due_date = None
+            if item.get('due_date'):
+                try:
+                    due_date = datetime.strptime(item['due_date'], '%Y-%m-%d').date()
+                except (TypeError, ValueError):
+                    pass
+
+            rows.append({
+                'category': categories[item['category'].lower()],
+                'amount': item['amount'],
+                'assigned_to': users.get(BudgetEditService._parse_id(item.get('assigned_to'))),
+                'payment_method': payment_methods.get(BudgetEditService._parse_id(item.get('payment_method'))),
+                'due_date': due_date,
+                'is_estimated': bool(item.get('is_estimated')),
+                'is_recurring': bool(item.get('is_recurring')),
+                'notes': item.get('notes') or '',
+            })
+
+        created = Budget.bulk_materialize(space, month_period, rows, user)
+
+        # Splits for the budgets that were actually created (existing categories are skipped)
+        created_by_category = {budget.category_id: budget for budget in created}
+        splits = {}
+        for item, row in zip(items, rows):
+            budget = created_by_category.get(row['category'].id)
+            if not budget:
+                continue
+            for split_info in item.get('splits') or []:
+                split_user = users.get(BudgetEditService._parse_id(split_info.get('user')))
+                split_value = BudgetEditService._parse_amount(split_info.get('value'))
+                if not split_user or split_value is None:
+                    continue
+
+                split = BudgetSplit(budget=budget, user=split_user)
+                if split_info.get('type') == 'percentage':
+                    split.split_type = 'percentage'
+                    split.percentage = split_value
+                elif split_info.get('type') in ('fixed', 'fixed_amount'):
+                    split.split_type = 'fixed_amount'
+                    split.fixed_amount = split_value
+                else:
+                    continue
+                splits[(budget.id, split_user.id)] = split
+
+        if splits:
+            # Allocate each budget's splits together so the shares add up exactly
+            splits_by_budget = {}
+            for split in splits.values():
+                splits_by_budget.setdefault(split.budget, []).append(split)
+            for budget, budget_splits in splits_by_budget.items():
+                BudgetSplit.allocate(budget.amount, budget_splits)
+            BudgetSplit.objects.bulk_create(splits.values())
+
+        return created
+
+
+class ExpenseIngestionService:
+    """Service for creating many actual expenses (and their splits) in one batch"""
+
+    MAX_BATCH_SIZE = 500
+
+    @staticmethod
+    def _build_splits(expense, split_items, member_ids):
+        """Build ExpenseSplit rows for an expense; defaults to the payer covering 100%"""
+        if not split_items:
+            return [ExpenseSplit(
+                user_id=expense.paid_by_id,
+                percentage=Decimal('100'),
+                amount=expense.actual_amount
+            )]
+
+        user_ids = []
+        parts = []
+        for split_item in split_items:
+            user_id = BudgetEditService._parse_id(split_item.get('user'))
+            if user_id not in member_ids:
+                raise ValidationError(f'Split user {split_item.get("user")} is not a member of the space')
+            if user_id in user_ids:
+                raise ValidationError(f'Split user {user_id} appears more than once')
+            user_ids.append(user_id)
+
+            if split_item.get('percentage') not in (None, ''):
+                percentage = BudgetEditService._parse_amount(split_item['percentage'])
+                if percentage is None or percentage > 100:
+                    raise ValidationError('Split percentage must be between 0.01 and 100')
+                parts.append(('percentage', percentage))
+            else:
+                amount = BudgetEditService._parse_amount(split_item.get('amount'))
+                if amount is None:
+                    raise ValidationError('Each split needs a percentage or an amount')
+                parts.append(('fixed', amount))
+
+        allocations = SplitAllocator.allocate(expense.actual_amount, parts)
+        total_percentage = sum((allocation['percentage'] for allocation in allocations), Decimal('0'))
+        total_amount = sum((allocation['amount'] for allocation in allocations), Decimal('0'))
+        if abs(total_percentage - Decimal('100')) > Decimal('0.01') and abs(total_amount - expense.actual_amount) > Decimal('0.01'):
+            raise ValidationError('Splits must add up to the expense total')
+
+        return [
+            ExpenseSplit(user_id=user_id, percentage=allocation['percentage'], amount=allocation['amount'])
+            for user_id, allocation in zip(user_ids, allocations)
+        ]
+
+    @staticmethod
+    def payload_errors(items):
+        """
+        Check the structure of a batch before it is ingested
+
+        Returns:
+            dict: {field: message} for every malformed expense or splits list
+        """
+        errors = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[f'expenses[{index}]'] = 'Must be an object'
+                continue
+            splits = item.get('splits') or []
+            if not isinstance(splits, list) or not all(isinstance(split, dict) for split in splits):
+                errors[f'expenses[{index}].splits'] = 'Must be a list of objects'
+        return errors
+
+    @staticmethod
+    def ingest(space, items):
+        """
+        Validate and create a batch of expenses for a space
+
+        Each item: {"client_id": "...", "budget_id": 1, "amount": "12.50", "date": "YYYY-MM-DD",
+        "paid_by": 3, "description": "", "splits": [{"user": 3, "percentage": "50"} or {"user": 3, "amount": "6.25"}]}
+
+        Budgets and memberships are loaded with one query each, valid expenses and
+        their splits are inserted with bulk_create in one transaction, and the
+        affected spending rollups are rebuilt once. Invalid items are skipped.
+
+        Returns:
+            list: One result dict per item, in input order
+        """
+        budget_ids = {BudgetEditService._parse_id(item.get('budget_id')) for item in items if isinstance(item, dict)}
+        budget_ids.discard(None)
+        budgets = Budget.objects.filter(space=space, is_active=True).in_bulk(budget_ids) if budget_ids else {}
+        member_ids = set(SpaceMember.objects.filter(
+            space=space,
+            is_active=True
+        ).order_by().values_list('user_id', flat=True))
+
+        results = []
+        pending = []
+        for index, item in enumerate(items):
+            result = {'index': index}
+            if isinstance(item, dict) and 'client_id' in item:
+                result['client_id'] = item['client_id']
+            results.append(result)
+
+            try:
+                if not isinstance(item, dict):
+                    raise ValidationError('Each expense must be an object')
+
+                budget = budgets.get(BudgetEditService._parse_id(item.get('budget_id')))
+                if not budget:
+                    raise ValidationError('Budget not found')
+
+                amount = BudgetEditService._parse_amount(item.get('amount'))
+                if amount is None:
+                    raise ValidationError('Amount must be greater than 0')
+
+                try:
+                    date_paid = datetime.strptime(str(item.get('date')), '%Y-%m-%d').date()
+                except ValueError:
+                    raise ValidationError('Date must be in YYYY-MM-DD format')
+
+                paid_by_id = BudgetEditService._parse_id(item.get('paid_by'))
+                if paid_by_id not in member_ids:
+                    raise ValidationError('User must be a member of the space')
+
+                expense = ActualExpense(
+                    budget_item=budget,
+                    actual_amount=amount,
+                    date_paid=date_paid,
+                    month_period=date_paid.strftime('%Y-%m'),
+                    paid_by_id=paid_by_id,
+                    description=item.get('description') or '',
+                )
+                splits = ExpenseIngestionService._build_splits(expense, item.get('splits'), member_ids)
+                expense.is_shared = len(splits) > 1
+                expense.clean_fields(exclude=['budget_item', 'paid_by'])
+            except ValidationError as e:
+                result.update({'success': False, 'error': '; '.join(e.messages)})
+                continue
+
+            pending.append((result, expense, splits))
+
+        if pending:
+            with transaction.atomic():
+                ActualExpense.objects.bulk_create([expense for _, expense, _ in pending])
+
+                expense_splits = []
+                for _, expense, splits in pending:
+                    for split in splits:
+                        split.actual_expense = expense
+                        expense_splits.append(split)
+                ExpenseSplit.objects.bulk_create(expense_splits)
+
+                # bulk_create skips the per-expense rollup and ledger signals
+                BudgetSpendingRollup.rebuild(budget_ids={expense.budget_item_id for _, expense, _ in pending})
+                MemberBalance.record_splits(
+                    ExpenseSplit.objects.filter(actual_expense__in=[expense for _, expense, _ in pending])
+                )
+
+            for result, expense, _ in pending:
+                result.update({'success': True, 'expense_id': expense.id})
+
+        return results
+
+
+class RecurringRolloverService:
+    """Creates next period's budgets from recurring ones, for every space in one pass"""
+
+    # Fields copied from a recurring budget onto the budget it rolls over into
+    COPY_FIELDS = [
+        'space_id', 'category_id', 'amount', 'timing_type', 'range_description',
+        'reminder_days_before', 'preferred_time_of_day', 'recurrence_pattern',
+        'template_used_id', 'is_custom', 'is_estimated', 'is_recurring',
+        'recurrence_type', 'expected_day', 'assigned_to_id', 'notes',
+        'created_by_id', 'payment_method_id',
+    ]
+    # Dates that move with the budget's month
+    SHIFT_DATE_FIELDS = ['due_date', 'range_start', 'range_end']
+
+    @staticmethod
+    def shift_month_period(month_period, months):
+        """YYYY-MM period `months` months after month_period (negative goes back)"""
+        year, month = map(int, month_period.split('-'))
+        year, month = divmod(year * 12 + month - 1 + months, 12)
+        return f"{year:04d}-{month + 1:02d}"
+
+    @staticmethod
+    def source_budgets(target_month, space_ids=None):
+        """Recurring budgets whose next period is target_month, across all recurrence types"""
+        periods = {}
+        for recurrence_type, months in Budget.RECURRENCE_INTERVAL_MONTHS.items():
+            periods.setdefault(RecurringRolloverService.shift_month_period(target_month, -months), []).append(recurrence_type)
+
+        due = models.Q()
+        for month_period, recurrence_types in periods.items():
+            condition = models.Q(month_period=month_period, recurrence_type__in=recurrence_types)
+            if 'monthly' in recurrence_types:
+                # Recurring budgets without a type repeat monthly
+                condition |= models.Q(month_period=month_period, recurrence_type__isnull=True)
+                condition |= models.Q(month_period=month_period, recurrence_type='')
+            due |= condition
+
+        budgets = Budget.objects.filter(due, is_recurring=True, is_active=True)
+        if space_ids:
+            budgets = budgets.filter(space_id__in=space_ids)
+        return budgets.order_by('id')
+
+    @staticmethod
+    def _roll_over(source, target_month):
+        """Unsaved budget for target_month copied from a recurring source budget"""
+        year, month = map(int, target_month.split('-'))
+        source_year, source_month = map(int, source.month_period.split('-'))
+        months = (year - source_year) * 12 + month - source_month
+
+        budget = Budget(
+            month_period=target_month,
+            **{field: getattr(source, field) for field in RecurringRolloverService.COPY_FIELDS}
+        )
+        for field in RecurringRolloverService.SHIFT_DATE_FIELDS:
+            setattr(budget, field, Budget.shift_date(getattr(source, field), months))
+
+        # Clamping month-end days can collapse a range (Jan 28-31 -> Feb 28-28);
+        # keep the original length by moving the start back instead
+        if budget.range_start and budget.range_end and budget.range_start >= budget.range_end:
+            length = source.range_end - source.range_start
+            budget.range_start = max(budget.range_end - length, budget.range_end.replace(day=1))
+
+        budget.update_next_due_date()
+        return budget
+
+    @staticmethod
+    def _write_chunk(sources, target_month):
+        """Insert one chunk of rolled-over budgets; returns how many rows were actually created"""
+        from spaces.models import SpaceMember
+
+        # Budgets that already exist for the month are left alone (idempotent reruns)
+        target_budgets = Budget.objects.all_including_deleted().filter(
+            space_id__in={source.space_id for source in sources},
+            category_id__in={source.category_id for source in sources},
+            month_period=target_month
+        )
+        existing = set(target_budgets.values_list('space_id', 'category_id').order_by())
+
+        # Members who left the space are no longer assigned
+        members = set(SpaceMember.objects.filter(
+            space_id__in={source.space_id for source in sources},
+            user_id__in={source.assigned_to_id for source in sources if source.assigned_to_id},
+            is_active=True
+        ).values_list('space_id', 'user_id').order_by())
+
+        new_budgets = []
+        for source in sources:
+            if (source.space_id, source.category_id) in existing:
+                continue
+            existing.add((source.space_id, source.category_id))
+
+            budget = RecurringRolloverService._roll_over(source, target_month)
+            if budget.assigned_to_id and (budget.space_id, budget.assigned_to_id) not in members:
+                budget.assigned_to_id = None
+            # bulk_create skips model validation, so rolled budgets are checked here
+            try:
+                budget.clean_amount_and_timing()
+            except ValidationError:
+                continue
+            new_budgets.append(budget)
+
+        # ignore_conflicts covers a concurrent run inserting the same rows. It drops
+        # them without reporting it, so only rows carrying this run's created_at count
+        Budget.objects.bulk_create(new_budgets, ignore_conflicts=True)
+        if not new_budgets:
+            return 0
+        inserted = set(target_budgets.filter(
+            created_at__in={budget.created_at for budget in new_budgets}
+        ).values_list('space_id', 'category_id', 'created_at').order_by())
+        return sum(
+            (budget.space_id, budget.category_id, budget.created_at) in inserted
+            for budget in new_budgets
+        )
+
+    @staticmethod
+    def rollover(target_month=None, space_ids=None, chunk_size=500):
+        """
+        Create target_month's budgets (default: next month) from recurring budgets in every space
+
+        Monthly, weekly and biweekly budgets repeat every month, quarterly ones every
+        three months and yearly ones every twelve. Source rows are streamed and
+        inserted in chunks, so the whole user base can be rolled over in one pass;
+        rerunning it skips the budgets that already exist.
+
+        Returns:
+            dict: created and skipped counts
+        """
+        from itertools import islice
+
+        if not target_month:
+            target_month = RecurringRolloverService.shift_month_period(timezone.now().strftime('%Y-%m'), 1)
+
+        sources = RecurringRolloverService.source_budgets(target_month, space_ids).iterator(chunk_size=chunk_size)
+        summary = {'month_period': target_month, 'created': 0, 'skipped': 0}
+        while True:
+            chunk = list(islice(sources, chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                created = RecurringRolloverService._write_chunk(chunk, target_month)
+            summary['created'] += created
+            summary['skipped'] += len(chunk) - created
+
+        return summary
@@ -1,12 +1,18 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+import json
 from decimal import Decimal
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
-from spaces.models import Space, SpaceMember
-from .models import Budget, BudgetCategory, BudgetTemplate, SpendingBehaviorAnalysis, ActualExpense
+from spaces.models import Space, SpaceMember, SpaceSettings
+from .models import (
+    Budget, BudgetCategory, BudgetTemplate, SpendingBehaviorAnalysis, ActualExpense,
+    BudgetSpendingRollup, BudgetSplit, ExpenseSplit, MemberBalance,
+)
 
 User = get_user_model()
 
@@ -409,6 +415,61 @@ class SpendingBehaviorAnalysisTestCase(TestCase):
             )
 
 
+    def test_analyze_batch(self):
+        """Test batch analysis builds weekday histograms and upserts incrementally"""
+        SpaceMember.objects.create(space=self.space, user=self.user, role='owner', is_active=True)
+        today = timezone.now().date()
+        monday = today - timedelta(days=today.weekday())
+        for days_back in (0, 7, 14, 16):
+            ActualExpense.objects.create(
+                budget_item=self.budget,
+                actual_amount=Decimal('10.00'),
+                date_paid=monday - timedelta(days=days_back),
+                paid_by=self.user
+            )
+
+        with self.assertNumQueries(2):
+            written = SpendingBehaviorAnalysis.analyze_batch()
+        self.assertEqual(written, 1)
+
+        analysis = SpendingBehaviorAnalysis.objects.get(user=self.user, space=self.space, category=self.category)
+        self.assertEqual(analysis.preferred_day_of_week, 1)
+        self.assertEqual(analysis.data_points_count, 4)
+        self.assertEqual(analysis.pattern_confidence, Decimal('75.00'))
+        self.assertEqual(analysis.optimal_timing_suggestion, 'You typically spend on Mondays')
+
+        # Nothing new since the last run
+        self.assertEqual(SpendingBehaviorAnalysis.analyze_batch(incremental=True), 0)
+
+        analysis.update_from_expenses()
+        self.assertEqual(analysis.data_points_count, 4)
+
+    def test_analyze_batch_incremental_per_space(self):
+        """Test incremental runs compare each space's expenses with that space's own last analysis"""
+        other_space = Space.objects.create(name='Other Space', created_by=self.user)
+        other_budget = Budget.objects.create(
+            space=other_space, category=self.category, amount=Decimal('50.00'), month_period='2025-09', created_by=self.user
+        )
+        for budget in (self.budget, other_budget):
+            SpaceMember.objects.get_or_create(space=budget.space, user=self.user, defaults={'role': 'owner'})
+            ActualExpense.objects.create(
+                budget_item=budget, actual_amount=Decimal('10.00'), date_paid=timezone.now().date(), paid_by=self.user
+            )
+        self.assertEqual(SpendingBehaviorAnalysis.analyze_batch(), 2)
+
+        # A new expense in this space, then a later run that only covers the other space
+        ActualExpense.objects.create(
+            budget_item=self.budget, actual_amount=Decimal('10.00'), date_paid=timezone.now().date(), paid_by=self.user
+        )
+        SpendingBehaviorAnalysis.objects.filter(space=other_space).update(
+            last_analysis_date=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(SpendingBehaviorAnalysis.analyze_batch(space_ids=[self.space.id], incremental=True), 1)
+        analysis = SpendingBehaviorAnalysis.objects.get(space=self.space)
+        self.assertEqual(analysis.data_points_count, 2)
+        self.assertEqual(SpendingBehaviorAnalysis.analyze_batch(incremental=True), 0)
+
 class IntegrationTestCase(TestCase):
     """Integration tests for timing system"""
 
@@ -510,3 +571,1339 @@ class IntegrationTestCase(TestCase):
 
         # Test days until due calculation
         self.assertEqual(budget.days_until_due, (future_date - date.today()).days)
+
+
+class BudgetSpendingRollupTestCase(TestCase):
+    """Test cases for the incrementally maintained spending rollup"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.space = Space.objects.create(
+            name='Rollup Space',
+            created_by=self.user
+        )
+        SpaceMember.objects.create(
+            space=self.space,
+            user=self.user,
+            role='owner',
+            is_active=True
+        )
+        self.category = BudgetCategory.objects.create(
+            name='Groceries',
+            is_system_default=True
+        )
+        self.budget = Budget.objects.create(
+            space=self.space,
+            category=self.category,
+            amount=Decimal('400.00'),
+            month_period='2025-09',
+            created_by=self.user
+        )
+
+    def _add_expense(self, amount, day):
+        return ActualExpense.objects.create(
+            budget_item=self.budget,
+            actual_amount=Decimal(amount),
+            date_paid=date(2025, 9, day),
+            paid_by=self.user
+        )
+
+    def _fresh_budget(self):
+        return Budget.objects.select_related('spending_rollup').get(pk=self.budget.pk)
+
+    def test_rollup_tracks_create_update_delete(self):
+        """Rollup follows expense creation, updates and deletion"""
+        first = self._add_expense('100.00', 3)
+        second = self._add_expense('50.00', 10)
+
+        budget = self._fresh_budget()
+        self.assertEqual(budget.total_spent, Decimal('150.00'))
+        self.assertEqual(budget.expense_count, 2)
+        self.assertEqual(budget.last_paid, date(2025, 9, 10))
+
+        first.actual_amount = Decimal('120.00')
+        first.save()
+        self.assertEqual(self._fresh_budget().total_spent, Decimal('170.00'))
+
+        second.delete()
+        budget = self._fresh_budget()
+        self.assertEqual(budget.total_spent, Decimal('120.00'))
+        self.assertEqual(budget.expense_count, 1)
+        self.assertEqual(budget.last_paid, date(2025, 9, 3))
+        self.assertEqual(budget.total_spent, budget.get_real_spending_current_month())
+
+    def test_expenses_outside_budget_month_are_ignored(self):
+        """Only expenses paid in the budget's month count toward the rollup"""
+        self._add_expense('80.00', 5)
+        ActualExpense.objects.create(
+            budget_item=self.budget,
+            actual_amount=Decimal('30.00'),
+            date_paid=date(2025, 10, 2),
+            paid_by=self.user
+        )
+
+        self.assertEqual(self._fresh_budget().total_spent, Decimal('80.00'))
+
+    def test_properties_read_without_queries(self):
+        """Spending properties are served from the select_related rollup"""
+        self._add_expense('360.00', 7)
+        budget = self._fresh_budget()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(budget.remaining_amount, Decimal('40.00'))
+            self.assertEqual(budget.spent_percentage, Decimal('90'))
+            self.assertFalse(budget.is_over_budget)
+            self.assertTrue(budget.is_warning_level)
+
+    def test_rebuild_matches_incremental_totals(self):
+        """Rebuilding from scratch reproduces the incremental rollup"""
+        self._add_expense('25.00', 1)
+        self._add_expense('75.00', 20)
+        BudgetSpendingRollup.objects.filter(budget=self.budget).update(
+            total_spent=Decimal('0.00'), expense_count=0, last_paid=None
+        )
+
+        BudgetSpendingRollup.rebuild(budget_ids=[self.budget.pk])
+
+        budget = self._fresh_budget()
+        self.assertEqual(budget.total_spent, Decimal('100.00'))
+        self.assertEqual(budget.expense_count, 2)
+        self.assertEqual(budget.last_paid, date(2025, 9, 20))
+
+    def test_with_spending_annotations(self):
+        """with_spending() annotates spending and split figures in one query"""
+        self._add_expense('100.00', 4)
+        BudgetSplit.objects.create(
+            budget=self.budget,
+            user=self.user,
+            percentage=Decimal('100.00')
+        )
+        empty_budget = Budget.objects.create(
+            space=self.space,
+            category=BudgetCategory.objects.create(name='Rent', is_system_default=True),
+            amount=Decimal('1000.00'),
+            month_period='2025-09',
+            created_by=self.user
+        )
+
+        with self.assertNumQueries(1):
+            budgets = {b.pk: b for b in Budget.objects.filter(space=self.space).with_spending()}
+            budget = budgets[self.budget.pk]
+            self.assertEqual(budget.total_spent, Decimal('100.00'))
+            self.assertEqual(budget.remaining_amount, Decimal('300.00'))
+            self.assertEqual(budget.spent_percentage, Decimal('25.00'))
+            self.assertEqual(budget.expense_count, 1)
+            self.assertEqual(budget.split_count, 1)
+
+            empty = budgets[empty_budget.pk]
+            self.assertEqual(empty.total_spent, Decimal('0.00'))
+            self.assertEqual(empty.split_count, 0)
+            self.assertFalse(empty.is_over_budget)
+
+    def test_budget_vs_actual_single_query(self):
+        """Test multi-month analytics are built from one grouped query"""
+        from .services import BudgetAnalyticsService
+
+        self._add_expense('150.00', 3)
+        Budget.objects.create(
+            space=self.space,
+            category=self.category,
+            amount=Decimal('350.00'),
+            month_period='2025-08',
+            created_by=self.user
+        )
+
+        with self.assertNumQueries(1):
+            analytics = BudgetAnalyticsService.get_budget_vs_actual(
+                self.space, months=3, end_month='2025-09'
+            )
+
+        self.assertEqual([m['period'] for m in analytics['months']], ['2025-09', '2025-08', '2025-07'])
+        september, august, july = analytics['months']
+        self.assertEqual(september['total_budgeted'], Decimal('400.00'))
+        self.assertEqual(september['total_spent'], Decimal('150.00'))
+        self.assertEqual(august['total_spent'], Decimal('0.00'))
+        self.assertEqual(july['budget_count'], 0)
+
+        groceries = analytics['categories'][0]
+        self.assertEqual(groceries['total_budgeted'], Decimal('750.00'))
+        self.assertEqual(groceries['remaining'], Decimal('600.00'))
+        self.assertEqual(analytics['totals']['total_spent'], Decimal('150.00'))
+
+    def test_monthly_insights_single_query(self):
+        """Test monthly insights load all budget variance data in one query"""
+        from .services import BudgetInsightsService
+
+        self.budget.is_estimated = True
+        self.budget.save()
+        self._add_expense('480.00', 5)
+
+        with self.assertNumQueries(1):
+            insights = BudgetInsightsService.generate_monthly_insights(self.space, '2025-09')
+
+        types = [insight['type'] for insight in insights]
+        self.assertEqual(types, ['overspend_critical', 'overspend_warning'])
+        self.assertEqual(insights[1]['amount'], Decimal('80.00'))
+
+        batch = list(BudgetInsightsService.generate_insights_batch(month_periods=['2025-09']))
+        self.assertEqual(batch, [(self.space.id, '2025-09', insights)])
+
+        import io
+        from django.core.cache import cache
+        from django.core.management import call_command
+
+        cache.clear()
+        call_command('generate_budget_insights', month=['2025-09'], stdout=io.StringIO())
+        self.assertEqual(cache.get(BudgetInsightsService.insights_cache_key(self.space.id, '2025-09')), insights)
+
+        # The analytics page reads the cached batch until an expense changes the month
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(BudgetInsightsService.get_monthly_insights(self.space, '2025-09'), insights)
+        self.assertFalse([query for query in context.captured_queries if 'cache_table' not in query['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_expense('100.00', 6)
+        insights = BudgetInsightsService.get_monthly_insights(self.space, '2025-09')
+        self.assertEqual(insights[1]['amount'], Decimal('180.00'))
+
+        # Budget edits drop the cached insights too
+        with self.captureOnCommitCallbacks(execute=True):
+            self.budget.amount = Decimal('1000.00')
+            self.budget.save()
+        self.assertEqual(
+            [insight['type'] for insight in BudgetInsightsService.get_monthly_insights(self.space, '2025-09')],
+            ['savings_opportunity', 'savings_opportunity']
+        )
+
+    def test_copy_from_previous_month_bulk(self):
+        """Test copying a month inserts all budgets in a handful of queries"""
+        for index in range(40):
+            Budget.objects.create(
+                space=self.space,
+                category=BudgetCategory.objects.create(name=f'Category {index}', is_system_default=True),
+                amount=Decimal('50.00'),
+                month_period='2025-09',
+                assigned_to=self.user,
+                created_by=self.user
+            )
+        # Already present in the target month, so it is skipped
+        Budget.objects.create(
+            space=self.space,
+            category=self.category,
+            amount=Decimal('999.00'),
+            month_period='2025-10',
+            created_by=self.user
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            created = Budget.copy_from_previous_month(self.space, '2025-10', self.user)
+
+        # The insert may be split into a few statements depending on the backend's parameter limit
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(len(created), 40)
+        self.assertTrue(all(budget.pk for budget in created))
+        self.assertEqual(Budget.objects.filter(space=self.space, month_period='2025-10').count(), 41)
+        self.assertEqual(
+            Budget.objects.get(space=self.space, category=self.category, month_period='2025-10').amount,
+            Decimal('999.00')
+        )
+        self.assertEqual(Budget.copy_from_previous_month(self.space, '2025-10', self.user), [])
+
+    def test_membership_resolver_caches_within_scope(self):
+        """Test membership lookups hit the database once per scope and see membership changes"""
+        from spaces.utils import SpaceMembershipResolver
+
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+
+        with SpaceMembershipResolver.scope():
+            with self.assertNumQueries(1):
+                self.assertTrue(SpaceMembershipResolver.is_member(self.space, self.user))
+                self.assertEqual(SpaceMembershipResolver.get_role(self.space.id, self.user.id), 'owner')
+                self.budget.assigned_to = self.user
+                self.budget.clean()
+
+            self.assertFalse(SpaceMembershipResolver.is_member(self.space, other))
+            SpaceMember.objects.create(space=self.space, user=other, role='member', is_active=True)
+            self.assertTrue(SpaceMembershipResolver.is_member(self.space, other))
+
+
+class SharedSpaceTestCase(TestCase):
+    """Base for tests on a two-member space with three September budgets"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.partner = User.objects.create_user(
+            username='partner',
+            email='partner@example.com',
+            password='testpass123'
+        )
+        self.space = Space.objects.create(
+            name='Edit Space',
+            created_by=self.user
+        )
+        SpaceMember.objects.create(space=self.space, user=self.user, role='owner', is_active=True)
+        SpaceMember.objects.create(space=self.space, user=self.partner, role='member', is_active=True)
+        self.budgets = [
+            Budget.objects.create(
+                space=self.space,
+                category=BudgetCategory.objects.create(name=f'Category {index}', is_system_default=True),
+                amount=Decimal('100.00'),
+                month_period='2025-09',
+                created_by=self.user
+            )
+            for index in range(3)
+        ]
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_space_id'] = self.space.id
+        session.save()
+
+
+class BudgetEditApiTestCase(SharedSpaceTestCase):
+    """Test cases for the set-based budget edit API"""
+
+    def test_json_payload(self):
+        """Test updates, deletes, new budgets and splits from one JSON payload"""
+        payload = {
+            'month_period': '2025-09',
+            'updates': [
+                {'id': self.budgets[0].id, 'amount': '150.00'},
+                {'id': self.budgets[1].id, 'amount': '75.50'},
+            ],
+            'deletes': [self.budgets[2].id],
+            'new_budgets': [{
+                'category': 'Streaming',
+                'amount': '30.00',
+                'assigned_to': self.partner.id,
+                'splits': [
+                    {'user': self.user.id, 'type': 'percentage', 'value': '50'},
+                    {'user': self.partner.id, 'type': 'fixed', 'value': '15.00'},
+                ],
+            }],
+        }
+
+        response = self.client.post(
+            '/budgets/api/budget-edit/', data=json.dumps(payload), content_type='application/json'
+        )
+
+        self.assertEqual(response.json(), {
+            'success': True, 'message': 'Budget updated successfully!', 'updated': 2, 'deleted': 1, 'created': 1
+        })
+        self.budgets[0].refresh_from_db()
+        self.assertEqual(self.budgets[0].amount, Decimal('150.00'))
+        self.assertFalse(Budget.objects.filter(id=self.budgets[2].id).exists())
+
+        new_budget = Budget.objects.get(space=self.space, category__name='Streaming')
+        self.assertEqual(new_budget.assigned_to, self.partner)
+        splits = {split.user_id: split.calculated_amount for split in new_budget.splits.all()}
+        self.assertEqual(splits, {self.user.id: Decimal('15.00'), self.partner.id: Decimal('15.00')})
+
+    def test_malformed_json_payload(self):
+        """Test a payload with the wrong structure is rejected with the offending field"""
+        cases = [
+            ([1, 2], 'payload'),
+            ({'updates': []}, 'month_period'),
+            ({'month_period': '2025-09', 'updates': 'x'}, 'updates'),
+            ({'month_period': '2025-09', 'updates': [1]}, 'updates[0]'),
+            ({'month_period': '2025-09', 'new_budgets': [{'category': 'Gym', 'splits': ['x']}]}, 'new_budgets[0].splits'),
+        ]
+        for payload, field in cases:
+            response = self.client.post(
+                '/budgets/api/budget-edit/', data=json.dumps(payload), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(field, response.json()['errors'])
+
+        self.budgets[0].refresh_from_db()
+        self.assertEqual(self.budgets[0].amount, Decimal('100.00'))
+
+    def test_legacy_form_payload(self):
+        """Test the modal's form fields are parsed into the same edit"""
+        response = self.client.post('/budgets/api/budget-edit/', {
+            'month_period': '2025-09',
+            f'amount_{self.budgets[0].id}': '120.00',
+            f'amount_{self.budgets[1].id}': '100.00',
+            f'delete_budget_{self.budgets[1].id}': 'on',
+            'new_category_1': 'Gym',
+            'new_amount_1': '45.00',
+            'new_enable_split_1': 'true',
+            'new_split_user_0_1_': str(self.partner.id),
+            'new_split_type_0_1_': 'percentage',
+            'new_split_value_0_1_': '100',
+        })
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual((data['updated'], data['deleted'], data['created']), (1, 1, 1))
+        gym = Budget.objects.get(space=self.space, category__name='Gym')
+        self.assertEqual(gym.splits.get().calculated_amount, Decimal('45.00'))
+
+    def test_bulk_edit_form_saves_only_changed_rows(self):
+        """Test the bulk edit form shares one member query and bulk-updates dirty rows"""
+        from .forms import BudgetBulkEditForm
+
+        budgets = list(Budget.objects.filter(space=self.space).select_related('category'))
+        data = {}
+        for budget in budgets:
+            data[f'amount_{budget.id}'] = str(budget.amount)
+            data[f'assigned_to_{budget.id}'] = ''
+        data[f'amount_{budgets[0].id}'] = '175.00'
+        data[f'assigned_to_{budgets[1].id}'] = str(self.partner.id)
+
+        with self.assertNumQueries(1):
+            form = BudgetBulkEditForm(data, budgets=budgets)
+            self.assertTrue(form.is_valid())
+
+        updated = form.save()
+
+        self.assertEqual({budget.id for budget in updated}, {budgets[0].id, budgets[1].id})
+        self.assertEqual(Budget.objects.get(id=budgets[0].id).amount, Decimal('175.00'))
+        self.assertEqual(Budget.objects.get(id=budgets[1].id).assigned_to, self.partner)
+
+
+class ExpenseApiTestCase(SharedSpaceTestCase):
+    """Test cases for bulk expense ingestion and expense listing"""
+
+    def test_bulk_expense_ingestion(self):
+        """Test a batch of expenses is validated in bulk and reported per item"""
+        outsider = User.objects.create_user(username='outsider', email='out@example.com', password='testpass123')
+        budget = self.budgets[0]
+        payload = {'expenses': [
+            {'client_id': 'a', 'budget_id': budget.id, 'amount': '40.00', 'date': '2025-09-02', 'paid_by': self.user.id},
+            {'client_id': 'b', 'budget_id': budget.id, 'amount': '30.00', 'date': '2025-09-03', 'paid_by': self.user.id,
+             'splits': [{'user': self.user.id, 'percentage': '50'}, {'user': self.partner.id, 'amount': '15.00'}]},
+            {'client_id': 'c', 'budget_id': budget.id, 'amount': '10.00', 'date': '2025-09-04', 'paid_by': outsider.id},
+            {'client_id': 'd', 'budget_id': 999999, 'amount': '10.00', 'date': '2025-09-04', 'paid_by': self.user.id},
+        ]}
+
+        response = self.client.post(
+            '/budgets/api/expenses/bulk/', data=json.dumps(payload), content_type='application/json'
+        )
+
+        data = response.json()
+        self.assertEqual((data['created_count'], data['failed_count']), (2, 2))
+        self.assertEqual([result['success'] for result in data['results']], [True, True, False, False])
+        self.assertEqual(data['results'][2]['error'], 'User must be a member of the space')
+
+        shared = ActualExpense.objects.get(id=data['results'][1]['expense_id'])
+        self.assertTrue(shared.is_shared)
+        self.assertEqual(shared.splits.count(), 2)
+
+        budget = Budget.objects.get(id=budget.id)
+        self.assertEqual(budget.total_spent, Decimal('70.00'))
+        self.assertEqual(budget.expense_count, 2)
+
+    def test_bulk_expense_malformed_payload(self):
+        """Test a batch with the wrong structure is rejected with the offending field"""
+        item = {'budget_id': self.budgets[0].id, 'amount': '10.00', 'date': '2025-09-02', 'paid_by': self.user.id}
+        cases = [
+            ({'expenses': [item, 1]}, 'expenses[1]'),
+            ({'expenses': [dict(item, splits='x')]}, 'expenses[0].splits'),
+            ({'expenses': [dict(item, splits=[1, 2])]}, 'expenses[0].splits'),
+        ]
+        for payload, field in cases:
+            response = self.client.post(
+                '/budgets/api/expenses/bulk/', data=json.dumps(payload), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(field, response.json()['errors'])
+
+        for payload in ([1, 2], {'expenses': 'x'}):
+            response = self.client.post(
+                '/budgets/api/expenses/bulk/', data=json.dumps(payload), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('expenses', response.json()['errors'])
+        self.assertFalse(ActualExpense.objects.exists())
+
+    def test_list_expenses_keyset_pagination(self):
+        """Test expenses are paged by (date_paid, id) with projection and since filter"""
+        budget = self.budgets[0]
+        for day in (1, 2, 2, 3, 5):
+            ActualExpense.objects.create(
+                budget_item=budget,
+                actual_amount=Decimal('10.00'),
+                date_paid=date(2025, 9, day),
+                paid_by=self.user
+            )
+        url = f'/budgets/api/expenses/{budget.id}/'
+
+        pages = []
+        cursor = None
+        while True:
+            params = {'limit': 2, 'fields': 'id,date'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            pages.append(data['expenses'])
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        dates = [expense['date'] for page in pages for expense in page]
+        self.assertEqual(dates, ['2025-09-05', '2025-09-03', '2025-09-02', '2025-09-02', '2025-09-01'])
+        self.assertEqual(set(pages[0][0]), {'id', 'date'})
+
+        data = self.client.get(url, {'since': '2025-09-03'}).json()
+        self.assertEqual(len(data['expenses']), 2)
+        self.assertEqual(data['expenses'][0]['paid_by_name'], 'testuser')
+        self.assertIsNone(data['next_cursor'])
+
+
+class StatementImportTestCase(SharedSpaceTestCase):
+    """Test cases for bank statement imports"""
+
+    def test_statement_import_in_chunks(self):
+        """Test CSV and OFX statements are imported into matching budgets in chunks"""
+        import io
+        from .utils import StatementImporter, parse_statement
+
+        csv_statement = io.StringIO(
+            'Date,Description,Amount,Category\n'
+            '2025-09-01,Coffee,-4.50,Category 0\n'
+            '09/02/2025,Lunch,"-1,012.25",category 1\n'
+            '2025-09-03,Refund,abc,Category 0\n'
+            '2025-10-01,Next month,-9.00,Category 0\n'
+            '2025-09-04,Unmatched,-3.00,\n'
+            '2025-09-05,Refund,12.00,Category 0\n'
+            '2025-09-06,Store credit,(2.00),Category 2\n'
+        )
+        importer = StatementImporter(self.space, self.user, chunk_size=1)
+        summary = importer.run(parse_statement(csv_statement, 'csv'))
+
+        self.assertEqual((summary['imported'], summary['skipped']), (3, 3))
+        self.assertEqual(Budget.objects.get(id=self.budgets[1].id).total_spent, Decimal('1012.25'))
+        self.assertEqual(Budget.objects.get(id=self.budgets[2].id).total_spent, Decimal('2.00'))
+
+        # Separate debit/credit columns: rows with only a credit value are skipped
+        split_statement = io.StringIO(
+            'Date,Description,Debit,Credit,Category\n'
+            '2025-09-07,Transfer in,,250.00,Category 2\n'
+            '2025-09-08,Books,8.00,,Category 2\n'
+        )
+        summary = importer.run(parse_statement(split_statement, 'csv'))
+        self.assertEqual((summary['imported'], summary['skipped']), (1, 0))
+        self.assertEqual(Budget.objects.get(id=self.budgets[2].id).total_spent, Decimal('10.00'))
+
+        ofx_statement = io.StringIO(
+            '<OFX><BANKTRANLIST>\n'
+            '<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250905120000<TRNAMT>-20.00<NAME>Groceries</STMTTRN>\n'
+            '<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20250906\n<TRNAMT>500.00\n<NAME>Salary\n</STMTTRN>\n'
+            '</BANKTRANLIST></OFX>\n'
+        )
+        importer = StatementImporter(self.space, self.user, default_category='Category 0')
+        summary = importer.run(parse_statement(ofx_statement, 'ofx'))
+
+        self.assertEqual((summary['imported'], summary['skipped']), (1, 0))
+        budget = Budget.objects.get(id=self.budgets[0].id)
+        self.assertEqual(budget.total_spent, Decimal('24.50'))
+        self.assertEqual(ExpenseSplit.objects.filter(actual_expense__budget_item=budget).count(), 2)
+
+        # Single-line OFX 2.x (XML) export with several transactions on one line
+        xml_statement = io.StringIO(
+            '<OFX><BANKTRANLIST>'
+            '<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20250907</DTPOSTED><TRNAMT>-1.00</TRNAMT><NAME>A</NAME></STMTTRN>'
+            '<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20250907</DTPOSTED><TRNAMT>9.00</TRNAMT><NAME>B</NAME></STMTTRN>'
+            '<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20250908</DTPOSTED><TRNAMT>-2.00</TRNAMT><NAME>C</NAME></STMTTRN>'
+            '</BANKTRANLIST></OFX>'
+        )
+        summary = importer.run(parse_statement(xml_statement, 'ofx'))
+        self.assertEqual((summary['imported'], summary['skipped']), (2, 0))
+        self.assertEqual(Budget.objects.get(id=self.budgets[0].id).total_spent, Decimal('27.50'))
+
+        outsider = User.objects.create_user(username='outsider', email='outsider@example.com', password='testpass123')
+        with self.assertRaises(ValueError):
+            StatementImporter(self.space, outsider)
+
+    def test_statement_reimport_and_invalid_rows(self):
+        """Test re-imported transactions are skipped and invalid amounts are reported per row"""
+        import io
+        from .utils import StatementImporter, parse_statement
+
+        def statement():
+            return io.StringIO(
+                'Date,Description,Amount,Category\n'
+                '2025-09-01,Coffee,-4.50,Category 0\n'
+                '2025-09-01,Coffee,-4.50,Category 0\n'
+                '2025-09-02,Car,-123456789.00,Category 0\n'
+            )
+
+        importer = StatementImporter(self.space, self.user, chunk_size=1)
+        summary = importer.run(parse_statement(statement(), 'csv'))
+        self.assertEqual((summary['imported'], summary['skipped'], summary['duplicates']), (2, 1, 0))
+        self.assertTrue(summary['errors'][0].startswith('Row 4: '))
+
+        summary = StatementImporter(self.space, self.user).run(parse_statement(statement(), 'csv'))
+        self.assertEqual((summary['imported'], summary['duplicates']), (0, 2))
+        self.assertEqual(Budget.objects.get(id=self.budgets[0].id).total_spent, Decimal('9.00'))
+
+        ofx_statement = io.StringIO(
+            '<OFX><BANKTRANLIST>'
+            '<STMTTRN><FITID>1</FITID><DTPOSTED>20250903</DTPOSTED><TRNAMT>-1.00</TRNAMT><NAME>A</NAME></STMTTRN>'
+            '<STMTTRN><FITID>1</FITID><DTPOSTED>20250903</DTPOSTED><TRNAMT>-1.00</TRNAMT><NAME>A</NAME></STMTTRN>'
+            '</BANKTRANLIST></OFX>'
+        )
+        summary = StatementImporter(self.space, self.user, default_category='Category 0').run(
+            parse_statement(ofx_statement, 'ofx')
+        )
+        self.assertEqual(summary['imported'], 1)
+
+
+class BudgetExportTestCase(SharedSpaceTestCase):
+    """Test cases for the streaming space export"""
+
+    def test_streaming_export(self):
+        """Test the export streams budgets, expenses and splits for the month range"""
+        expense = ActualExpense.objects.create(
+            budget_item=self.budgets[0],
+            actual_amount=Decimal('12.34'),
+            date_paid=date(2025, 9, 10),
+            paid_by=self.user,
+            description='Movie night'
+        )
+        ExpenseSplit.objects.create(actual_expense=expense, user=self.user, percentage=Decimal('100'), amount=Decimal('12.34'))
+        Budget.objects.create(
+            space=self.space,
+            category=BudgetCategory.objects.get(name='Category 0'),
+            amount=Decimal('80.00'),
+            month_period='2025-11',
+            created_by=self.user
+        )
+
+        response = self.client.get('/budgets/export/', {'format': 'jsonl', 'start': '2025-09', 'end': '2025-10'})
+
+        self.assertTrue(response.streaming)
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record['record_type'] for record in records], ['budget'] * 3 + ['expense', 'split'])
+        self.assertEqual(records[3]['amount'], '12.34')
+        self.assertEqual(records[3]['category'], 'Category 0')
+
+        response = self.client.get('/budgets/export/', {'records': 'expense'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('record_type,id,'))
+
+    def test_export_skips_deleted_budgets_and_validates_input(self):
+        """Test soft-deleted budgets are left out and bad export input is rejected"""
+        import io
+        from django.core.management import CommandError, call_command
+
+        self.budgets[0].soft_delete(deleted_by=self.user)
+        self.space.name = 'Café "Home"'
+        self.space.save()
+
+        response = self.client.get('/budgets/export/', {'format': 'jsonl'})
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertNotIn(self.budgets[0].id, [record['id'] for record in records])
+        self.assertEqual(
+            response['Content-Disposition'],
+            "attachment; filename*=utf-8''Caf%C3%A9_%22Home%22_export.jsonl"
+        )
+
+        response = self.client.get('/budgets/export/', {'records': 'budget,payments'})
+        self.assertEqual(response.status_code, 400)
+
+        with self.assertRaisesMessage(CommandError, '--start must be in YYYY-MM format'):
+            call_command('export_space_data', space=self.space.id, start='2025-13', stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, 'Unknown record types: payments'):
+            call_command('export_space_data', space=self.space.id, records='payments', stdout=io.StringIO())
+
+
+class ExpenseSplitBalanceTestCase(SharedSpaceTestCase):
+    """Test cases for expense split allocation and member balances"""
+
+    def test_split_allocation_adds_up(self):
+        """Test split amounts always add up to the amount being split"""
+        from .utils import SplitAllocator
+
+        thirds = SplitAllocator.equal(Decimal('100.00'), 3)
+        self.assertEqual([part['amount'] for part in thirds], [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')])
+        self.assertEqual(sum(part['percentage'] for part in thirds), Decimal('100.00'))
+
+        mixed = SplitAllocator.allocate(Decimal('90.00'), [('fixed', '30.00'), ('equal', None), ('equal', None)])
+        self.assertEqual([part['amount'] for part in mixed], [Decimal('30.00'), Decimal('30.00'), Decimal('30.00')])
+
+        response = self.client.post(f'/budgets/add-expense/{self.budgets[0].id}/', {
+            'total_amount': '100.01',
+            'date_paid': '2025-09-10',
+            'paid_by': self.user.id,
+            'is_shared': 'on',
+            'split_type': 'equal',
+            'split_members': [self.user.id, self.partner.id],
+        })
+        self.assertEqual(response.status_code, 302)
+        splits = ExpenseSplit.objects.filter(actual_expense__budget_item=self.budgets[0]).order_by('-amount')
+        self.assertEqual([split.amount for split in splits], [Decimal('50.01'), Decimal('50.00')])
+        self.assertEqual(sum(split.percentage for split in splits), Decimal('100.00'))
+
+        response = self.client.post(
+            '/budgets/api/expense-calculator/',
+            json.dumps({'total_amount': '10', 'split_type': 'equal', 'members': [1, 2, 3]}),
+            content_type='application/json'
+        )
+        self.assertEqual([split['amount'] for split in response.json()['splits']], [3.34, 3.33, 3.33])
+
+    def test_balance_recommendations(self):
+        """Test net balances are settled with the fewest transfers"""
+        from .services import BudgetInsightsService
+
+        third = User.objects.create_user(username='third', email='third@example.com', password='testpass123')
+        SpaceMember.objects.create(space=self.space, user=third, role='member', is_active=True)
+
+        def add_expense(paid_by, amount, shares):
+            expense = ActualExpense.objects.create(
+                budget_item=self.budgets[0],
+                actual_amount=Decimal(amount),
+                date_paid=date(2025, 9, 10),
+                paid_by=paid_by,
+                is_shared=True
+            )
+            for user, share in shares:
+                ExpenseSplit.objects.create(
+                    actual_expense=expense,
+                    user=user,
+                    percentage=(Decimal(share) / Decimal(amount) * 100).quantize(Decimal('0.01')),
+                    amount=Decimal(share)
+                )
+
+        add_expense(self.user, '90.00', [(self.user, '30.00'), (self.partner, '30.00'), (third, '30.00')])
+        add_expense(self.partner, '30.00', [(self.user, '15.00'), (self.partner, '15.00')])
+
+        with self.assertNumQueries(2):
+            recommendations = BudgetInsightsService.get_balance_recommendations(self.space)
+
+        transfers = [(r['from_user'], r['to_user'], r['amount']) for r in recommendations]
+        self.assertEqual(transfers, [
+            (third, self.user, Decimal('30.00')),
+            (self.partner, self.user, Decimal('15.00')),
+        ])
+        self.assertEqual(BudgetInsightsService.get_balance_recommendations(self.space, '2025-08'), [])
+
+    def test_member_balance_ledger(self):
+        """Test the ledger follows split and expense changes and matches a rebuild"""
+        import io
+        from django.core.management import call_command
+
+        def balances():
+            return {
+                user_id: balance
+                for user_id, balance in MemberBalance.get_balances(self.space).items()
+                if balance
+            }
+
+        expense = ActualExpense.objects.create(
+            budget_item=self.budgets[0],
+            actual_amount=Decimal('40.00'),
+            date_paid=date(2025, 9, 10),
+            paid_by=self.user,
+            is_shared=True
+        )
+        ExpenseSplit.objects.create(actual_expense=expense, user=self.user, percentage=Decimal('50'), amount=Decimal('20.00'))
+        split = ExpenseSplit.objects.create(actual_expense=expense, user=self.partner, percentage=Decimal('50'), amount=Decimal('20.00'))
+        self.assertEqual(balances(), {self.user.id: Decimal('20.00'), self.partner.id: Decimal('-20.00')})
+
+        split.percentage = Decimal('75')
+        split.amount = Decimal('30.00')
+        split.save()
+        self.assertEqual(balances(), {self.user.id: Decimal('30.00'), self.partner.id: Decimal('-30.00')})
+
+        expense.paid_by = self.partner
+        expense.save()
+        self.assertEqual(balances(), {self.user.id: Decimal('-20.00'), self.partner.id: Decimal('20.00')})
+
+        MemberBalance.objects.update(balance=Decimal('0.00'))
+        call_command('rebuild_member_balances', space=self.space.id, stdout=io.StringIO())
+        self.assertEqual(balances(), {self.user.id: Decimal('-20.00'), self.partner.id: Decimal('20.00')})
+
+        expense.delete()
+        self.assertEqual(balances(), {})
+
+    def test_expense_split_amount_follows_changes(self):
+        """Test split amounts are recalculated when the percentage or the expense amount changes"""
+        third = User.objects.create_user(username='third', email='third@example.com', password='testpass123')
+        SpaceMember.objects.create(space=self.space, user=third, role='member', is_active=True)
+
+        expense = ActualExpense.objects.create(
+            budget_item=self.budgets[0],
+            actual_amount=Decimal('100.00'),
+            date_paid=date(2025, 9, 10),
+            paid_by=self.user,
+            is_shared=True
+        )
+        splits = [
+            ExpenseSplit(actual_expense=expense, user=user, percentage=percentage, amount=amount)
+            for user, percentage, amount in (
+                (self.user, Decimal('33.34'), Decimal('33.34')),
+                (self.partner, Decimal('33.33'), Decimal('33.33')),
+                (third, Decimal('33.33'), Decimal('33.33')),
+            )
+        ]
+        for split in splits:
+            split.amount_allocated = True
+            split.save()
+
+        expense.actual_amount = Decimal('200.00')
+        expense.save()
+        amounts = list(expense.splits.order_by('id').values_list('amount', flat=True))
+        self.assertEqual(amounts, [Decimal('66.68'), Decimal('66.66'), Decimal('66.66')])
+        self.assertEqual(MemberBalance.get_balances(self.space)[self.user.id], Decimal('133.32'))
+
+        split = ExpenseSplit.objects.get(actual_expense=expense, user=third)
+        split.percentage = Decimal('10')
+        split.save()
+        split.refresh_from_db()
+        self.assertEqual(split.amount, Decimal('20.00'))
+
+
+class SpendingForecastTestCase(SharedSpaceTestCase):
+    """Test cases for spending forecasts"""
+
+    def test_spending_forecast(self):
+        """Test forecasts combine level and trend from one query and are cached per space-month"""
+        from django.core.cache import cache
+        from .forms import SmartBudgetCreationForm
+        from .services import BudgetInsightsService
+        from .utils import SpendingForecaster
+
+        cache.clear()
+        category = self.budgets[0].category
+        for month, amount in (('06', '60.00'), ('07', '80.00'), ('08', '100.00')):
+            budget = Budget.objects.create(
+                space=self.space,
+                category=category,
+                amount=Decimal('100.00'),
+                month_period=f'2025-{month}',
+                created_by=self.user
+            )
+            ActualExpense.objects.create(
+                budget_item=budget,
+                actual_amount=Decimal(amount),
+                date_paid=date(2025, int(month), 15),
+                paid_by=self.user
+            )
+
+        def expense_queries(context):
+            return [query for query in context.captured_queries if 'actual_expenses' in query['sql']]
+
+        with CaptureQueriesContext(connection) as context:
+            forecasts = SpendingForecaster.forecast_space(self.space, '2025-09')
+        self.assertEqual(len(expense_queries(context)), 1)
+        self.assertEqual(forecasts[category.id]['ewma'], Decimal('85.00'))
+        self.assertEqual(forecasts[category.id]['trend'], Decimal('20.00'))
+        self.assertEqual(forecasts[category.id]['amount'], Decimal('105.00'))
+
+        self.budgets[0].is_estimated = True
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(BudgetInsightsService.predict_monthly_spending(self.budgets[0]), Decimal('105.00'))
+        self.assertEqual(expense_queries(context), [])
+        self.assertEqual(self.budgets[0].get_average_real_spending(), Decimal('80.00'))
+
+        form = SmartBudgetCreationForm(space=self.space, user=self.user, month_period='2025-09')
+        self.assertEqual(
+            json.loads(form.fields['category'].widget.attrs['data-suggested-amounts']),
+            {str(category.id): '105.00'}
+        )
+
+    def test_seasonal_index_is_damped(self):
+        """Test a zero or outlier month a year ago only nudges the forecast"""
+        from .utils import SpendingForecaster
+
+        flat = [Decimal('100.00')] * 24
+        self.assertEqual(SpendingForecaster.seasonal_index(flat[:23]), Decimal('1'))
+
+        zero_last_year = list(flat)
+        zero_last_year[-12] = Decimal('0.00')
+        index = SpendingForecaster.seasonal_index(zero_last_year)
+        self.assertGreater(index, Decimal('0.7'))
+        self.assertGreater(SpendingForecaster.forecast_series(zero_last_year)['amount'], Decimal('70.00'))
+
+        outlier = list(flat)
+        outlier[-12] = Decimal('5000.00')
+        self.assertEqual(SpendingForecaster.seasonal_index(outlier), Decimal('1.5'))
+
+        # Both years high in the same month is a real pattern
+        seasonal = list(flat)
+        seasonal[-12] = seasonal[-24] = Decimal('200.00')
+        self.assertGreater(SpendingForecaster.seasonal_index(seasonal), Decimal('1.3'))
+
+
+class RecurringRolloverTestCase(SharedSpaceTestCase):
+    """Test cases for rolling recurring budgets into their next period"""
+
+    def test_recurring_rollover(self):
+        """Test recurring budgets roll into their next period once, per recurrence type"""
+        from .services import RecurringRolloverService
+
+        def recurring(name, month_period, recurrence_type, expected_day):
+            return Budget.objects.create(
+                space=self.space,
+                category=BudgetCategory.objects.create(name=name, is_system_default=True),
+                amount=Decimal('50.00'),
+                month_period=month_period,
+                is_recurring=True,
+                recurrence_type=recurrence_type,
+                expected_day=expected_day,
+                assigned_to=self.partner,
+                created_by=self.user
+            )
+
+        rent = recurring('Rent', '2025-09', 'monthly', 31)
+        recurring('Paycheck', '2025-09', 'biweekly', 5)
+        recurring('Insurance', '2025-07', 'quarterly', 15)
+        recurring('Domain', '2024-10', 'yearly', 1)
+        recurring('Gym', '2025-08', 'monthly', 1)  # Not due: rolls into September
+        self.assertEqual(rent.next_due_date, date(2025, 10, 31))
+
+        summary = RecurringRolloverService.rollover('2025-10')
+        self.assertEqual(summary['created'], 4)
+
+        created = Budget.objects.filter(space=self.space, month_period='2025-10')
+        self.assertEqual(
+            {budget.category.name: budget.next_due_date for budget in created},
+            {
+                'Rent': date(2025, 11, 30),
+                'Paycheck': date(2025, 10, 19),
+                'Insurance': date(2026, 1, 15),
+                'Domain': date(2026, 10, 1),
+            }
+        )
+        self.assertTrue(all(budget.assigned_to == self.partner for budget in created))
+
+        summary = RecurringRolloverService.rollover('2025-10')
+        self.assertEqual((summary['created'], summary['skipped']), (0, 4))
+
+    def test_recurring_rollover_month_end_range(self):
+        """Test a month-end range keeps its length and rows lost to conflicts count as skipped"""
+        from unittest import mock
+        from .services import RecurringRolloverService
+
+        Budget.objects.filter(id=self.budgets[0].id).update(
+            is_recurring=True,
+            recurrence_type='monthly',
+            month_period='2025-01',
+            timing_type='date_range',
+            recurrence_pattern='monthly_same_range',
+            range_start=date(2025, 1, 28),
+            range_end=date(2025, 1, 31),
+        )
+
+        summary = RecurringRolloverService.rollover('2025-02')
+        self.assertEqual((summary['created'], summary['skipped']), (1, 0))
+        rolled = Budget.objects.get(space=self.space, category=self.budgets[0].category, month_period='2025-02')
+        self.assertEqual((rolled.range_start, rolled.range_end), (date(2025, 2, 25), date(2025, 2, 28)))
+
+        # A concurrent run inserted the row first: bulk_create drops ours silently
+        rolled.delete()
+        real_bulk_create = Budget.objects.bulk_create
+
+        def concurrent_bulk_create(budgets, **kwargs):
+            real_bulk_create([
+                Budget(
+                    space_id=budget.space_id,
+                    category_id=budget.category_id,
+                    amount=budget.amount,
+                    month_period=budget.month_period,
+                    created_by_id=budget.created_by_id
+                )
+                for budget in budgets
+            ])
+            Budget.objects.filter(month_period='2025-02').update(created_at=timezone.now() - timedelta(seconds=1))
+            return real_bulk_create(budgets, **kwargs)
+
+        with mock.patch.object(Budget.objects, 'bulk_create', side_effect=concurrent_bulk_create):
+            summary = RecurringRolloverService.rollover('2025-02')
+        self.assertEqual((summary['created'], summary['skipped']), (0, 1))
+
+
+class BudgetReminderSweepTestCase(SharedSpaceTestCase):
+    """Test cases for the budget reminder sweep"""
+
+    def test_budget_reminder_sweep(self):
+        """Test the reminder sweep notifies each (user, space) once about due and overdue items"""
+        from notifications.models import InAppNotification
+        from notifications.services import NotificationService
+
+        Budget.objects.filter(id=self.budgets[0].id).update(
+            timing_type='fixed_date', due_date=date(2025, 9, 12), reminder_days_before=3, assigned_to=self.partner
+        )
+        Budget.objects.filter(id=self.budgets[1].id).update(timing_type='fixed_date', due_date=date(2025, 9, 5))
+        Budget.objects.filter(id=self.budgets[2].id).update(timing_type='fixed_date', due_date=date(2025, 9, 25))
+
+        summary = NotificationService.sweep_budget_reminders(today=date(2025, 9, 10))
+        self.assertEqual(summary, {'budgets': 2, 'notifications': 2})
+
+        partner_reminder = InAppNotification.objects.get(recipient=self.partner)
+        self.assertEqual(partner_reminder.priority, 'high')
+        self.assertEqual(
+            partner_reminder.message,
+            'You have 1 overdue items: Category 1; 1 items due soon: Category 0'
+        )
+        self.assertEqual(InAppNotification.objects.get(recipient=self.user).message, 'You have 1 overdue items: Category 1')
+
+        # Dated reruns deduplicate against reminders created on that date, not today
+        InAppNotification.objects.update(created_at=timezone.make_aware(datetime(2025, 9, 10, 9)))
+        self.assertEqual(NotificationService.sweep_budget_reminders(today=date(2025, 9, 10))['notifications'], 0)
+        self.assertEqual(NotificationService.sweep_budget_reminders(today=date(2025, 9, 11))['notifications'], 2)
+
+
+class BudgetChangeApprovalTestCase(SharedSpaceTestCase):
+    """Test cases for budget change request approvals"""
+
+    def test_expired_requests_processed_in_chunks(self):
+        """Test expired change requests are auto-approved chunk by chunk with batched logs and notifications"""
+        from notifications.models import InAppNotification
+        from .approval_models import BudgetChangeRequest, ChangeHistoryLog
+        from .services import BudgetChangeService
+
+        requests = [
+            BudgetChangeRequest.objects.create(
+                budget_item=budget,
+                requested_by=self.partner,
+                change_type='amount',
+                old_values={'amount': '100.00'},
+                new_values={'amount': str(200 + index)},
+                expires_at=timezone.now() + timedelta(days=1)
+            )
+            for index, budget in enumerate(self.budgets)
+        ]
+        BudgetChangeRequest.objects.filter(id__in=[r.id for r in requests[:2]]).update(
+            expires_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(BudgetChangeService.check_expired_requests(chunk_size=1), 2)
+
+        statuses = dict(BudgetChangeRequest.objects.values_list('id', 'status'))
+        self.assertEqual(
+            [statuses[r.id] for r in requests], ['auto_approved', 'auto_approved', 'pending']
+        )
+        self.assertEqual(
+            list(Budget.objects.filter(id__in=[b.id for b in self.budgets]).order_by('id').values_list('amount', flat=True)),
+            [Decimal('200.00'), Decimal('201.00'), Decimal('100.00')]
+        )
+        self.assertEqual(ChangeHistoryLog.objects.filter(was_auto_approved=True).count(), 2)
+        self.assertEqual(
+            InAppNotification.objects.filter(recipient=self.partner, notification_type='approval_auto_approved').count(), 2
+        )
+
+        # Nothing left to claim
+        self.assertEqual(BudgetChangeService.check_expired_requests(), 0)
+
+    def test_expired_requests_on_one_budget(self):
+        """Test two expired requests for one budget in a chunk both keep their change"""
+        from .approval_models import BudgetChangeRequest
+        from .services import BudgetChangeService
+
+        budget = self.budgets[0]
+        for change_type, old_values, new_values in (
+            ('amount', {'amount': '100.00'}, {'amount': '250.00'}),
+            ('assignment', {'assigned_to': None}, {'assigned_to': self.partner.id}),
+        ):
+            BudgetChangeRequest.objects.create(
+                budget_item=budget,
+                requested_by=self.user,
+                change_type=change_type,
+                old_values=old_values,
+                new_values=new_values,
+                expires_at=timezone.now() - timedelta(hours=1)
+            )
+
+        self.assertEqual(BudgetChangeService.check_expired_requests(), 2)
+
+        budget.refresh_from_db()
+        self.assertEqual((budget.amount, budget.assigned_to), (Decimal('250.00'), self.partner))
+
+    def test_pending_approvals_inbox(self):
+        """Test the inbox loads in fixed queries and the cached badge count follows creates and votes"""
+        from .approval_models import BudgetChangeRequest
+        from .services import BudgetChangeService
+
+        def approval_queries(context):
+            return [query for query in context.captured_queries if 'cache_table' not in query['sql']]
+
+        for budget in self.budgets[:2]:
+            BudgetChangeRequest.objects.create(
+                budget_item=budget,
+                requested_by=self.user,
+                change_type='amount',
+                old_values={'amount': '100.00'},
+                new_values={'amount': '120.00'},
+                expires_at=timezone.now() + timedelta(days=1)
+            )
+
+        with self.assertNumQueries(2):
+            inbox = list(BudgetChangeService.get_pending_approvals_for_user(self.partner))
+            summaries = [(r.budget_item.category.name, r.requested_by.username, r.get_change_summary()) for r in inbox]
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(BudgetChangeService.get_pending_approvals_for_user(self.user).count(), 0)
+
+        self.client.force_login(self.partner)
+        response = self.client.get('/spaces/pending/')
+        self.assertContains(response, 'Change amount from $100.00 to $120.00', count=2)
+        self.client.force_login(self.user)
+
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 2)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 2)
+        self.assertEqual(approval_queries(context), [])
+
+        inbox[0].approve(self.partner)
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 1)
+
+        # Requests deleted with their budget leave the count
+        Budget.objects.filter(id=inbox[1].budget_item_id).delete()
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 0)
+
+        # Members deactivated by archiving the space get a fresh count too
+        BudgetChangeRequest.objects.create(
+            budget_item=self.budgets[2],
+            requested_by=self.user,
+            change_type='amount',
+            old_values={'amount': '100.00'},
+            new_values={'amount': '130.00'},
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 1)
+        self.client.post(f'/spaces/{self.space.pk}/archive/')
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.partner), 0)
+
+    def test_concurrent_approval_votes(self):
+        """Test votes from stale copies of a request all count and only the quorum vote resolves it"""
+        from notifications.models import InAppNotification
+        from .approval_models import BudgetChangeRequest
+
+        third = User.objects.create_user(username='third', email='third@example.com', password='testpass123')
+        SpaceMember.objects.create(space=self.space, user=third, role='member', is_active=True)
+        change_request = BudgetChangeRequest.objects.create(
+            budget_item=self.budgets[0],
+            requested_by=self.user,
+            change_type='amount',
+            old_values={'amount': '100.00'},
+            new_values={'amount': '180.00'},
+            required_approvals=2,
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+
+        # Both voters loaded the request before either vote was recorded
+        first_copy = BudgetChangeRequest.objects.get(pk=change_request.pk)
+        second_copy = BudgetChangeRequest.objects.get(pk=change_request.pk)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            first_copy.approve(self.partner)
+        self.assertEqual(callbacks, [])
+        self.assertEqual((first_copy.status, first_copy.received_approvals), ('pending', 1))
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            second_copy.approve(third)
+        self.assertIn(second_copy._on_approved, callbacks)
+        self.assertEqual((second_copy.status, second_copy.received_approvals), ('approved', 2))
+
+        self.budgets[0].refresh_from_db()
+        self.assertEqual(self.budgets[0].amount, Decimal('180.00'))
+        self.assertEqual(
+            InAppNotification.objects.filter(recipient=self.user, notification_type='approval_approved').count(), 1
+        )
+
+        with self.assertRaises(ValidationError):
+            first_copy.reject(self.partner)
+
+        # A change that cannot be applied rolls the quorum vote back
+        broken_request = BudgetChangeRequest.objects.create(
+            budget_item=self.budgets[1],
+            requested_by=self.user,
+            change_type='assignment',
+            old_values={'assigned_to': None},
+            new_values={'assigned_to': 999999},
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValidationError):
+                broken_request.approve(self.partner)
+        self.assertEqual(callbacks, [])
+        broken_request.refresh_from_db()
+        self.assertEqual((broken_request.status, broken_request.received_approvals), ('pending', 0))
+        self.assertFalse(broken_request.votes.exists())
+
+    def test_batch_approval_decisions(self):
+        """Test the batch endpoint votes on many requests and sends one summary per requester"""
+        from notifications.models import InAppNotification
+        from .approval_models import BudgetChangeRequest, BudgetChangeVote, ChangeHistoryLog
+        from .services import BudgetChangeService
+
+        change_requests = [
+            BudgetChangeRequest.objects.create(
+                budget_item=budget,
+                requested_by=self.partner,
+                change_type='amount',
+                old_values={'amount': '100.00'},
+                new_values={'amount': str(150 + index)},
+                expires_at=timezone.now() + timedelta(days=1)
+            )
+            for index, budget in enumerate(self.budgets)
+        ]
+        own_request = BudgetChangeRequest.objects.create(
+            budget_item=self.budgets[0],
+            requested_by=self.user,
+            change_type='amount',
+            old_values={'amount': '100.00'},
+            new_values={'amount': '90.00'},
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+
+        decisions = [
+            {'id': change_requests[0].id, 'decision': 'approve'},
+            {'id': change_requests[1].id, 'decision': 'approve'},
+            {'id': change_requests[2].id, 'decision': 'reject', 'reason': 'Too much'},
+            {'id': own_request.id, 'decision': 'approve'},
+            {'id': 'abc', 'decision': 'approve'},
+        ]
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.user), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/spaces/pending/batch/', json.dumps({'decisions': decisions}), content_type='application/json'
+            )
+            # Counts are only reset once the batch has committed
+            self.assertEqual(BudgetChangeService.get_pending_approval_count(self.user), 3)
+        self.assertEqual(BudgetChangeService.get_pending_approval_count(self.user), 0)
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['approved'], [change_requests[0].id, change_requests[1].id])
+        self.assertEqual(data['rejected'], [change_requests[2].id])
+        self.assertEqual(set(data['errors']), {str(own_request.id), 'abc'})
+
+        self.assertEqual(BudgetChangeVote.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(ChangeHistoryLog.objects.count(), 2)
+        self.assertEqual(
+            list(Budget.objects.filter(id__in=[b.id for b in self.budgets]).order_by('id').values_list('amount', flat=True)),
+            [Decimal('150.00'), Decimal('151.00'), Decimal('100.00')]
+        )
+        notification = InAppNotification.objects.get(recipient=self.partner)
+        self.assertEqual(
+            notification.message,
+            'Your budget changes were reviewed. 2 approved: Category 0, Category 1; 1 rejected: Category 2'
+        )
+
+        # Deciding again finds nothing left to vote on
+        response = self.client.post(
+            '/spaces/pending/batch/', json.dumps({'decisions': decisions[:1]}), content_type='application/json'
+        )
+        self.assertEqual(list(response.json()['errors']), [str(change_requests[0].id)])
+
+    def test_batch_approval_on_one_budget(self):
+        """Test two approved requests for one budget in a batch both keep their change and email the requester"""
+        from unittest import mock
+        from notifications.services import NotificationService
+        from .approval_models import BudgetChangeRequest
+        from .services import BudgetChangeService
+
+        SpaceSettings.objects.filter(space=self.space).update(notifications_email=True)
+        budget = self.budgets[0]
+        change_requests = [
+            BudgetChangeRequest.objects.create(
+                budget_item=budget,
+                requested_by=self.partner,
+                change_type=change_type,
+                old_values=old_values,
+                new_values=new_values,
+                expires_at=timezone.now() + timedelta(days=1)
+            )
+            for change_type, old_values, new_values in (
+                ('amount', {'amount': '100.00'}, {'amount': '250.00'}),
+                ('assignment', {'assigned_to': None}, {'assigned_to': self.partner.id}),
+            )
+        ]
+
+        with mock.patch.object(NotificationService, '_send_approval_result_email') as send_email:
+            with self.captureOnCommitCallbacks(execute=True):
+                results = BudgetChangeService.decide_batch(self.user, [
+                    {'id': change_request.id, 'decision': 'approve'} for change_request in change_requests
+                ])
+
+        self.assertEqual(results['approved'], [change_request.id for change_request in change_requests])
+        budget.refresh_from_db()
+        self.assertEqual((budget.amount, budget.assigned_to), (Decimal('250.00'), self.partner))
+        self.assertEqual(
+            [call.args for call in send_email.call_args_list],
+            [(change_request, 'approval_approved') for change_request in change_requests]
+        )
+
+
+class ChangeHistoryTestCase(SharedSpaceTestCase):
+    """Test cases for the space change history"""
+
+    def test_change_history_pages(self):
+        """Test the change history pages by cursor with type and date filters"""
+        from .approval_models import BudgetChangeRequest, ChangeHistoryLog
+        from .services import BudgetChangeService
+
+        change_request = BudgetChangeRequest.objects.create(
+            budget_item=self.budgets[0],
+            requested_by=self.user,
+            change_type='amount',
+            old_values={'amount': '100.00'},
+            new_values={'amount': '120.00'},
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        logs = ChangeHistoryLog.objects.bulk_create([
+            ChangeHistoryLog(
+                space=self.space, change_request=change_request, change_type=change_type,
+                old_value={}, new_value={}, changed_by=self.user
+            )
+            for change_type in ['amount', 'assignment', 'amount', 'delete', 'amount']
+        ])
+        # Two entries share a timestamp so the id tie-breaker is exercised
+        base = timezone.make_aware(datetime(2025, 9, 10, 12, 0))
+        for log, offset in zip(logs, [0, 1, 1, 2, 3]):
+            ChangeHistoryLog.objects.filter(id=log.id).update(timestamp=base + timedelta(days=offset))
+
+        seen = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(2):
+                page = BudgetChangeService.get_change_history_page(self.space, limit=2, cursor=cursor)
+                names = [entry.changed_by.username for entry in page['entries']]
+            self.assertEqual(names, ['testuser'] * len(page['entries']))
+            seen.extend(entry.id for entry in page['entries'])
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        self.assertEqual(seen, [logs[4].id, logs[3].id, logs[2].id, logs[1].id, logs[0].id])
+
+        page = BudgetChangeService.get_change_history_page(
+            self.space, change_type='amount', since=date(2025, 9, 11), until=date(2025, 9, 12)
+        )
+        self.assertEqual([entry.id for entry in page['entries']], [logs[2].id])
+
+        with self.assertRaises(ValueError):
+            BudgetChangeService.get_change_history_page(self.space, cursor='not-a-cursor')
+
+        # The history page links to the next page with the filters kept
+        ChangeHistoryLog.objects.bulk_create([
+            ChangeHistoryLog(
+                space=self.space, change_request=change_request, change_type='amount',
+                old_value={'amount': '1.00'}, new_value={'amount': '2.00'}, changed_by=self.user
+            )
+            for _ in range(50)
+        ])
+        response = self.client.get(f'/spaces/{self.space.pk}/history/', {'type': 'amount'})
+        self.assertEqual(len(response.context['history']), 50)
+        self.assertContains(response, 'Changed amount from $1.00 to $2.00')
+        next_query = response.context['next_page_query']
+        self.assertIn('type=amount', next_query)
+
+        response = self.client.get(f'/spaces/{self.space.pk}/history/?{next_query}')
+        self.assertEqual([entry.id for entry in response.context['history']], [logs[4].id, logs[2].id, logs[0].id])
+        self.assertIsNone(response.context['next_page_query'])
@@ -9,6 +9,7 @@ urlpatterns = [
     path('', budget_views.budget_home, name='home'),
     path('month/<str:month_period>/', budget_views.budget_month_view, name='month_view'),
     path('analytics/', budget_views.budget_analytics, name='analytics'),
+    path('export/', budget_views.budget_export, name='export'),
 
     # API endpoints
     path('api/category-suggestions/', budget_views.category_suggestions_api, name='category_suggestions_api'),
@@ -56,10 +57,12 @@ urlpatterns = [
 
     # Expenses
     path('add-expense/<int:budget_id>/', views_expenses.add_expense, name='add_expense'),
+    path('import-statement/', views_expenses.import_statement, name='import_statement'),
     path('api/expense-calculator/', views_expenses.expense_calculator, name='expense_calculator'),
 
     # Expense API endpoints
     path('api/expense/create/', views_expenses.create_expense_api, name='create_expense_api'),
+    path('api/expenses/bulk/', views_expenses.create_expenses_bulk_api, name='create_expenses_bulk_api'),
     path('api/expenses/<int:budget_id>/', views_expenses.list_expenses_api, name='list_expenses_api'),
     path('api/expense/<int:expense_id>/delete/', views_expenses.delete_expense_api, name='delete_expense_api'),
 ]
\ No newline at end of file
@@ -1,5 +1,16 @@
+from .allocation import SplitAllocator
 from .deletion_utils import BudgetDeletionUtils
+from .export import EXPORT_FORMATS, EXPORT_RECORD_TYPES, iter_export_records
+from .forecast import SpendingForecaster
+from .statement_import import StatementImporter, parse_statement
 
 __all__ = [
     'BudgetDeletionUtils',
+    'EXPORT_FORMATS',
+    'EXPORT_RECORD_TYPES',
+    'iter_export_records',
+    'SplitAllocator',
+    'SpendingForecaster',
+    'StatementImporter',
+    'parse_statement',
 ]
\ No newline at end of file
@@ -0,0 +1,144 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+CENT = Decimal('0.01')
+BASIS_POINTS = 10000  # 100.00% expressed in hundredths of a percent
+
+
+class SplitAllocator:
+    """
+    Exact split allocation in integer cents
+
+    Every allocation uses largest-remainder rounding, so the parts always add
+    up to the amount being split (e.g. $100 three ways is 33.34 + 33.33 + 33.33).
+    """
+
+    @staticmethod
+    def to_cents(amount) -> int:
+        """Convert a money amount to integer cents"""
+        return int(Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+    @staticmethod
+    def from_cents(cents: int) -> Decimal:
+        """Convert integer cents back to a 2-place Decimal"""
+        return (Decimal(cents) / 100).quantize(CENT)
+
+    @staticmethod
+    def to_basis_points(percentage) -> int:
+        """Convert a percentage (2 decimal places) to integer basis points"""
+        return SplitAllocator.to_cents(percentage)
+
+    @staticmethod
+    def allocate_cents(total: int, weights: Sequence[int]) -> List[int]:
+        """
+        Split an integer total in proportion to integer weights (largest remainder)
+
+        Each part gets floor(total * weight / sum(weights)); the cents left over go
+        one each to the parts with the largest remainders, earlier parts first on ties.
+        """
+        weight_sum = sum(weights)
+        if not weights:
+            return []
+        if weight_sum <= 0:
+            if total:
+                raise ValueError('Cannot allocate an amount across zero weights')
+            return [0] * len(weights)
+
+        parts = []
+        remainders = []
+        for index, weight in enumerate(weights):
+            quotient, remainder = divmod(total * weight, weight_sum)
+            parts.append(quotient)
+            remainders.append((-remainder, index))
+
+        for _, index in sorted(remainders)[:total - sum(parts)]:
+            parts[index] += 1
+        return parts
+
+    @staticmethod
+    def _allocate_parts_cents(total_cents: int, parts: Sequence[Tuple[str, object]]) -> List[int]:
+        """Allocate one total across (split_type, value) parts, all in cents"""
+        amounts = [0] * len(parts)
+
+        fixed = [(index, SplitAllocator.to_cents(value)) for index, (split_type, value) in enumerate(parts)
+                 if split_type in ('fixed', 'fixed_amount')]
+        percentage = [(index, SplitAllocator.to_basis_points(value)) for index, (split_type, value) in enumerate(parts)
+                      if split_type == 'percentage']
+        equal = [index for index, (split_type, _) in enumerate(parts) if split_type == 'equal']
+
+        for index, cents in fixed:
+            amounts[index] = cents
+
+        if percentage:
+            basis_points = sum(bp for _, bp in percentage)
+            # Share of the total covered by the percentages, rounded half up to the cent
+            target = (2 * total_cents * basis_points + BASIS_POINTS) // (2 * BASIS_POINTS)
+            for (index, _), cents in zip(percentage, SplitAllocator.allocate_cents(target, [bp for _, bp in percentage])):
+                amounts[index] = cents
+
+        if equal:
+            remaining = max(total_cents - sum(amounts), 0)
+            for index, cents in zip(equal, SplitAllocator.allocate_cents(remaining, [1] * len(equal))):
+                amounts[index] = cents
+
+        return amounts
+
+    @staticmethod
+    def percentages_for(amounts_cents: Sequence[int], total_cents: int) -> List[int]:
+        """Basis points for each amount, summing to 100.00% when the amounts cover the total"""
+        if total_cents <= 0:
+            return [0] * len(amounts_cents)
+        target = (2 * BASIS_POINTS * sum(amounts_cents) + total_cents) // (2 * total_cents)
+        return SplitAllocator.allocate_cents(target, list(amounts_cents))
+
+    @staticmethod
+    def allocate(total, parts: Sequence[Tuple[str, object]]) -> List[Dict[str, Decimal]]:
+        """
+        Allocate a total across split parts
+
+        Args:
+            total: Amount being split
+            parts: (split_type, value) pairs; split_type is 'equal' (value ignored),
+                'percentage' (value in percent) or 'fixed'/'fixed_amount' (value in money)
+
+        Fixed parts keep their amount, percentage parts share total * sum(percent)
+        and equal parts share whatever is left.
+
+        Returns:
+            list: {'amount': Decimal, 'percentage': Decimal} per part, in order;
+                percentages of equal and fixed parts are derived from the amounts
+        """
+        return SplitAllocator.allocate_many([(total, parts)])[0]
+
+    @staticmethod
+    def allocate_many(requests: Iterable[Tuple[object, Sequence[Tuple[str, object]]]]) -> List[List[Dict[str, Decimal]]]:
+        """Allocate many (total, parts) requests in one pass of integer-cent math"""
+        results = []
+        for total, parts in requests:
+            total_cents = SplitAllocator.to_cents(total)
+            amounts = SplitAllocator._allocate_parts_cents(total_cents, parts)
+            percentages = SplitAllocator.percentages_for(amounts, total_cents)
+            # Percentage parts keep the percentage they asked for
+            for index, (split_type, value) in enumerate(parts):
+                if split_type == 'percentage':
+                    percentages[index] = SplitAllocator.to_basis_points(value)
+            results.append([
+                {'amount': SplitAllocator.from_cents(cents), 'percentage': SplitAllocator.from_cents(bp)}
+                for cents, bp in zip(amounts, percentages)
+            ])
+        return results
+
+    @staticmethod
+    def equal(total, count: int) -> List[Dict[str, Decimal]]:
+        """Split a total equally between count members"""
+        return SplitAllocator.allocate(total, [('equal', None)] * count)
+
+    @staticmethod
+    def by_percentage(total, percentages: Sequence) -> List[Dict[str, Decimal]]:
+        """Split a total by percentages"""
+        return SplitAllocator.allocate(total, [('percentage', percentage) for percentage in percentages])
+
+    @staticmethod
+    def by_amount(total, amounts: Sequence) -> List[Dict[str, Decimal]]:
+        """Describe fixed amounts of a total (adds the matching percentages)"""
+        return SplitAllocator.allocate(total, [('fixed', amount) for amount in amounts])
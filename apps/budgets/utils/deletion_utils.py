@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 from typing import Dict, List, Optional, Tuple
 
 from ..models import Budget, BudgetSplit, ActualExpense
-from spaces.models import SpaceMember
+from spaces.utils import SpaceMembershipResolver
 
 User = get_user_model()
 logger = logging.getLogger('budget_deletion')
@@ -25,24 +25,20 @@ class BudgetDeletionUtils:
         """
         try:
             # Check if user is a member of the space
-            space_member = SpaceMember.objects.filter(
-                space=budget.space,
-                user=user,
-                is_active=True
-            ).first()
+            role = SpaceMembershipResolver.get_role(budget.space_id, user)
 
-            if not space_member:
+            if not role:
                 return False, f"User is not a member of space '{budget.space.name}'"
 
             # Check if user is the budget creator or space admin
-            if budget.created_by == user:
+            if budget.created_by_id == user.pk:
                 return True, "User is budget creator"
 
-            if space_member.role in ['admin', 'owner']:
-                return True, f"User has {space_member.role} role in space"
+            if role in ['admin', 'owner']:
+                return True, f"User has {role} role in space"
 
             # Check if budget is assigned to the user
-            if budget.assigned_to == user:
+            if budget.assigned_to_id == user.pk:
                 return True, "Budget is assigned to user"
 
             return False, "User does not have permission to delete this budget"
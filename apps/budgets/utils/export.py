@@ -0,0 +1,146 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from ..models import Budget, ActualExpense, ExpenseSplit
+
+
+EXPORT_RECORD_TYPES = ['budget', 'expense', 'split']
+
+# values() projection per record type: output column -> model lookup
+EXPORT_FIELDS = {
+    'budget': {
+        'id': 'id',
+        'month_period': 'month_period',
+        'category': 'category__name',
+        'amount': 'amount',
+        'assigned_to': 'assigned_to__username',
+        'is_estimated': 'is_estimated',
+        'is_recurring': 'is_recurring',
+        'notes': 'notes',
+        'created_at': 'created_at',
+    },
+    'expense': {
+        'id': 'id',
+        'budget_id': 'budget_item_id',
+        'month_period': 'month_period',
+        'category': 'budget_item__category__name',
+        'date_paid': 'date_paid',
+        'amount': 'actual_amount',
+        'paid_by': 'paid_by__username',
+        'description': 'description',
+        'is_shared': 'is_shared',
+        'created_at': 'created_at',
+    },
+    'split': {
+        'id': 'id',
+        'expense_id': 'actual_expense_id',
+        'user': 'user__username',
+        'percentage': 'percentage',
+        'amount': 'amount',
+    },
+}
+
+# Union of all columns, in a stable order, for the single-sheet CSV export
+CSV_COLUMNS = ['record_type'] + list(dict.fromkeys(
+    column for fields in EXPORT_FIELDS.values() for column in fields
+))
+
+
+def _export_querysets(space, start_month: Optional[str], end_month: Optional[str]):
+    """Querysets for each record type, limited to the space's active budgets in the month range"""
+    budgets = Budget.objects.active().filter(space=space)
+    expenses = ActualExpense.objects.filter(
+        budget_item__space=space,
+        budget_item__deleted_at__isnull=True,
+        budget_item__is_active=True,
+    )
+    splits = ExpenseSplit.objects.filter(
+        actual_expense__budget_item__space=space,
+        actual_expense__budget_item__deleted_at__isnull=True,
+        actual_expense__budget_item__is_active=True,
+    )
+
+    if start_month:
+        budgets = budgets.filter(month_period__gte=start_month)
+        expenses = expenses.filter(budget_item__month_period__gte=start_month)
+        splits = splits.filter(actual_expense__budget_item__month_period__gte=start_month)
+    if end_month:
+        budgets = budgets.filter(month_period__lte=end_month)
+        expenses = expenses.filter(budget_item__month_period__lte=end_month)
+        splits = splits.filter(actual_expense__budget_item__month_period__lte=end_month)
+
+    return {
+        'budget': budgets.order_by('month_period', 'id'),
+        'expense': expenses.order_by('date_paid', 'id'),
+        'split': splits.order_by('actual_expense_id', 'id'),
+    }
+
+
+def iter_export_records(
+    space,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    record_types: Iterable[str] = EXPORT_RECORD_TYPES,
+    chunk_size: int = 2000
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Lazily yield (record_type, row) for a space's budgets, expenses and splits
+
+    Each type is read with a values() projection through .iterator(chunk_size),
+    so only one chunk of rows is in memory at a time.
+    """
+    querysets = _export_querysets(space, start_month, end_month)
+
+    for record_type in EXPORT_RECORD_TYPES:
+        if record_type not in record_types:
+            continue
+
+        fields = EXPORT_FIELDS[record_type]
+        rows = querysets[record_type].values_list(*fields.values())
+        for values in rows.iterator(chunk_size=chunk_size):
+            yield record_type, dict(zip(fields, values))
+
+
+def _serialize(value):
+    """Convert a database value to its export representation"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(records: Iterable[Tuple[str, Dict]]) -> Iterator[str]:
+    """Yield CSV lines (one header, then one line per record) with a record_type column"""
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, restval='')
+    yield writer.writeheader()
+    for record_type, row in records:
+        yield writer.writerow({
+            'record_type': record_type,
+            **{column: _serialize(value) for column, value in row.items()}
+        })
+
+
+def stream_jsonl(records: Iterable[Tuple[str, Dict]]) -> Iterator[str]:
+    """Yield one JSON object per line for each record"""
+    for record_type, row in records:
+        yield json.dumps({
+            'record_type': record_type,
+            **{column: _serialize(value) for column, value in row.items()}
+        }) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson'),
+}
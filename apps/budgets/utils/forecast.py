@@ -0,0 +1,162 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from ..models import ActualExpense
+
+CENT = Decimal('0.01')
+
+
+def previous_periods(month_period: str, months: int) -> List[str]:
+    """The `months` YYYY-MM periods before month_period, oldest first"""
+    year, month = map(int, month_period.split('-'))
+    periods = []
+    for _ in range(months):
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+        periods.append(f"{year:04d}-{month:02d}")
+    return periods[::-1]
+
+
+class SpendingForecaster:
+    """
+    Per-category spending forecasts for a space's month
+
+    Each category's monthly totals are read with one grouped query for the whole
+    space, then combined from three estimates: an exponentially weighted moving
+    average (level), a least-squares slope (trend) and the same month in earlier
+    years relative to those years' means (seasonality, damped).
+    """
+
+    HISTORY_MONTHS = 24
+    EWMA_ALPHA = Decimal('0.5')
+    MIN_TREND_MONTHS = 3
+    SEASONAL_MIN_MONTHS = 24  # Two seasons, so one year's odd month is not taken as a pattern
+    SEASONAL_WEIGHT = Decimal('0.5')
+    SEASONAL_BOUNDS = (Decimal('0.5'), Decimal('1.5'))
+    CACHE_TIMEOUT = 60 * 60  # Forecasts only use earlier months, so an hour-old value is fine
+
+    @staticmethod
+    def cache_key(space_id: int, month_period: str) -> str:
+        """Cache key for one space-month of forecasts"""
+        return f'budgets:forecast:{space_id}:{month_period}'
+
+    @staticmethod
+    def monthly_history(space, month_period: str, months: int = HISTORY_MONTHS) -> Dict[int, List[Decimal]]:
+        """
+        Monthly spending per category for the months before month_period (one query)
+
+        Returns:
+            dict: {category_id: totals oldest first}, starting at the category's first
+                month with spending and zero-filled after that
+        """
+        periods = previous_periods(month_period, months)
+        totals = {}
+        for row in ActualExpense.objects.filter(
+            budget_item__space=space,
+            month_period__in=periods
+        ).values('budget_item__category_id', 'month_period').annotate(
+            total=Sum('actual_amount')
+        ).order_by():
+            totals.setdefault(row['budget_item__category_id'], {})[row['month_period']] = row['total']
+
+        history = {}
+        for category_id, by_month in totals.items():
+            first = min(by_month)
+            history[category_id] = [
+                by_month.get(period, Decimal('0.00')) for period in periods if period >= first
+            ]
+        return history
+
+    @staticmethod
+    def ewma(series: Sequence[Decimal], alpha: Decimal = EWMA_ALPHA) -> Decimal:
+        """Exponentially weighted moving average, newest months weighted most"""
+        level = series[0]
+        for value in series[1:]:
+            level = alpha * value + (1 - alpha) * level
+        return level
+
+    @staticmethod
+    def trend(series: Sequence[Decimal]) -> Decimal:
+        """Least-squares slope of the series, in money per month"""
+        count = len(series)
+        if count < 2:
+            return Decimal('0')
+        mean_x = Decimal(count - 1) / 2
+        mean_y = sum(series, Decimal('0')) / count
+        covariance = sum((Decimal(x) - mean_x) * (y - mean_y) for x, y in enumerate(series))
+        variance = sum((Decimal(x) - mean_x) ** 2 for x in range(count))
+        return covariance / variance
+
+    @staticmethod
+    def seasonal_index(series: Sequence[Decimal]) -> Decimal:
+        """
+        How the coming month usually compares with its year, as a damped multiplier
+
+        Each full year of history gives the same month's ratio to that year's mean.
+        The ratios are averaged, blended halfway toward 1 and clamped, so one
+        unusual month (or a zero) cannot scale the whole forecast. Returns 1 with
+        fewer than SEASONAL_MIN_MONTHS of history.
+        """
+        if len(series) < SpendingForecaster.SEASONAL_MIN_MONTHS:
+            return Decimal('1')
+
+        ratios = []
+        for end in range(len(series), 11, -12):
+            year = series[end - 12:end]
+            year_mean = sum(year, Decimal('0')) / 12
+            if year_mean > 0:
+                ratios.append(year[0] / year_mean)
+        if not ratios:
+            return Decimal('1')
+
+        index = 1 + SpendingForecaster.SEASONAL_WEIGHT * (sum(ratios, Decimal('0')) / len(ratios) - 1)
+        low, high = SpendingForecaster.SEASONAL_BOUNDS
+        return min(max(index, low), high)
+
+    @staticmethod
+    def forecast_series(series: Sequence[Decimal]) -> Dict:
+        """Combine level, trend and seasonality into one forecast for the next month"""
+        level = SpendingForecaster.ewma(series)
+        trend = SpendingForecaster.trend(series) if len(series) >= SpendingForecaster.MIN_TREND_MONTHS else Decimal('0')
+        seasonal = SpendingForecaster.seasonal_index(series)
+        amount = max((level + trend) * seasonal, Decimal('0'))
+        return {
+            'amount': amount.quantize(CENT),
+            'ewma': level.quantize(CENT),
+            'trend': trend.quantize(CENT),
+            'seasonal_index': seasonal.quantize(Decimal('0.001')),
+            'months': len(series),
+        }
+
+    @staticmethod
+    def forecast_space(space, month_period: str) -> Dict[int, Dict]:
+        """
+        Forecasts for every category with spending history in a space (cached per space and month)
+
+        Returns:
+            dict: {category_id: {'amount', 'ewma', 'trend', 'seasonal_index', 'months'}}
+        """
+        key = SpendingForecaster.cache_key(space.id, month_period)
+        forecasts = cache.get(key)
+        if forecasts is None:
+            forecasts = {
+                category_id: SpendingForecaster.forecast_series(series)
+                for category_id, series in SpendingForecaster.monthly_history(space, month_period).items()
+            }
+            cache.set(key, forecasts, SpendingForecaster.CACHE_TIMEOUT)
+        return forecasts
+
+    @staticmethod
+    def suggested_amounts(space, month_period: Optional[str]) -> Dict[int, Decimal]:
+        """Forecast amounts by category ID, for pre-filling budget forms"""
+        if not space or not month_period:
+            return {}
+        return {
+            category_id: forecast['amount']
+            for category_id, forecast in SpendingForecaster.forecast_space(space, month_period).items()
+            if forecast['amount'] > 0
+        }
@@ -0,0 +1,358 @@
+import csv
+import logging
+import re
+from collections import Counter
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from spaces.models import SpaceMember
+
+from ..models import Budget, ActualExpense, ExpenseSplit, BudgetSpendingRollup
+
+User = get_user_model()
+logger = logging.getLogger('budget_import')
+
+
+# Accepted CSV header names for each transaction field (compared lowercased)
+CSV_COLUMN_ALIASES = {
+    'date': ['date', 'transaction date', 'posted date', 'posting date', 'date_paid'],
+    # Signed amount: negative is money out, positive is a credit
+    'amount': ['amount', 'transaction amount', 'actual_amount'],
+    # Separate money-out / money-in columns, both written as positive numbers
+    'debit': ['debit', 'debit amount', 'withdrawal', 'withdrawals'],
+    'credit': ['credit', 'credit amount', 'deposit', 'deposits'],
+    'description': ['description', 'payee', 'name', 'memo', 'details'],
+    'category': ['category', 'budget', 'budget category'],
+}
+
+CSV_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%m/%d/%y', '%Y/%m/%d']
+
+OFX_TAG_PATTERN = re.compile(r'<(\w+)>([^<\r\n]*)')
+OFX_TRANSACTION_PATTERN = re.compile(r'<STMTTRN>(.*?)</STMTTRN>', re.IGNORECASE | re.DOTALL)
+OFX_TRANSACTION_START = re.compile(r'<STMTTRN>', re.IGNORECASE)
+
+
+class StatementRowError(ValueError):
+    """A statement row that cannot be turned into an expense"""
+
+
+def _parse_amount(value: str) -> Decimal:
+    """Parse a signed statement amount such as '-1,234.56', '(45.00)' or '$45.00'"""
+    cleaned = (value or '').strip().replace(',', '').replace('$', '')
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = '-' + cleaned[1:-1]
+    try:
+        amount = Decimal(cleaned).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise StatementRowError(f'Invalid amount "{value}"')
+    if amount == 0:
+        raise StatementRowError('Amount must not be 0')
+    return amount
+
+
+def _parse_csv_date(value: str) -> date:
+    """Parse a statement date in one of the common bank formats"""
+    value = (value or '').strip()
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise StatementRowError(f'Invalid date "{value}"')
+
+
+def parse_csv_statement(stream: TextIO) -> Iterator[Dict]:
+    """
+    Lazily yield debit transactions from a bank CSV export
+
+    Amounts come from a signed amount column (negative is money out) or a
+    debit column; credits (positive amounts, or rows with only a credit
+    value) are skipped. Yields dicts with line, date, amount (positive),
+    description and category (may be empty), or line and error for rows
+    that cannot be parsed.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        return
+
+    header = [column.strip().lower() for column in header]
+    columns = {}
+    for field, aliases in CSV_COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in header:
+                columns[field] = header.index(alias)
+                break
+
+    if 'date' not in columns or ('amount' not in columns and 'debit' not in columns):
+        raise ValueError('CSV must have date and amount columns')
+
+    for line, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+
+        def column(field):
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        try:
+            amount = _csv_debit_amount(column)
+            if amount is None:
+                continue  # Credit (deposit, refund, transfer in), skipped like OFX credits
+            yield {
+                'line': line,
+                'date': _parse_csv_date(column('date')),
+                'amount': amount,
+                'description': column('description'),
+                'category': column('category'),
+            }
+        except StatementRowError as e:
+            yield {'line': line, 'error': str(e)}
+
+
+def _csv_debit_amount(column) -> Optional[Decimal]:
+    """The money-out amount of a CSV row, or None if the row is a credit"""
+    if column('debit'):
+        return abs(_parse_amount(column('debit')))
+    if column('credit') and not column('amount'):
+        return None
+
+    amount = _parse_amount(column('amount'))
+    return -amount if amount < 0 else None
+
+
+def _iter_ofx_transaction_blocks(stream: TextIO, read_size: int = 65536) -> Iterator[str]:
+    """
+    Lazily yield the contents of each <STMTTRN>...</STMTTRN> block
+
+    The stream is read in fixed-size pieces rather than by line, so blocks
+    split across lines (OFX 1.x SGML) and several blocks on one line
+    (single-line OFX 2.x XML) are both handled. Only the unfinished tail of
+    the text is kept between reads.
+    """
+    buffer = ''
+    while True:
+        piece = stream.read(read_size)
+        buffer += piece
+
+        position = 0
+        for match in OFX_TRANSACTION_PATTERN.finditer(buffer):
+            yield match.group(1)
+            position = match.end()
+        buffer = buffer[position:]
+
+        # Keep from the next opening tag on, or just enough to complete a split tag
+        opening = OFX_TRANSACTION_START.search(buffer)
+        buffer = buffer[opening.start():] if opening else buffer[-(len('<STMTTRN>') - 1):]
+
+        if not piece:
+            return
+
+
+def parse_ofx_statement(stream: TextIO) -> Iterator[Dict]:
+    """
+    Lazily yield debit transactions from an OFX/QFX export
+
+    Reads one <STMTTRN> block at a time; credits (positive TRNAMT) are skipped,
+    and so are blocks repeating a FITID (transaction ID) seen earlier in the file.
+    """
+    seen_fitids = set()
+    for index, block in enumerate(_iter_ofx_transaction_blocks(stream), start=1):
+        fields = {
+            tag.upper(): value.strip()
+            for tag, value in OFX_TAG_PATTERN.findall(block)
+            if value.strip()
+        }
+
+        if not fields.get('TRNAMT', '').startswith('-'):
+            continue
+        if fields.get('FITID'):
+            if fields['FITID'] in seen_fitids:
+                continue
+            seen_fitids.add(fields['FITID'])
+
+        try:
+            yield {
+                'line': index,
+                'date': _parse_ofx_date(fields.get('DTPOSTED', '')),
+                'amount': -_parse_amount(fields['TRNAMT']),
+                'description': fields.get('NAME') or fields.get('MEMO', ''),
+                'category': '',
+            }
+        except StatementRowError as e:
+            yield {'line': index, 'error': str(e)}
+
+
+def _parse_ofx_date(value: str) -> date:
+    """Parse an OFX date such as 20250914120000[-5:EST]"""
+    try:
+        return datetime.strptime(value[:8], '%Y%m%d').date()
+    except ValueError:
+        raise StatementRowError(f'Invalid date "{value}"')
+
+
+class StatementImporter:
+    """Imports parsed statement transactions into ActualExpense in fixed-size chunks"""
+
+    MAX_REPORTED_ERRORS = 50
+
+    def __init__(
+        self,
+        space,
+        paid_by: User,
+        default_category: Optional[str] = None,
+        chunk_size: int = 500
+    ):
+        # bulk_create skips ActualExpense.clean, so check the payer's membership here
+        if not SpaceMember.objects.filter(space=space, user=paid_by, is_active=True).exists():
+            raise ValueError(f'{paid_by} is not an active member of {space.name}')
+
+        self.space = space
+        self.paid_by = paid_by
+        self.default_category = (default_category or '').strip().lower()
+        self.chunk_size = chunk_size
+        # month_period -> {category name (lowercased): budget_id}
+        self._budgets_by_month = {}
+        # month_period -> Counter of expense_key() for expenses already in the space
+        self._existing_by_month = {}
+
+    def _budgets_for_month(self, month_period: str) -> Dict[str, int]:
+        """Load the space's budgets for a month once (one query per month seen)"""
+        if month_period not in self._budgets_by_month:
+            self._budgets_by_month[month_period] = {
+                name.lower(): budget_id
+                for budget_id, name in Budget.objects.filter(
+                    space=self.space,
+                    month_period=month_period,
+                    is_active=True
+                ).values_list('id', 'category__name')
+            }
+        return self._budgets_by_month[month_period]
+
+    @staticmethod
+    def expense_key(budget_id, date_paid, amount, description):
+        """What makes two expenses the same statement transaction"""
+        return (budget_id, date_paid, amount, description)
+
+    def _existing_for_month(self, month_period: str) -> Counter:
+        """Count the space's expenses in a month by expense_key (one query per month seen)"""
+        if month_period not in self._existing_by_month:
+            self._existing_by_month[month_period] = Counter(
+                self.expense_key(*values)
+                for values in ActualExpense.objects.filter(
+                    budget_item__space=self.space,
+                    month_period=month_period
+                ).values_list('budget_item_id', 'date_paid', 'actual_amount', 'description')
+            )
+        return self._existing_by_month[month_period]
+
+    def _is_duplicate(self, expense: ActualExpense) -> bool:
+        """
+        Whether an expense matches one already in the space
+
+        Each existing expense absorbs one matching row, so re-importing a
+        statement adds nothing while identical transactions within one
+        statement are still imported.
+        """
+        existing = self._existing_for_month(expense.month_period)
+        key = self.expense_key(expense.budget_item_id, expense.date_paid, expense.actual_amount, expense.description)
+        if existing[key]:
+            existing[key] -= 1
+            return True
+        return False
+
+    def _to_expense(self, row: Dict) -> ActualExpense:
+        """Map a parsed row to an unsaved, validated expense on the matching budget"""
+        month_period = row['date'].strftime('%Y-%m')
+        budgets = self._budgets_for_month(month_period)
+
+        category = (row.get('category') or '').lower()
+        budget_id = budgets.get(category) or budgets.get(self.default_category)
+        if not budget_id:
+            raise StatementRowError(
+                f'No budget for category "{row.get("category") or self.default_category}" in {month_period}'
+            )
+
+        expense = ActualExpense(
+            budget_item_id=budget_id,
+            actual_amount=row['amount'],
+            date_paid=row['date'],
+            month_period=month_period,
+            paid_by=self.paid_by,
+            description=(row.get('description') or '')[:200],
+        )
+        # bulk_create skips validation, so a bad row would otherwise fail its whole chunk
+        try:
+            expense.clean_fields(exclude=['budget_item', 'paid_by'])
+        except ValidationError as e:
+            raise StatementRowError('; '.join(e.messages))
+        return expense
+
+    def _write_chunk(self, expenses):
+        """Insert one chunk of expenses with their payer splits and refresh the affected rollups"""
+        with transaction.atomic():
+            ActualExpense.objects.bulk_create(expenses)
+            ExpenseSplit.objects.bulk_create([
+                ExpenseSplit(
+                    actual_expense=expense,
+                    user=self.paid_by,
+                    percentage=Decimal('100'),
+                    amount=expense.actual_amount
+                )
+                for expense in expenses
+            ])
+            BudgetSpendingRollup.rebuild(budget_ids={expense.budget_item_id for expense in expenses})
+
+    def _expenses(self, rows: Iterable[Dict], summary: Dict) -> Iterator[ActualExpense]:
+        """Turn parsed rows into expenses, recording the rows that are skipped or already imported"""
+        for row in rows:
+            try:
+                if 'error' in row:
+                    raise StatementRowError(row['error'])
+                expense = self._to_expense(row)
+                if self._is_duplicate(expense):
+                    summary['duplicates'] += 1
+                    continue
+                yield expense
+            except StatementRowError as e:
+                summary['skipped'] += 1
+                if len(summary['errors']) < self.MAX_REPORTED_ERRORS:
+                    summary['errors'].append(f'Row {row["line"]}: {e}')
+
+    def run(self, rows: Iterable[Dict]) -> Dict:
+        """
+        Import parsed rows; only one chunk of expenses is held in memory at a time
+
+        Returns:
+            Dict: imported, skipped and duplicate counts plus the first skipped-row messages
+        """
+        summary = {'imported': 0, 'skipped': 0, 'duplicates': 0, 'errors': []}
+        expenses = self._expenses(rows, summary)
+
+        while True:
+            chunk = list(islice(expenses, self.chunk_size))
+            if not chunk:
+                break
+            self._write_chunk(chunk)
+            summary['imported'] += len(chunk)
+
+        logger.info(
+            f"Imported {summary['imported']} expenses into space {self.space.id} "
+            f"({summary['skipped']} rows skipped, {summary['duplicates']} already imported)"
+        )
+        return summary
+
+
+def parse_statement(stream: TextIO, file_format: str) -> Iterator[Dict]:
+    """Get the row generator for a statement format ('csv' or 'ofx')"""
+    if file_format == 'csv':
+        return parse_csv_statement(stream)
+    if file_format in ('ofx', 'qfx'):
+        return parse_ofx_statement(stream)
+    raise ValueError(f'Unsupported statement format "{file_format}"')
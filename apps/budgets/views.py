@@ -6,7 +6,8 @@ from django.utils import timezone
 from django.db import models, transaction
 from django.db.models import Q
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from django.views.decorators.http import require_http_methods
 from decimal import Decimal
 import json
@@ -35,14 +36,15 @@ def budget_home(request):
         space=current_space,
         month_period=current_month,
         is_active=True
-    ).select_related('category', 'assigned_to').order_by('category__name')
+    ).with_spending().select_related('category', 'assigned_to').order_by('category__name')
 
     # Calculate totals
-    total_budgeted = current_budgets.aggregate(
-        total=models.Sum('amount')
-    )['total'] or Decimal('0.00')
-
-    total_spent = Decimal('0.00')  # Will be calculated when expenses are implemented
+    totals = current_budgets.aggregate(
+        total_budgeted=models.Sum('amount'),
+        total_spent=models.Sum('spent_total'),
+    )
+    total_budgeted = totals['total_budgeted'] or Decimal('0.00')
+    total_spent = totals['total_spent'] or Decimal('0.00')
     remaining = total_budgeted - total_spent
 
     # Get recent months for navigation
@@ -59,10 +61,10 @@ def budget_home(request):
     ).exclude(id__in=used_category_ids).order_by('name')
 
     # Get space members for assignment
-    space_members = User.objects.filter(
+    space_members = list(User.objects.filter(
         spacemember__space=current_space,
         spacemember__is_active=True
-    ).distinct()
+    ).distinct())
 
     # Get available payment methods
     available_payment_methods = PaymentMethod.objects.filter(
@@ -82,6 +84,7 @@ def budget_home(request):
         'available_categories': available_categories,
         'available_payment_methods': available_payment_methods,
         'space_members': space_members,
+        'space_member_count': len(space_members),
         'payment_methods': available_payment_methods,  # Alias for component compatibility
     }
 
@@ -91,174 +94,41 @@ def budget_home(request):
 @login_required
 @require_http_methods(["POST"])
 def budget_edit_api(request):
-    """API endpoint to handle budget category editing"""
+    """
+    API endpoint to handle budget category editing
+
+    Accepts a JSON body (see BudgetEditService.apply_edit) or the legacy
+    form fields posted by the budget edit modal.
+    """
     current_space = SpaceContextManager.get_current_space(request)
     if not current_space:
         return JsonResponse({'success': False, 'error': 'Please select a space'}, status=400)
 
+    from .services import BudgetEditService
+
     try:
-        month_period = request.POST.get('month_period')
-        if not month_period:
-            return JsonResponse({'success': False, 'error': 'Month period is required'}, status=400)
+        if request.content_type == 'application/json':
+            payload = json.loads(request.body)
+        else:
+            payload = BudgetEditService.parse_form_payload(request.POST)
 
-        with transaction.atomic():
-            # Handle existing budget updates and deletions
-            for key, value in request.POST.items():
-                if key.startswith('amount_'):
-                    budget_id = key.split('_')[1]
-                    amount = Decimal(value)
-
-                    # Check if this budget should be deleted
-                    delete_key = f'delete_budget_{budget_id}'
-                    if delete_key in request.POST:
-                        # Delete the budget
-                        Budget.objects.filter(
-                            id=budget_id,
-                            space=current_space,
-                            month_period=month_period
-                        ).delete()
-                    else:
-                        # Update the budget amount
-                        Budget.objects.filter(
-                            id=budget_id,
-                            space=current_space,
-                            month_period=month_period
-                        ).update(amount=amount)
-
-            # Handle new category additions
-            new_data = {}
-
-            # Collect all new category data
-            for key, value in request.POST.items():
-                if key.startswith('new_'):
-                    parts = key.split('_')
-                    if len(parts) >= 3:
-                        field_type = '_'.join(parts[1:-1])  # e.g., 'category', 'amount', 'assigned_to'
-                        counter = parts[-1]
-
-                        if counter not in new_data:
-                            new_data[counter] = {}
-                        new_data[counter][field_type] = value
-
-            # Process each new budget item
-            for counter, data in new_data.items():
-                if 'category' in data and 'amount' in data:
-                    category_name = data.get('category', '').strip()
-                    try:
-                        amount = Decimal(data.get('amount', '0'))
-                    except:
-                        continue
-
-                    if category_name and amount > 0:
-                        # Try to find existing category first
-                        category = BudgetCategory.objects.filter(
-                            models.Q(name__iexact=category_name),
-                            models.Q(space=current_space) | models.Q(is_system_default=True)
-                        ).first()
-
-                        # If category doesn't exist, create it
-                        if not category:
-                            category = BudgetCategory.objects.create(
-                                name=category_name,
-                                space=current_space,
-                                category_type='custom',
-                                created_by=request.user
-                            )
-
-                        # Check if this category already exists for this month
-                        if not Budget.objects.filter(
-                            space=current_space,
-                            category=category,
-                            month_period=month_period
-                        ).exists():
-                            # Get assigned user
-                            assigned_to = None
-                            if data.get('assigned_to'):
-                                try:
-                                    assigned_to = User.objects.get(id=data.get('assigned_to'))
-                                except User.DoesNotExist:
-                                    pass
-
-                            # Get payment method
-                            payment_method = None
-                            if data.get('payment_method'):
-                                try:
-                                    payment_method = PaymentMethod.objects.get(id=data.get('payment_method'))
-                                except PaymentMethod.DoesNotExist:
-                                    pass
-
-                            # Parse date
-                            due_date = None
-                            if data.get('due_date'):
-                                try:
-                                    from datetime import datetime
-                                    due_date = datetime.strptime(data.get('due_date'), '%Y-%m-%d').date()
-                                except:
-                                    pass
-
-                            # Create budget
-                            budget = Budget.objects.create(
-                                space=current_space,
-                                category=category,
-                                amount=amount,
-                                month_period=month_period,
-                                created_by=request.user,
-                                assigned_to=assigned_to,
-                                payment_method=payment_method,
-                                due_date=due_date,
-                                is_estimated=data.get('is_estimated') == 'true',
-                                is_recurring=data.get('is_recurring') == 'true',
-                                notes=data.get('notes', '')
-                            )
-
-                            # Handle splits if enabled
-                            if data.get('enable_split') == 'true':
-                                # Process split data
-                                split_data = {}
-                                for key, value in request.POST.items():
-                                    if key.startswith(f'new_split_') and key.endswith(f'_{counter}_'):
-                                        # Extract split index and field
-                                        split_parts = key.replace(f'new_split_', '').replace(f'_{counter}_', '').split('_')
-                                        if len(split_parts) >= 2:
-                                            field = split_parts[0]  # user, type, value
-                                            split_index = split_parts[1]
-
-                                            if split_index not in split_data:
-                                                split_data[split_index] = {}
-                                            split_data[split_index][field] = value
-
-                                # Create split records
-                                for split_index, split_info in split_data.items():
-                                    if all(k in split_info for k in ['user', 'type', 'value']):
-                                        try:
-                                            split_user = User.objects.get(id=split_info['user'])
-                                            split_value = Decimal(split_info['value'])
-                                            split_type = split_info['type']
-
-                                            if split_type == 'percentage':
-                                                BudgetSplit.objects.create(
-                                                    budget=budget,
-                                                    user=split_user,
-                                                    percentage=split_value
-                                                )
-                                            elif split_type == 'fixed':
-                                                BudgetSplit.objects.create(
-                                                    budget=budget,
-                                                    user=split_user,
-                                                    amount=split_value
-                                                )
-                                        except (User.DoesNotExist, ValueError):
-                                            continue
+        errors = BudgetEditService.payload_errors(payload)
+        if errors:
+            field, message = next(iter(errors.items()))
+            return JsonResponse({'success': False, 'error': f'{field}: {message}', 'errors': errors}, status=400)
+
+        result = BudgetEditService.apply_edit(current_space, request.user, payload)
 
         return JsonResponse({
             'success': True,
-            'message': 'Budget updated successfully!'
+            'message': 'Budget updated successfully!',
+            **result
         })
 
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON payload'}, status=400)
     except ValidationError as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
-    except BudgetCategory.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Category not found'}, status=404)
     except Exception as e:
         return JsonResponse({'success': False, 'error': f'Error updating budget: {str(e)}'}, status=500)
 
@@ -284,7 +154,7 @@ def budget_month_view(request, month_period):
         space=current_space,
         month_period=month_period,
         is_active=True
-    ).select_related('category', 'assigned_to').order_by('category__name')
+    ).with_spending().select_related('category', 'assigned_to').order_by('category__name')
 
     # Calculate totals
     total_budgeted = budgets.aggregate(
@@ -389,6 +259,55 @@ def budget_create(request):
     })
 
 
+def _build_budget_splits(request, budget):
+    """
+    Build unsaved BudgetSplits from the split_user_<n>/split_type_<n>/split_value_<n> form fields
+
+    Users are loaded with one query and calculated amounts come from
+    BudgetSplit.allocate, so percentage shares add up exactly.
+
+    Returns:
+        tuple: (splits, error messages for the rows that were skipped)
+    """
+    split_fields = {}
+    for key, value in request.POST.items():
+        if key.startswith('split_user_') and value:
+            index = key.split('_')[-1]
+            split_fields[index] = {
+                'user_id': value,
+                'type': request.POST.get(f'split_type_{index}'),
+                'value': request.POST.get(f'split_value_{index}')
+            }
+
+    users = User.objects.in_bulk([
+        int(data['user_id']) for data in split_fields.values() if data['user_id'].isdigit()
+    ])
+
+    splits = []
+    errors = []
+    for index, split_data in split_fields.items():
+        try:
+            user = users.get(int(split_data['user_id'])) if split_data['user_id'].isdigit() else None
+            if not user:
+                raise User.DoesNotExist('User matching query does not exist.')
+            split_type = split_data['type']
+            split_value = Decimal(split_data['value'])
+
+            splits.append(BudgetSplit(
+                budget=budget,
+                user=user,
+                split_type=split_type,
+                percentage=split_value if split_type == 'percentage' else None,
+                fixed_amount=split_value if split_type == 'fixed_amount' else None,
+            ))
+
+        except (User.DoesNotExist, ValueError, TypeError, ArithmeticError) as e:
+            errors.append(f'Error processing split for index {index}: {e}')
+
+    BudgetSplit.allocate(budget.amount, splits)
+    return [split for split in splits if split.calculated_amount is not None], errors
+
+
 @login_required
 def budget_create_from_scratch(request):
     """Create budget from scratch with step-by-step interface"""
@@ -415,7 +334,7 @@ def budget_create_from_scratch(request):
         space=current_space,
         month_period=month_period,
         is_active=True
-    ).select_related('category', 'assigned_to').prefetch_related('splits__user').order_by('category__name')
+    ).with_spending().select_related('category', 'assigned_to').prefetch_related('splits__user').order_by('category__name')
 
     # Calculate total budget
     total_budget = current_budget_items.aggregate(
@@ -556,46 +475,11 @@ def budget_create_from_scratch(request):
                         )
 
                         # Process split assignments
-                        total_amount = Decimal(amount)
-                        split_created = False
-
-                        # Find all split user fields
-                        split_fields = {}
-                        for key, value in request.POST.items():
-                            if key.startswith('split_user_') and value:
-                                index = key.split('_')[-1]
-                                split_fields[index] = {
-                                    'user_id': value,
-                                    'type': request.POST.get(f'split_type_{index}'),
-                                    'value': request.POST.get(f'split_value_{index}')
-                                }
-
-                        # Create BudgetSplit objects
-                        for index, split_data in split_fields.items():
-                            try:
-                                user = User.objects.get(id=split_data['user_id'])
-                                split_type = split_data['type']
-                                split_value = Decimal(split_data['value'])
-
-                                # Calculate amount based on type
-                                if split_type == 'percentage':
-                                    calculated_amount = (total_amount * split_value) / 100
-                                else:  # fixed_amount
-                                    calculated_amount = split_value
-
-                                from .models import BudgetSplit
-                                BudgetSplit.objects.create(
-                                    budget=budget,
-                                    user=user,
-                                    split_type=split_type,
-                                    percentage=split_value if split_type == 'percentage' else None,
-                                    fixed_amount=split_value if split_type == 'fixed_amount' else None,
-                                    calculated_amount=calculated_amount
-                                )
-                                split_created = True
-
-                            except (User.DoesNotExist, ValueError) as e:
-                                messages.warning(request, f'Error processing split for index {index}: {e}')
+                        splits, split_errors = _build_budget_splits(request, budget)
+                        for error in split_errors:
+                            messages.warning(request, error)
+                        BudgetSplit.objects.bulk_create(splits)
+                        split_created = bool(splits)
 
                         if split_created:
                             messages.success(request, f'Added {category.name} to your budget with expense splits.')
@@ -814,46 +698,11 @@ def budget_edit(request, budget_id):
                 budget.splits.all().delete()
 
                 # Process new split assignments
-                total_amount = budget.amount
-                split_created = False
-
-                # Find all split user fields
-                split_fields = {}
-                for key, value in request.POST.items():
-                    if key.startswith('split_user_') and value:
-                        index = key.split('_')[-1]
-                        split_fields[index] = {
-                            'user_id': value,
-                            'type': request.POST.get(f'split_type_{index}'),
-                            'value': request.POST.get(f'split_value_{index}')
-                        }
-
-                # Create BudgetSplit objects
-                for index, split_data in split_fields.items():
-                    try:
-                        user = User.objects.get(id=split_data['user_id'])
-                        split_type = split_data['type']
-                        split_value = Decimal(split_data['value'])
-
-                        # Calculate amount based on type
-                        if split_type == 'percentage':
-                            calculated_amount = (total_amount * split_value) / 100
-                        else:  # fixed_amount
-                            calculated_amount = split_value
-
-                        from .models import BudgetSplit
-                        BudgetSplit.objects.create(
-                            budget=budget,
-                            user=user,
-                            split_type=split_type,
-                            percentage=split_value if split_type == 'percentage' else None,
-                            fixed_amount=split_value if split_type == 'fixed_amount' else None,
-                            calculated_amount=calculated_amount
-                        )
-                        split_created = True
-
-                    except (User.DoesNotExist, ValueError) as e:
-                        messages.warning(request, f'Error processing split for index {index}: {e}')
+                splits, split_errors = _build_budget_splits(request, budget)
+                for error in split_errors:
+                    messages.warning(request, error)
+                BudgetSplit.objects.bulk_create(splits)
+                split_created = bool(splits)
 
                 if not split_created:
                     messages.error(request, 'No valid splits were provided. Please add at least one valid split.')
@@ -909,7 +758,7 @@ def budget_bulk_edit(request, month_period):
         space=current_space,
         month_period=month_period,
         is_active=True
-    ).select_related('category', 'assigned_to').order_by('category__name')
+    ).with_spending().select_related('category', 'assigned_to').order_by('category__name')
 
     if not budgets.exists():
         messages.error(request, f'No budgets found for {month_period}.')
@@ -1007,26 +856,19 @@ def budget_copy(request):
                         space=current_space,
                         month_period=source_month,
                         is_active=True
-                    )
-
-                    budgets_created = []
-                    for source_budget in source_budgets:
-                        new_amount = source_budget.amount * multiply_by
-
-                        budget, created = Budget.objects.get_or_create(
-                            space=current_space,
-                            category=source_budget.category,
-                            month_period=target_month,
-                            defaults={
-                                'amount': new_amount,
-                                'assigned_to': source_budget.assigned_to,
-                                'notes': f'Copied from {source_month}',
-                                'created_by': request.user,
-                            }
-                        )
+                    ).select_related('category')
 
-                        if created:
-                            budgets_created.append(budget)
+                    budgets_created = Budget.bulk_materialize(
+                        space=current_space,
+                        month_period=target_month,
+                        rows=[{
+                            'category': source_budget.category,
+                            'amount': (source_budget.amount * multiply_by).quantize(Decimal('0.01')),
+                            'assigned_to_id': source_budget.assigned_to_id,
+                            'notes': f'Copied from {source_month}',
+                        } for source_budget in source_budgets],
+                        created_by=request.user
+                    )
 
                     if budgets_created:
                         messages.success(
@@ -1089,41 +931,11 @@ def budget_analytics(request):
         messages.error(request, 'Please select a space to view analytics.')
         return redirect('spaces:list')
 
-    # Get analytics data for the last 6 months
-    from datetime import datetime, timedelta
-    import calendar
-
-    current_date = timezone.now()
-    months_data = []
+    # Budgeted vs. actual for the requested range (?months=12, 24, 36...)
+    from .services import BudgetAnalyticsService, BudgetInsightsService
 
-    for i in range(6):
-        # Calculate month
-        if current_date.month - i <= 0:
-            year = current_date.year - 1
-            month = 12 + (current_date.month - i)
-        else:
-            year = current_date.year
-            month = current_date.month - i
-
-        month_period = f"{year:04d}-{month:02d}"
-        month_name = calendar.month_name[month]
-
-        # Get budgets for this month
-        month_budgets = Budget.objects.filter(
-            space=current_space,
-            month_period=month_period,
-            is_active=True
-        ).aggregate(
-            total_budgeted=models.Sum('amount'),
-            count=models.Count('id')
-        )
-
-        months_data.append({
-            'period': month_period,
-            'name': f"{month_name} {year}",
-            'total_budgeted': month_budgets['total_budgeted'] or Decimal('0.00'),
-            'budget_count': month_budgets['count'],
-        })
+    months = BudgetAnalyticsService.clean_month_range(request.GET.get('months'))
+    analytics = BudgetAnalyticsService.get_budget_vs_actual(current_space, months=months)
 
     # Category breakdown for current month
     current_month = timezone.now().strftime('%Y-%m')
@@ -1131,16 +943,62 @@ def budget_analytics(request):
         space=current_space,
         month_period=current_month,
         is_active=True
-    ).select_related('category').order_by('-amount')
+    ).with_spending().select_related('category').order_by('-amount')
 
     return render(request, 'budgets/analytics.html', {
         'current_space': current_space,
-        'months_data': months_data,
+        'months_data': analytics['months'],
+        'category_totals': analytics['categories'],
+        'analytics_totals': analytics['totals'],
+        'selected_months': months,
+        'range_options': BudgetAnalyticsService.RANGE_OPTIONS,
         'category_breakdown': category_breakdown,
+        'insights': BudgetInsightsService.get_monthly_insights(current_space, current_month),
         'current_month': current_month,
     })
 
 
+@login_required
+def budget_export(request):
+    """Stream a space's budgets, expenses and splits as CSV or JSON Lines"""
+    current_space = SpaceContextManager.get_current_space(request)
+    if not current_space:
+        return JsonResponse({'success': False, 'error': 'Please select a space'}, status=400)
+
+    from datetime import datetime
+    from .utils import EXPORT_FORMATS, EXPORT_RECORD_TYPES, iter_export_records
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Format must be csv or jsonl'}, status=400)
+
+    start_month = request.GET.get('start') or None
+    end_month = request.GET.get('end') or None
+    for month in (start_month, end_month):
+        if month:
+            try:
+                datetime.strptime(month, '%Y-%m')
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'Months must be in YYYY-MM format'}, status=400)
+
+    record_types = request.GET.get('records')
+    record_types = record_types.split(',') if record_types else EXPORT_RECORD_TYPES
+    unknown_types = set(record_types) - set(EXPORT_RECORD_TYPES)
+    if unknown_types:
+        return JsonResponse({
+            'success': False,
+            'error': f"Unknown record types: {', '.join(sorted(unknown_types))}"
+        }, status=400)
+
+    stream, content_type = EXPORT_FORMATS[export_format]
+    records = iter_export_records(current_space, start_month, end_month, record_types)
+
+    response = StreamingHttpResponse(stream(records), content_type=content_type)
+    filename = f"{current_space.name.replace(' ', '_')}_export.{export_format}"
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
 # SMART TEMPLATES SYSTEM VIEWS
 
 @login_required
@@ -1450,12 +1308,12 @@ def budget_create_from_template(request, template_id):
         total_amount = Decimal(request.POST.get('total_amount', template.default_total_amount))
 
         # Create budgets based on template
-        budgets_created = []
         errors = []
 
         # Get system categories for matching
         system_categories = {cat.name: cat for cat in BudgetCategory.objects.filter(is_system_default=True)}
 
+        rows = []
         for category_name, category_data in template.category_data.items():
             # Find matching system category
             category = system_categories.get(category_name)
@@ -1466,28 +1324,24 @@ def budget_create_from_template(request, template_id):
             # Calculate amount based on total
             amount = (total_amount * Decimal(category_data['percentage']) / 100).quantize(Decimal('0.01'))
 
-            # Check if budget already exists for this category and month
-            existing_budget = Budget.objects.filter(
-                space=current_space,
-                category=category,
-                month_period=month_period
-            ).first()
-
-            if existing_budget:
-                errors.append(f'Budget for {category_name} already exists for {month_period}')
-                continue
+            rows.append({
+                'category': category,
+                'amount': amount,
+                'template_used': template,
+                'is_custom': False,
+            })
 
-            # Create the budget
-            budget = Budget.objects.create(
-                space=current_space,
-                category=category,
-                amount=amount,
-                month_period=month_period,
-                created_by=request.user,
-                template_used=template,
-                is_custom=False
-            )
-            budgets_created.append(budget)
+        try:
+            budgets_created = Budget.bulk_materialize(current_space, month_period, rows, request.user)
+        except ValidationError as e:
+            budgets_created = []
+            errors.extend(e.messages)
+        else:
+            # Budgets that already existed for this category and month are skipped
+            created_category_ids = {budget.category_id for budget in budgets_created}
+            for row in rows:
+                if row['category'].id not in created_category_ids:
+                    errors.append(f'Budget for {row["category"].name} already exists for {month_period}')
 
         if budgets_created:
             # Increment template usage
@@ -2,14 +2,20 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
+from django.db.models import Q
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_protect
 from django.contrib.auth import get_user_model
+from datetime import datetime
 from decimal import Decimal
+import base64
+import binascii
 import json
 
-from .models import Budget, ActualExpense, ExpenseSplit
+from .models import Budget, ActualExpense, ExpenseSplit, MemberBalance
+from .forms import StatementImportForm
+from .utils.allocation import SplitAllocator
 from spaces.utils import SpaceContextManager
 
 User = get_user_model()
@@ -74,32 +80,26 @@ def add_expense(request, budget_id):
                         if not selected_members:
                             selected_members = [str(paid_by.id)]
 
-                        percentage_per_member = Decimal('100') / len(selected_members)
+                        members_by_id = User.objects.in_bulk([int(member_id) for member_id in selected_members])
+                        if len(members_by_id) != len(set(selected_members)):
+                            raise User.DoesNotExist('User matching query does not exist.')
 
-                        for member_id in selected_members:
-                            member = User.objects.get(id=member_id)
-                            amount = (total_amount * percentage_per_member / Decimal('100')).quantize(Decimal('0.01'))
-                            splits_data.append({
-                                'user': member,
-                                'percentage': percentage_per_member,
-                                'amount': amount
-                            })
+                        members = list(members_by_id.values())
+                        for member, allocation in zip(members, SplitAllocator.equal(total_amount, len(members))):
+                            splits_data.append({'user': member, **allocation})
 
                     elif split_type == 'percentage':
                         # Custom percentages
-                        total_percentage = Decimal('0')
+                        members = []
+                        percentages = []
                         for member in space_members:
                             percentage_key = f'percentage_{member.id}'
                             if percentage_key in request.POST:
                                 percentage = Decimal(request.POST.get(percentage_key, '0'))
                                 if percentage > 0:
-                                    amount = (total_amount * percentage / Decimal('100')).quantize(Decimal('0.01'))
-                                    splits_data.append({
-                                        'user': member,
-                                        'percentage': percentage,
-                                        'amount': amount
-                                    })
-                                    total_percentage += percentage
+                                    members.append(member)
+                                    percentages.append(percentage)
+                        total_percentage = sum(percentages, Decimal('0'))
 
                         if abs(total_percentage - Decimal('100')) > Decimal('0.01'):
                             messages.error(request, f'Percentages must add up to 100%. Current total: {total_percentage}%')
@@ -110,21 +110,21 @@ def add_expense(request, budget_id):
                                 'current_space': current_space,
                             })
 
+                        for member, allocation in zip(members, SplitAllocator.by_percentage(total_amount, percentages)):
+                            splits_data.append({'user': member, **allocation})
+
                     elif split_type == 'custom':
                         # Custom amounts
-                        total_split_amount = Decimal('0')
+                        members = []
+                        amounts = []
                         for member in space_members:
                             amount_key = f'amount_{member.id}'
                             if amount_key in request.POST:
                                 amount = Decimal(request.POST.get(amount_key, '0'))
                                 if amount > 0:
-                                    percentage = (amount / total_amount * Decimal('100')).quantize(Decimal('0.01'))
-                                    splits_data.append({
-                                        'user': member,
-                                        'percentage': percentage,
-                                        'amount': amount
-                                    })
-                                    total_split_amount += amount
+                                    members.append(member)
+                                    amounts.append(amount)
+                        total_split_amount = sum(amounts, Decimal('0'))
 
                         if abs(total_split_amount - total_amount) > Decimal('0.01'):
                             messages.error(request, f'Split amounts must add up to total amount. Current total: ${total_split_amount}')
@@ -135,14 +135,20 @@ def add_expense(request, budget_id):
                                 'current_space': current_space,
                             })
 
+                        for member, allocation in zip(members, SplitAllocator.by_amount(total_amount, amounts)):
+                            splits_data.append({'user': member, **allocation})
+
                     # Create the splits
-                    for split_data in splits_data:
-                        ExpenseSplit.objects.create(
+                    ExpenseSplit.objects.bulk_create([
+                        ExpenseSplit(
                             actual_expense=expense,
                             user=split_data['user'],
                             percentage=split_data['percentage'],
                             amount=split_data['amount']
                         )
+                        for split_data in splits_data
+                    ])
+                    MemberBalance.record_splits(ExpenseSplit.objects.filter(actual_expense=expense))
 
                 else:
                     # Single person expense
@@ -166,6 +172,50 @@ def add_expense(request, budget_id):
     })
 
 
+@login_required
+@csrf_protect
+def import_statement(request):
+    """Import expenses from an uploaded bank statement (CSV or OFX)"""
+    current_space = SpaceContextManager.get_current_space(request)
+    if not current_space:
+        messages.error(request, 'Please select a space to import expenses.')
+        return redirect('spaces:list')
+
+    if request.method == 'POST':
+        form = StatementImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            import io
+            from .utils import StatementImporter, parse_statement
+
+            stream = io.TextIOWrapper(form.cleaned_data['statement_file'].file, encoding='utf-8-sig', errors='replace')
+            try:
+                importer = StatementImporter(
+                    space=current_space,
+                    paid_by=request.user,
+                    default_category=form.cleaned_data['default_category']
+                )
+                summary = importer.run(parse_statement(stream, form.cleaned_data['file_format']))
+            except ValueError as e:
+                messages.error(request, f'Could not read statement: {e}')
+            else:
+                messages.success(request, f'Imported {summary["imported"]} expenses.')
+                if summary['duplicates']:
+                    messages.info(request, f'Skipped {summary["duplicates"]} transactions that were already imported.')
+                if summary['skipped']:
+                    messages.warning(
+                        request,
+                        f'Skipped {summary["skipped"]} rows: {"; ".join(summary["errors"][:5])}'
+                    )
+                return redirect('budgets:home')
+    else:
+        form = StatementImportForm()
+
+    return render(request, 'budgets/import_statement.html', {
+        'form': form,
+        'current_space': current_space,
+    })
+
+
 @login_required
 def expense_calculator(request):
     """AJAX endpoint for calculating splits"""
@@ -185,24 +235,21 @@ def expense_calculator(request):
                 if not members_data:
                     return JsonResponse({'error': 'No members selected'}, status=400)
 
-                percentage_per_member = Decimal('100') / len(members_data)
-                amount_per_member = (total_amount / len(members_data)).quantize(Decimal('0.01'))
-
-                for member_id in members_data:
+                for member_id, allocation in zip(members_data, SplitAllocator.equal(total_amount, len(members_data))):
                     results.append({
                         'user_id': member_id,
-                        'percentage': float(percentage_per_member),
-                        'amount': float(amount_per_member)
+                        'percentage': float(allocation['percentage']),
+                        'amount': float(allocation['amount'])
                     })
 
             elif split_type == 'percentage':
-                for member_data in members_data:
-                    percentage = Decimal(str(member_data.get('percentage', '0')))
-                    amount = (total_amount * percentage / Decimal('100')).quantize(Decimal('0.01'))
+                percentages = [Decimal(str(member_data.get('percentage', '0'))) for member_data in members_data]
+                allocations = SplitAllocator.by_percentage(total_amount, percentages)
+                for member_data, allocation in zip(members_data, allocations):
                     results.append({
                         'user_id': member_data.get('user_id'),
-                        'percentage': float(percentage),
-                        'amount': float(amount)
+                        'percentage': float(allocation['percentage']),
+                        'amount': float(allocation['amount'])
                     })
 
             return JsonResponse({'splits': results})
@@ -253,8 +300,8 @@ def create_expense_api(request):
         paid_by = get_object_or_404(User, id=paid_by_id)
 
         # Validate paid_by is a space member
-        from spaces.models import SpaceMember
-        if not SpaceMember.objects.filter(space=current_space, user=paid_by, is_active=True).exists():
+        from spaces.utils import SpaceMembershipResolver
+        if not SpaceMembershipResolver.is_member(current_space, paid_by):
             return JsonResponse({'success': False, 'error': 'User must be a member of the space'}, status=400)
 
         with transaction.atomic():
@@ -292,9 +339,89 @@ def create_expense_api(request):
         return JsonResponse({'success': False, 'error': f'Error creating expense: {str(e)}'}, status=500)
 
 
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+def create_expenses_bulk_api(request):
+    """API endpoint to create a batch of expenses (e.g. offline entries synced from mobile)"""
+    current_space = SpaceContextManager.get_current_space(request)
+    if not current_space:
+        return JsonResponse({'success': False, 'error': 'Please select a space'}, status=400)
+
+    from .services import ExpenseIngestionService
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON payload'}, status=400)
+
+    items = data.get('expenses') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({
+            'success': False,
+            'error': 'A non-empty "expenses" list is required',
+            'errors': {'expenses': 'Must be a non-empty list'}
+        }, status=400)
+
+    if len(items) > ExpenseIngestionService.MAX_BATCH_SIZE:
+        return JsonResponse({
+            'success': False,
+            'error': f'At most {ExpenseIngestionService.MAX_BATCH_SIZE} expenses can be sent per request'
+        }, status=400)
+
+    errors = ExpenseIngestionService.payload_errors(items)
+    if errors:
+        field, message = next(iter(errors.items()))
+        return JsonResponse({'success': False, 'error': f'{field}: {message}', 'errors': errors}, status=400)
+
+    try:
+        results = ExpenseIngestionService.ingest(current_space, items)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Error creating expenses: {str(e)}'}, status=500)
+
+    created_count = sum(1 for result in results if result['success'])
+    return JsonResponse({
+        'success': True,
+        'created_count': created_count,
+        'failed_count': len(results) - created_count,
+        'results': results
+    })
+
+
+# list_expenses_api output field -> values() lookups it is built from
+EXPENSE_LIST_FIELDS = {
+    'id': ['id'],
+    'amount': ['actual_amount'],
+    'description': ['description'],
+    'date': ['date_paid'],
+    'paid_by_name': ['paid_by__first_name', 'paid_by__username'],
+    'notes': [],
+    'is_shared': ['is_shared'],
+}
+EXPENSE_LIST_DEFAULT_LIMIT = 50
+EXPENSE_LIST_MAX_LIMIT = 200
+
+
+def _encode_expense_cursor(date_paid, expense_id):
+    """Opaque cursor for the (date_paid, id) position of the last expense on a page"""
+    return base64.urlsafe_b64encode(f'{date_paid.isoformat()}|{expense_id}'.encode()).decode()
+
+
+def _decode_expense_cursor(cursor):
+    """Get (date_paid, id) back from a cursor"""
+    date_paid, expense_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.strptime(date_paid, '%Y-%m-%d').date(), int(expense_id)
+
+
 @login_required
 def list_expenses_api(request, budget_id):
-    """API endpoint to list expenses for a specific budget"""
+    """
+    API endpoint to list expenses for a specific budget
+
+    Newest first, keyset-paginated on (date_paid, id). Query params: limit,
+    cursor (next_cursor from the previous page), fields (comma-separated
+    subset of EXPENSE_LIST_FIELDS) and since (YYYY-MM-DD, paid on or after).
+    """
     current_space = SpaceContextManager.get_current_space(request)
     if not current_space:
         return JsonResponse({'success': False, 'error': 'Please select a space'}, status=400)
@@ -302,26 +429,72 @@ def list_expenses_api(request, budget_id):
     try:
         budget = get_object_or_404(Budget, id=budget_id, space=current_space, is_active=True)
 
-        expenses = ActualExpense.objects.filter(
-            budget_item=budget
-        ).select_related('paid_by').order_by('-date_paid')
+        try:
+            limit = int(request.GET.get('limit', EXPENSE_LIST_DEFAULT_LIMIT))
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid limit'}, status=400)
+        limit = max(1, min(limit, EXPENSE_LIST_MAX_LIMIT))
+
+        fields = list(EXPENSE_LIST_FIELDS)
+        if request.GET.get('fields'):
+            fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in EXPENSE_LIST_FIELDS]
+            if unknown:
+                return JsonResponse({'success': False, 'error': f'Unknown fields: {", ".join(unknown)}'}, status=400)
+
+        expenses = ActualExpense.objects.filter(budget_item=budget)
+
+        if request.GET.get('since'):
+            try:
+                since = datetime.strptime(request.GET['since'], '%Y-%m-%d').date()
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'since must be in YYYY-MM-DD format'}, status=400)
+            expenses = expenses.filter(date_paid__gte=since)
+
+        if request.GET.get('cursor'):
+            try:
+                cursor_date, cursor_id = _decode_expense_cursor(request.GET['cursor'])
+            except (ValueError, UnicodeDecodeError, binascii.Error):
+                return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+            expenses = expenses.filter(
+                Q(date_paid__lt=cursor_date) | Q(date_paid=cursor_date, id__lt=cursor_id)
+            )
+
+        lookups = {'id', 'date_paid'}
+        for field in fields:
+            lookups.update(EXPENSE_LIST_FIELDS[field])
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(expenses.order_by('-date_paid', '-id').values(*lookups)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         expenses_data = []
-        for expense in expenses:
-            expenses_data.append({
-                'id': expense.id,
-                'amount': str(expense.actual_amount),
-                'description': expense.description,
-                'date': expense.date_paid.strftime('%Y-%m-%d'),
-                'paid_by_name': expense.paid_by.first_name or expense.paid_by.username,
-                'notes': getattr(expense, 'notes', ''),  # In case notes field doesn't exist
-                'is_shared': expense.is_shared
-            })
+        for row in rows:
+            item = {}
+            for field in fields:
+                if field == 'amount':
+                    item[field] = str(row['actual_amount'])
+                elif field == 'date':
+                    item[field] = row['date_paid'].strftime('%Y-%m-%d')
+                elif field == 'paid_by_name':
+                    item[field] = row['paid_by__first_name'] or row['paid_by__username']
+                elif field == 'notes':
+                    item[field] = ''  # ActualExpense has no notes field; kept for API compatibility
+                else:
+                    item[field] = row[EXPENSE_LIST_FIELDS[field][0]]
+            expenses_data.append(item)
+
+        next_cursor = None
+        if has_more:
+            next_cursor = _encode_expense_cursor(rows[-1]['date_paid'], rows[-1]['id'])
 
         return JsonResponse({
             'success': True,
             'expenses': expenses_data,
-            'total_count': len(expenses_data)
+            'total_count': len(expenses_data),
+            'has_more': has_more,
+            'next_cursor': next_cursor
         })
 
     except Budget.DoesNotExist:
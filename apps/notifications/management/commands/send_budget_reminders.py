@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Send in-app reminders for overdue and due-soon budget items in every space'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Run the sweep as of this date (YYYY-MM-DD); defaults to today',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of budget rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+
+        self.stdout.write('Sweeping budget reminders...')
+        summary = NotificationService.sweep_budget_reminders(today=today, chunk_size=options['chunk_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {summary["notifications"]} reminders for {summary["budgets"]} budget items'
+            )
+        )
@@ -161,6 +161,13 @@ class InAppNotification(models.Model):
     @classmethod
     def create_approval_result(cls, change_request, notification_type):
         """Create notification when approval is approved/rejected/auto-approved"""
+        notification = cls.build_approval_result(change_request, notification_type)
+        notification.save()
+        return notification
+
+    @classmethod
+    def build_approval_result(cls, change_request, notification_type):
+        """Unsaved approval result notification for the requester"""
 
         title_map = {
             'approval_approved': 'Budget change approved',
@@ -174,15 +181,15 @@ class InAppNotification(models.Model):
             'approval_auto_approved': f'Your change to {change_request.budget_item.category.name} was auto-approved due to timeout.',
         }
 
-        return cls.objects.create(
-            recipient=change_request.requested_by,
+        return cls(
+            recipient_id=change_request.requested_by_id,
             notification_type=notification_type,
             priority='normal',
             title=title_map.get(notification_type, 'Budget change update'),
             message=message_map.get(notification_type, 'Your budget change has been processed.'),
             action_url=f"/budgets/",
             action_text="View Budget",
-            space=change_request.budget_item.space
+            space_id=change_request.budget_item.space_id
         )
 
     @classmethod
@@ -211,6 +218,54 @@ class InAppNotification(models.Model):
 
         return notifications
 
+    @classmethod
+    def build_budget_reminder(cls, user, space, overdue_names, due_soon_names=()):
+        """Unsaved reminder about a space's overdue and due-soon budget items (by category name)"""
+        parts = []
+        if overdue_names:
+            parts.append(f"{len(overdue_names)} overdue items: {cls._summarize_names(overdue_names)}")
+        if due_soon_names:
+            parts.append(f"{len(due_soon_names)} items due soon: {cls._summarize_names(due_soon_names)}")
+
+        return cls(
+            recipient=user,
+            notification_type='budget_reminder',
+            priority='high' if overdue_names else 'normal',
+            title=f"Budget items overdue in {space.name}" if overdue_names else f"Budget items due soon in {space.name}",
+            message=f"You have {'; '.join(parts)}",
+            action_url=f"/budgets/?space={space.id}",
+            action_text="View Budget",
+            space=space
+        )
+
+    @classmethod
+    def build_approval_batch_result(cls, user, space, approved_names, rejected_names):
+        """Unsaved summary of several approval results for one requester (by category name)"""
+        parts = []
+        if approved_names:
+            parts.append(f"{len(approved_names)} approved: {cls._summarize_names(approved_names)}")
+        if rejected_names:
+            parts.append(f"{len(rejected_names)} rejected: {cls._summarize_names(rejected_names)}")
+
+        return cls(
+            recipient=user,
+            notification_type='approval_approved' if approved_names else 'approval_rejected',
+            priority='normal',
+            title='Budget changes reviewed',
+            message=f"Your budget changes were reviewed. {'; '.join(parts)}",
+            action_url="/budgets/",
+            action_text="View Budget",
+            space=space
+        )
+
+    @staticmethod
+    def _summarize_names(names):
+        """First three names, then a count of the rest"""
+        summary = ", ".join(names[:3])
+        if len(names) > 3:
+            summary += f" and {len(names) - 3} more"
+        return summary
+
     @classmethod
     def cleanup_expired(cls):
         """Remove expired notifications"""
@@ -11,6 +11,9 @@ User = get_user_model()
 class NotificationService:
     """Service for managing all types of notifications"""
 
+    MAX_REMINDER_DAYS = 30  # Largest reminder_days_before the budget forms allow
+    OVERDUE_LOOKBACK_DAYS = 31
+
     @staticmethod
     def send_approval_request_notification(change_request):
         """Send notification about budget change approval request"""
@@ -67,6 +70,80 @@ class NotificationService:
 
         return notification
 
+    @staticmethod
+    def send_approval_result_notifications(change_requests, result_type):
+        """
+        Notify many requesters about their approval results at once
+
+        Preferences are read with one query and the in-app notifications are
+        written with one bulk_create; emails still go out one per requester.
+        """
+        change_requests = list(change_requests)
+        if not change_requests:
+            return []
+
+        preferences = NotificationPreferences.objects.in_bulk(
+            {change_request.requested_by_id for change_request in change_requests},
+            field_name='user_id'
+        )
+
+        notifications = []
+        for change_request in change_requests:
+            prefs = preferences.get(change_request.requested_by_id) or NotificationPreferences()
+            if not prefs.approval_results:
+                continue
+
+            notifications.append(InAppNotification.build_approval_result(change_request, result_type))
+
+            space_settings = change_request.budget_item.space.settings
+            if space_settings.notifications_email and prefs.email_important_only:
+                NotificationService._send_approval_result_email(change_request, result_type)
+
+        return InAppNotification.objects.bulk_create(notifications)
+
+    @staticmethod
+    def send_approval_batch_notifications(change_requests):
+        """
+        Send one summary notification per requester for a batch of resolved requests
+
+        Requests still pending are ignored. Preferences are read with one query and
+        the in-app notifications written with one bulk_create; result emails go out
+        per request, as they do for single approvals and rejections.
+        """
+        by_requester = {}
+        for change_request in change_requests:
+            if change_request.status in ('approved', 'rejected'):
+                by_requester.setdefault(change_request.requested_by, []).append(change_request)
+        if not by_requester:
+            return []
+
+        preferences = NotificationPreferences.objects.in_bulk(
+            {requester.id for requester in by_requester},
+            field_name='user_id'
+        )
+
+        notifications = []
+        for requester, requests in by_requester.items():
+            prefs = preferences.get(requester.id) or NotificationPreferences()
+            if not prefs.approval_results:
+                continue
+
+            spaces = {change_request.budget_item.space for change_request in requests}
+            notifications.append(InAppNotification.build_approval_batch_result(
+                requester,
+                spaces.pop() if len(spaces) == 1 else None,
+                [r.budget_item.category.name for r in requests if r.status == 'approved'],
+                [r.budget_item.category.name for r in requests if r.status == 'rejected'],
+            ))
+
+            for change_request in requests:
+                if change_request.budget_item.space.settings.notifications_email and prefs.email_important_only:
+                    NotificationService._send_approval_result_email(
+                        change_request, f'approval_{change_request.status}'
+                    )
+
+        return InAppNotification.objects.bulk_create(notifications)
+
     @staticmethod
     def send_space_member_notification(space, new_member, event_type='member_joined'):
         """Send notification about space membership events"""
@@ -84,25 +161,111 @@ class NotificationService:
         if not prefs.budget_reminders:
             return None
 
-        overdue_count = len(overdue_items)
-        item_names = ", ".join([item.category.name for item in overdue_items[:3]])
-
-        if overdue_count > 3:
-            item_names += f" and {overdue_count - 3} more"
-
-        notification = InAppNotification.objects.create(
-            recipient=user,
-            notification_type='budget_reminder',
-            priority='high',
-            title=f"Budget items overdue in {space.name}",
-            message=f"You have {overdue_count} overdue items: {item_names}",
-            action_url=f"/budgets/?space={space.id}",
-            action_text="View Budget",
-            space=space
+        notification = InAppNotification.build_budget_reminder(
+            user, space, [item.category.name for item in overdue_items]
         )
+        notification.save()
 
         return notification
 
+    @staticmethod
+    def sweep_budget_reminders(today=None, chunk_size=2000):
+        """
+        Create reminders for every overdue and due-soon budget, one per (user, space)
+
+        Candidates come from indexed range queries on due_date / range_start, bounded
+        by the largest reminder window; each budget's own reminder_days_before is then
+        checked on the projected rows. Budgets with expenses count as paid.
+        Assigned budgets remind their assignee, unassigned ones every active member.
+        Users who turned reminders off, or already got a reminder about the space
+        on the sweep date, are skipped, and the notifications are written with one bulk_create.
+
+        Returns:
+            dict: budgets matched and notifications created
+        """
+        from datetime import timedelta
+        from django.db import models
+        from django.db.models.functions import Coalesce
+        from budgets.models import Budget
+        from spaces.models import Space, SpaceMember
+
+        today = today or timezone.localdate()
+        window_end = today + timedelta(days=NotificationService.MAX_REMINDER_DAYS)
+
+        candidates = Budget.objects.active().filter(
+            models.Q(
+                timing_type='fixed_date',
+                due_date__gte=today - timedelta(days=NotificationService.OVERDUE_LOOKBACK_DAYS),
+                due_date__lte=window_end
+            ) | models.Q(
+                timing_type='date_range',
+                range_start__gt=today,
+                range_start__lte=window_end
+            )
+        ).annotate(
+            paid_count=Coalesce('spending_rollup__expense_count', 0)
+        ).filter(paid_count=0).values_list(
+            'space_id', 'assigned_to_id', 'category__name',
+            'timing_type', 'due_date', 'range_start', 'reminder_days_before'
+        ).order_by('space_id', 'due_date', 'range_start')
+
+        # (space_id, assigned_to_id or None) -> (overdue names, due soon names)
+        items = {}
+        matched = 0
+        for space_id, assigned_to_id, category_name, timing_type, due_date, range_start, reminder_days in candidates.iterator(chunk_size=chunk_size):
+            date_due = due_date if timing_type == 'fixed_date' else range_start
+            if date_due < today:
+                bucket = 0
+            elif (date_due - today).days <= reminder_days:
+                bucket = 1
+            else:
+                continue
+            matched += 1
+            items.setdefault((space_id, assigned_to_id), ([], []))[bucket].append(category_name)
+
+        if not items:
+            return {'budgets': 0, 'notifications': 0}
+
+        space_ids = {space_id for space_id, _ in items}
+        members = {}
+        for space_id, user_id in SpaceMember.objects.filter(
+            space_id__in=space_ids, is_active=True
+        ).values_list('space_id', 'user_id').order_by():
+            members.setdefault(space_id, set()).add(user_id)
+
+        # Group by recipient: unassigned items go to every active member of the space
+        reminders = {}
+        for (space_id, assigned_to_id), (overdue, due_soon) in items.items():
+            recipients = [assigned_to_id] if assigned_to_id else members.get(space_id, ())
+            for user_id in recipients:
+                if user_id not in members.get(space_id, ()):
+                    continue
+                reminder = reminders.setdefault((user_id, space_id), ([], []))
+                reminder[0].extend(overdue)
+                reminder[1].extend(due_soon)
+
+        user_ids = {user_id for user_id, _ in reminders}
+        opted_out = set(NotificationPreferences.objects.filter(
+            user_id__in=user_ids, budget_reminders=False
+        ).values_list('user_id', flat=True))
+        already_reminded = set(InAppNotification.objects.filter(
+            notification_type='budget_reminder',
+            recipient_id__in=user_ids,
+            space_id__in=space_ids,
+            created_at__date=today
+        ).values_list('recipient_id', 'space_id').order_by())
+
+        spaces = Space.objects.in_bulk(space_ids)
+        users = User.objects.in_bulk(user_ids)
+        notifications = [
+            InAppNotification.build_budget_reminder(users[user_id], spaces[space_id], overdue, due_soon)
+            for (user_id, space_id), (overdue, due_soon) in sorted(reminders.items())
+            if user_id not in opted_out and (user_id, space_id) not in already_reminded
+        ]
+        InAppNotification.objects.bulk_create(notifications, batch_size=500)
+
+        return {'budgets': matched, 'notifications': len(notifications)}
+
     @staticmethod
     def get_user_notifications(user, unread_only=False):
         """Get notifications for a specific user"""
@@ -9,8 +9,10 @@ def space_context(request):
     Add space context to all templates
     """
     if request.user.is_authenticated:
+        from budgets.services import BudgetChangeService
         return {
-            'space_context': get_space_context(request)
+            'space_context': get_space_context(request),
+            'pending_approval_count': BudgetChangeService.get_pending_approval_count(request.user),
         }
 
     return {
@@ -20,5 +22,6 @@ def space_context(request):
             'user_role': None,
             'is_owner': False,
             'has_spaces': False
-        }
+        },
+        'pending_approval_count': 0,
     }
\ No newline at end of file
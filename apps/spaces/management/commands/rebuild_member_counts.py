@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from spaces.models import Space
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized active member count of each space'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--space',
+            type=int,
+            help='Only recount members of this space ID',
+        )
+
+    def handle(self, *args, **options):
+        space_ids = [options['space']] if options['space'] else None
+
+        self.stdout.write('Recounting space members...')
+        updated = Space.recount_members(space_ids=space_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Recounted members of {updated} spaces')
+        )
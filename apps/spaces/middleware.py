@@ -0,0 +1,15 @@
+"""
+Middleware for space membership lookups
+"""
+from .utils import SpaceMembershipResolver
+
+
+class SpaceMembershipMiddleware:
+    """Scope SpaceMembershipResolver's membership cache to a single request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with SpaceMembershipResolver.scope():
+            return self.get_response(request)
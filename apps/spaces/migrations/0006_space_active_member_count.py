@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:08
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_active_member_count(apps, schema_editor):
+    """Count the existing active memberships of every space"""
+    Space = apps.get_model('spaces', 'Space')
+    SpaceMember = apps.get_model('spaces', 'SpaceMember')
+
+    active_members = SpaceMember.objects.filter(
+        space_id=models.OuterRef('pk'),
+        is_active=True
+    ).order_by().values('space_id').annotate(total=models.Count('id')).values('total')
+    Space.objects.update(
+        active_member_count=Coalesce(
+            models.Subquery(active_members, output_field=models.IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0005_spacesettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='space',
+            name='active_member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active members (maintained by SpaceMember signals)'),
+        ),
+        migrations.RunPython(backfill_active_member_count, migrations.RunPython.noop),
+    ]
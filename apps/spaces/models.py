@@ -4,6 +4,8 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.core.exceptions import ValidationError
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 User = get_user_model()
 
@@ -91,6 +93,11 @@ class Space(models.Model):
         blank=True,
         help_text="When this space was archived (null if not archived)"
     )
+    active_member_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of active members (maintained by SpaceMember signals)"
+    )
 
     # Members relationship through SpaceMember
     members = models.ManyToManyField(
@@ -144,6 +151,13 @@ class Space(models.Model):
 
         self.invite_code = self.invite_code.upper()
         self.full_clean()
+
+        # Never write the member counter from a possibly stale instance; only F() updates touch it
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'active_member_count'
+            ]
         super().save(*args, **kwargs)
 
     def archive(self):
@@ -167,7 +181,36 @@ class Space(models.Model):
     @property
     def member_count(self):
         """Get current number of members"""
-        return self.spacemember_set.filter(is_active=True).count()
+        return self.active_member_count
+
+    @staticmethod
+    def adjust_member_count(space_id, delta):
+        """Atomically add delta to a space's active member count"""
+        if delta:
+            Space.objects.filter(pk=space_id).update(active_member_count=F('active_member_count') + delta)
+
+    @staticmethod
+    def recount_members(space_ids=None):
+        """
+        Recompute active_member_count from SpaceMember rows
+
+        Args:
+            space_ids: Only recount these spaces (default: all)
+
+        Returns:
+            int: Number of spaces updated
+        """
+        active_members = SpaceMember.objects.filter(
+            space_id=OuterRef('pk'),
+            is_active=True
+        ).order_by().values('space_id').annotate(total=Count('id')).values('total')
+
+        spaces = Space.objects.all()
+        if space_ids is not None:
+            spaces = spaces.filter(pk__in=space_ids)
+        return spaces.update(
+            active_member_count=Coalesce(Subquery(active_members, output_field=IntegerField()), 0)
+        )
 
     @property
     def is_full(self):
@@ -464,7 +507,7 @@ class SpaceSettings(models.Model):
 
 
 # Signal to auto-create SpaceSettings when a Space is created
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 @receiver(post_save, sender=Space)
@@ -473,3 +516,45 @@ def create_space_settings(sender, instance, created, **kwargs):
     if created:
         # Use get_or_create to avoid conflicts if settings already exist
         SpaceSettings.objects.get_or_create(space=instance)
+
+
+@receiver(pre_save, sender=SpaceMember)
+def remember_member_active_state(sender, instance, raw=False, **kwargs):
+    """Remember whether an existing membership was active before it is updated"""
+    instance._was_active = False
+    if raw or not instance.pk:
+        return
+    instance._was_active = SpaceMember.objects.filter(pk=instance.pk, is_active=True).exists()
+
+
+def _apply_member_count_delta(instance, delta):
+    """Update the space's counter, and the loaded Space instance if there is one"""
+    if not delta:
+        return
+    Space.adjust_member_count(instance.space_id, delta)
+    if SpaceMember.space.is_cached(instance):
+        instance.space.active_member_count += delta
+
+
+@receiver(post_save, sender=SpaceMember)
+def update_member_count_on_save(sender, instance, raw=False, **kwargs):
+    """Count memberships that were added, reactivated or deactivated"""
+    if raw:
+        return
+    _apply_member_count_delta(instance, int(instance.is_active) - int(getattr(instance, '_was_active', False)))
+    instance._was_active = instance.is_active
+
+
+@receiver(post_delete, sender=SpaceMember)
+def update_member_count_on_delete(sender, instance, **kwargs):
+    """Stop counting a deleted active membership"""
+    if instance.is_active:
+        _apply_member_count_delta(instance, -1)
+
+
+@receiver(post_save, sender=SpaceMember)
+@receiver(post_delete, sender=SpaceMember)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    """Drop the member's cached memberships so later lookups see the change"""
+    from .utils import SpaceMembershipResolver
+    SpaceMembershipResolver.invalidate(instance.user_id)
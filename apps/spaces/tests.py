@@ -1,3 +1,57 @@
 from django.test import TestCase
+from django.contrib.auth import get_user_model
 
-# Create your tests here.
+from .models import Space, SpaceMember
+
+User = get_user_model()
+
+
+class SpaceMemberCountTestCase(TestCase):
+    """Test cases for the denormalized active member count"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.partner = User.objects.create_user(
+            username='partner',
+            email='partner@example.com',
+            password='testpass123'
+        )
+        self.space = Space.objects.create(
+            name='Member Space',
+            created_by=self.user
+        )
+        SpaceMember.objects.create(space=self.space, user=self.user, role='owner', is_active=True)
+        SpaceMember.objects.create(space=self.space, user=self.partner, role='member', is_active=True)
+
+    def test_space_active_member_count(self):
+        """Test the denormalized member count follows joins, leaves, removals and repairs"""
+        space = Space.objects.get(pk=self.space.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(space.member_count, 2)
+
+        stale = Space.objects.get(pk=self.space.pk)
+        third = User.objects.create_user(username='third', email='third@example.com', password='testpass123')
+        membership = space.add_member(third)
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 3)
+
+        # Saving an instance loaded before the join must not overwrite the counter
+        stale.description = 'Renamed'
+        stale.save()
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 3)
+
+        membership.is_active = False
+        membership.save()
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 2)
+        space.add_member(third)
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 3)
+        SpaceMember.objects.get(space=space, user=self.partner).delete()
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 2)
+
+        Space.objects.filter(pk=space.pk).update(active_member_count=0)
+        self.assertEqual(Space.recount_members([space.pk]), 1)
+        self.assertEqual(Space.objects.get(pk=space.pk).active_member_count, 2)
@@ -36,6 +36,7 @@ urlpatterns = [
     path('pending/', views.pending_approvals, name='pending_approvals'),
     path('approve/<int:request_id>/', views.approve_change, name='approve_change'),
     path('reject/<int:request_id>/', views.reject_change, name='reject_change'),
+    path('pending/batch/', views.batch_decide_changes, name='batch_decide_changes'),
 
     # API endpoints
     path('<int:pk>/members/api/', views.space_members_api, name='members_api'),
@@ -1,10 +1,76 @@
 """
 Utilities for managing space context and navigation
 """
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.shortcuts import get_object_or_404
 from .models import Space, SpaceMember
 
 
+# user_id -> {space_id: role} for the active membership scope (None when no scope is open)
+_membership_cache = ContextVar('space_membership_cache', default=None)
+
+
+class SpaceMembershipResolver:
+    """
+    Answers is_member/role lookups from a user's active memberships
+
+    Inside scope() (opened per request by SpaceMembershipMiddleware, or
+    around a bulk job) each user's memberships are loaded with one query and
+    reused; outside a scope every lookup queries the database.
+    """
+
+    @staticmethod
+    @contextmanager
+    def scope():
+        """Cache membership lookups until the block exits"""
+        token = _membership_cache.set({})
+        try:
+            yield
+        finally:
+            _membership_cache.reset(token)
+
+    @staticmethod
+    def get_roles(user):
+        """Get {space_id: role} for every active membership of a user"""
+        user_id = getattr(user, 'pk', user)
+        cache = _membership_cache.get()
+        if cache is not None and user_id in cache:
+            return cache[user_id]
+
+        roles = dict(SpaceMember.objects.filter(
+            user_id=user_id,
+            is_active=True
+        ).order_by().values_list('space_id', 'role'))
+
+        if cache is not None:
+            cache[user_id] = roles
+        return roles
+
+    @staticmethod
+    def get_role(space, user):
+        """Get the user's role in a space, or None if they are not an active member"""
+        if not space or not user:
+            return None
+        return SpaceMembershipResolver.get_roles(user).get(getattr(space, 'pk', space))
+
+    @staticmethod
+    def is_member(space, user):
+        """Check if the user is an active member of the space"""
+        return SpaceMembershipResolver.get_role(space, user) is not None
+
+    @staticmethod
+    def invalidate(user=None):
+        """Drop cached memberships for one user (or everyone) in the current scope"""
+        cache = _membership_cache.get()
+        if cache is None:
+            return
+        if user is None:
+            cache.clear()
+        else:
+            cache.pop(getattr(user, 'pk', user), None)
+
+
 class SpaceContextManager:
     """Manages the current space context for user sessions"""
 
@@ -1,3 +1,6 @@
+import json
+from datetime import datetime
+from urllib.parse import urlencode
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -9,7 +12,7 @@ from django.views.decorators.csrf import csrf_protect
 
 from .models import Space, SpaceMember, SpaceSettings
 from .forms import SpaceCreateForm, JoinSpaceForm, SpaceUpdateForm, RegenerateInviteCodeForm, SpaceSettingsForm
-from .utils import SpaceContextManager, get_space_context
+from .utils import SpaceContextManager, SpaceMembershipResolver, get_space_context
 # Force reload for new templates
 
 
@@ -390,7 +393,12 @@ def delete_space(request, pk):
             space.save()
 
             # Also deactivate all memberships
+            from budgets.approval_models import BudgetChangeRequest
+            member_user_ids = list(space.spacemember_set.values_list('user_id', flat=True))
             space.spacemember_set.all().update(is_active=False)
+            Space.recount_members([space.pk])
+            SpaceMembershipResolver.invalidate()
+            BudgetChangeRequest.invalidate_pending_counts_for_users(member_user_ids)
 
             messages.success(request, f'Space "{space_name}" has been deleted permanently.')
             return redirect('spaces:list')
@@ -547,7 +555,12 @@ def archive_space(request, pk):
             space.archive()
 
             # Also deactivate all memberships
+            from budgets.approval_models import BudgetChangeRequest
+            member_user_ids = list(space.spacemember_set.values_list('user_id', flat=True))
             space.spacemember_set.all().update(is_active=False)
+            Space.recount_members([space.pk])
+            SpaceMembershipResolver.invalidate()
+            BudgetChangeRequest.invalidate_pending_counts_for_users(member_user_ids)
 
             messages.success(request, f'Space "{space_name}" has been archived successfully. You can restore it later if needed.')
             return redirect('spaces:list')
@@ -590,7 +603,12 @@ def restore_space(request, pk):
         space.unarchive()
 
         # Reactivate all memberships
+        from budgets.approval_models import BudgetChangeRequest
+        member_user_ids = list(space.spacemember_set.values_list('user_id', flat=True))
         space.spacemember_set.all().update(is_active=True)
+        Space.recount_members([space.pk])
+        SpaceMembershipResolver.invalidate()
+        BudgetChangeRequest.invalidate_pending_counts_for_users(member_user_ids)
 
         messages.success(request, f'Space "{space_name}" has been restored successfully!')
         return redirect('spaces:detail', pk=space.pk)
@@ -685,11 +703,11 @@ def pending_approvals(request):
     """View pending approval requests for user"""
     from budgets.services import BudgetChangeService
 
-    pending_requests = BudgetChangeService.get_pending_approvals_for_user(request.user)
+    pending_requests = list(BudgetChangeService.get_pending_approvals_for_user(request.user))
 
     context = {
         'pending_requests': pending_requests,
-        'total_pending': pending_requests.count(),
+        'total_pending': len(pending_requests),
     }
     return render(request, 'spaces/pending_approvals.html', context)
 
@@ -778,6 +796,34 @@ def reject_change(request, request_id):
         return redirect('spaces:pending_approvals')
 
 
+@login_required
+@require_http_methods(["POST"])
+def batch_decide_changes(request):
+    """
+    Approve or reject several budget change requests at once
+
+    Expects a JSON body: {"decisions": [{"id": 1, "decision": "approve"},
+    {"id": 2, "decision": "reject", "reason": "..."}]}
+    """
+    from budgets.services import BudgetChangeService
+
+    try:
+        payload = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON payload'}, status=400)
+
+    decisions = payload.get('decisions') if isinstance(payload, dict) else None
+    if not isinstance(decisions, list) or not decisions:
+        return JsonResponse({'success': False, 'error': 'A list of decisions is required'}, status=400)
+
+    try:
+        result = BudgetChangeService.decide_batch(request.user, decisions)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Unable to process decisions: {str(e)}'}, status=500)
+
+    return JsonResponse({'success': True, **result})
+
+
 @login_required
 def change_history(request, pk):
     """View change history for a space"""
@@ -791,14 +837,48 @@ def change_history(request, pk):
             messages.error(request, 'You are not a member of this space.')
             return redirect('spaces:list')
 
-        # Get change history
+        # Get one page of change history (?cursor=, ?type=, ?since=/?until= YYYY-MM-DD)
         from budgets.services import BudgetChangeService
-        history = BudgetChangeService.get_space_change_history(space, limit=50)
+        change_type = request.GET.get('type', '').strip()
+        filters = {'change_type': change_type or None}
+        for param in ('since', 'until'):
+            value = request.GET.get(param, '').strip()
+            try:
+                filters[param] = datetime.strptime(value, '%Y-%m-%d').date() if value else None
+            except ValueError:
+                messages.error(request, f'{param.capitalize()} date must be in YYYY-MM-DD format.')
+                filters[param] = None
+
+        try:
+            page = BudgetChangeService.get_change_history_page(
+                space, limit=50, cursor=request.GET.get('cursor') or None, **filters
+            )
+        except ValueError:
+            messages.error(request, 'Invalid page link. Showing the most recent changes.')
+            page = BudgetChangeService.get_change_history_page(space, limit=50, **filters)
+
+        from budgets.approval_models import BudgetChangeRequest
+        active_filters = {
+            'type': change_type,
+            'since': request.GET.get('since', ''),
+            'until': request.GET.get('until', ''),
+        }
+        next_page_query = None
+        if page['has_more']:
+            next_page_query = urlencode({
+                **{key: value for key, value in active_filters.items() if value},
+                'cursor': page['next_cursor'],
+            })
 
         context = {
             'space': space,
-            'history': history,
-            'total_changes': history.count() if hasattr(history, 'count') else len(history),
+            'history': page['entries'],
+            'total_changes': len(page['entries']),
+            'has_more': page['has_more'],
+            'next_cursor': page['next_cursor'],
+            'next_page_query': next_page_query,
+            'filters': active_filters,
+            'change_types': BudgetChangeRequest.CHANGE_TYPE_CHOICES,
         }
         return render(request, 'spaces/change_history.html', context)
 
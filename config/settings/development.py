@@ -81,6 +81,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'budget_import': {
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 